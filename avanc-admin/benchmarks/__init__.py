@@ -0,0 +1,12 @@
+"""Benchmark scripts. Run them from ``avanc-admin`` as modules, for example
+``python -m benchmarks.explain_indexes``, against the database configured in
+the environment (see ``config/components/database.py``).
+"""
+import os
+
+
+def setup_django():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    import django
+
+    django.setup()
@@ -0,0 +1,79 @@
+"""Compare per-request authentication cost before and after signed tokens.
+
+"Before" is the old flow, where clients re-send credentials and every call
+pays a PBKDF2 ``check_password``. "After" is a signed access token verified
+in-process. Also times sign-in and a protected endpoint end to end through
+the Django test client. All rows are created inside a transaction that is
+rolled back at the end.
+
+    python -m benchmarks.auth_tokens [--iterations 200]
+"""
+import argparse
+import statistics
+import time
+
+from benchmarks import setup_django
+
+setup_django()
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth.hashers import check_password, make_password  # noqa: E402
+from django.db import transaction  # noqa: E402
+from django.test import Client  # noqa: E402
+
+from employees.models import Employee, Employer  # noqa: E402
+from employees.tokens import issue_tokens, verify_token  # noqa: E402
+
+
+def timed(func, iterations):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "p50_ms": statistics.median(samples),
+        "p99_ms": samples[min(len(samples) - 1, int(len(samples) * 0.99))],
+        "mean_ms": statistics.fmean(samples),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+    settings.ALLOWED_HOSTS = ["*"]
+
+    with transaction.atomic():
+        employer = Employer.objects.create(name="benchmark employer")
+        password = "benchmark-password"
+        employee = Employee.objects.create(
+            employer=employer, full_name="Benchmark", email="benchmark@example.com",
+            salary=1000, password=make_password(password))
+        encoded = employee.password
+        access = issue_tokens(employee.pk)["access"]
+        client = Client()
+        url = f"/api/v1/employees/{employee.pk}/transactions"
+        credentials = {"email": employee.email, "password": password}
+
+        results = {
+            "before: check_password per request": timed(
+                lambda: check_password(password, encoded), args.iterations),
+            "after: verify access token": timed(lambda: verify_token(access), args.iterations),
+            "sign-in (POST /signin/)": timed(
+                lambda: client.post("/api/v1/signin/", credentials, content_type="application/json"),
+                args.iterations),
+            "protected GET with token": timed(
+                lambda: client.get(url, HTTP_AUTHORIZATION=f"Bearer {access}"), args.iterations),
+        }
+        transaction.set_rollback(True)
+
+    width = max(len(name) for name in results)
+    print(f"{'':{width}}  {'p50 ms':>9}  {'p99 ms':>9}  {'mean ms':>9}")
+    for name, stats in results.items():
+        print(f"{name:{width}}  {stats['p50_ms']:9.3f}  {stats['p99_ms']:9.3f}  {stats['mean_ms']:9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""EXPLAIN ANALYZE the hot filter paths with and without the 0009 indexes.
+
+Seeds a dataset, drops the indexes added for the hot paths inside a
+savepoint ("before"), explains every query, restores them ("after") and
+explains again. Everything, including the seed data, is rolled back.
+
+    python -m benchmarks.explain_indexes --employees 20000 [--json out.json]
+"""
+import argparse
+import json
+import re
+
+from benchmarks import setup_django
+from benchmarks import seed
+
+setup_django()
+
+from django.db import connection, transaction  # noqa: E402
+from django.db.models import Sum  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from employees.models import (  # noqa: E402
+    Employee, Employer, SalaryAdvanceRequest, Transaction, month_start)
+
+MODEL_INDEXES = ('sar_employee_status_review_idx', 'sar_approved_review_idx', 'transaction_request_date_idx')
+# (table, column) pairs whose single-column indexes came with 0009.
+COLUMN_INDEXES = (('fintech.employee', 'email'), ('fintech.employer', 'name'))
+
+
+def hot_queries(employee, employer_name):
+    month = month_start(timezone.now())
+    return {
+        "sign-in: employee by email": Employee.objects.filter(email=employee.email),
+        "sign-up: employer by name": Employer.objects.filter(name=employer_name),
+        "approved month total for employee": SalaryAdvanceRequest.objects.filter(
+            employee=employee, status=SalaryAdvanceRequest.APPROVED,
+            review_date__year=month.year, review_date__month=month.month,
+        ).values('employee_id').annotate(total=Sum('amount_requested')),
+        "pending requests for employee": SalaryAdvanceRequest.objects.filter(
+            employee=employee, status=SalaryAdvanceRequest.PENDING),
+        "transactions for employee": Transaction.objects.filter(
+            request__employee=employee).order_by('transaction_date'),
+    }
+
+
+def drop_hot_path_indexes(cursor):
+    cursor.execute(
+        "SELECT i.relname, c.conname FROM pg_index x "
+        "JOIN pg_class i ON i.oid = x.indexrelid "
+        "LEFT JOIN pg_constraint c ON c.conindid = x.indexrelid "
+        "WHERE i.relname = ANY(%s) OR EXISTS ("
+        "  SELECT 1 FROM unnest(%s::text[], %s::text[]) AS t(tbl, col) "
+        "  JOIN pg_attribute a ON a.attrelid = t.tbl::regclass AND a.attname = t.col "
+        "  WHERE x.indrelid = t.tbl::regclass AND x.indnatts = 1 AND x.indkey[0] = a.attnum)",
+        [list(MODEL_INDEXES), [t for t, _ in COLUMN_INDEXES], [c for _, c in COLUMN_INDEXES]],
+    )
+    dropped = []
+    for index, constraint in cursor.fetchall():
+        if constraint:
+            cursor.execute(
+                "SELECT conrelid::regclass::text FROM pg_constraint WHERE conname = %s", [constraint])
+            table = cursor.fetchone()[0]
+            cursor.execute(f'ALTER TABLE {table} DROP CONSTRAINT "{constraint}"')
+        else:
+            cursor.execute(f'DROP INDEX fintech."{index}"')
+        dropped.append(index)
+    return dropped
+
+
+def explain_all(queries):
+    results = {}
+    for name, queryset in queries.items():
+        plan = queryset.explain(analyze=True)
+        match = re.search(r"Execution Time: ([\d.]+) ms", plan)
+        results[name] = {
+            "execution_ms": float(match.group(1)) if match else None,
+            "plan": plan,
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    seed.add_arguments(parser)
+    parser.add_argument("--json", help="Write the plans and timings to this file.")
+    parser.add_argument("--verbose", action="store_true", help="Print the full plans.")
+    args = parser.parse_args()
+
+    with transaction.atomic():
+        summary = seed.seed_dataset(**seed.options(args))
+        employee = Employee.objects.get(pk=summary['sample_employee_ids'][len(summary['sample_employee_ids']) // 2])
+        employer_name = employee.employer.name
+        queries = hot_queries(employee, employer_name)
+
+        with connection.cursor() as cursor:
+            # Flush the deferred FK checks from seeding so ALTER TABLE is allowed.
+            cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+            sid = transaction.savepoint()
+            dropped = drop_hot_path_indexes(cursor)
+            cursor.execute("ANALYZE")
+            before = explain_all(queries)
+            transaction.savepoint_rollback(sid)
+            cursor.execute("ANALYZE")
+            after = explain_all(queries)
+        transaction.set_rollback(True)
+
+    print(f"Dropped for the 'before' run: {', '.join(dropped)}")
+    width = max(len(name) for name in queries)
+    print(f"{'':{width}}  {'before ms':>10}  {'after ms':>10}")
+    for name in queries:
+        print(f"{name:{width}}  {before[name]['execution_ms']:10.3f}  {after[name]['execution_ms']:10.3f}")
+        if args.verbose:
+            print(f"--- before\n{before[name]['plan']}\n--- after\n{after[name]['plan']}\n")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"dataset": {k: v for k, v in summary.items() if k in ('employees', 'requests', 'transactions')},
+                       "before": before, "after": after}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
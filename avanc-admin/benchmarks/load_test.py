@@ -0,0 +1,215 @@
+"""Drive the per-employee API routes of running servers and compare them.
+
+Each target gets the same traffic: ``--concurrency`` client threads, each on
+its own keep-alive connection, hammering a read-mostly mix of the detail,
+transactions and salary advance routes for ``--duration`` seconds. Employees
+are sampled from the configured database (seed one first with
+``python -m benchmarks.seed``) and access tokens are signed locally, so the
+targets must share its ``TOKEN_SIGNING_KEY``.
+
+    uwsgi --http :8000 --module config.wsgi --master --processes 1 --threads 16 --enable-threads
+    ASYNC_API_VIEWS=True DB_CONN_MAX_AGE=0 uvicorn config.asgi:application --port 8001
+    python -m benchmarks.load_test --target wsgi=http://127.0.0.1:8000 \\
+        --target asgi=http://127.0.0.1:8001 --concurrency 64 --duration 30
+"""
+import argparse
+import http.client
+import json
+import random
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+from benchmarks import setup_django
+
+setup_django()
+
+from employees.models import Employee  # noqa: E402
+from employees.tokens import issue_tokens  # noqa: E402
+
+# (name, method, path template, weight); writes stay rare and well under the cap.
+DEFAULT_MIX = (
+    ("employee detail", "GET", "/api/v1/employees/{pk}", 6),
+    ("employee transactions", "GET", "/api/v1/employees/{pk}/transactions", 2),
+    ("salary advances", "GET", "/api/v1/employees/{pk}/salary-advances", 2),
+    ("create salary advance", "POST", "/api/v1/employees/{pk}/salary-advances", 0),
+)
+
+
+def percentile(samples, fraction):
+    """``samples`` must be sorted."""
+    if not samples:
+        return None
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+def summarize(latencies, errors, elapsed):
+    samples = sorted(latencies)
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "rps": round(len(samples) / elapsed, 1) if elapsed else 0,
+        "p50_ms": percentile(samples, 0.50),
+        "p95_ms": percentile(samples, 0.95),
+        "p99_ms": percentile(samples, 0.99),
+    }
+
+
+class Client:
+    """One keep-alive HTTP connection; reconnects after a failure."""
+
+    def __init__(self, base_url, timeout=30):
+        parts = urlsplit(base_url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.timeout = timeout
+        self.connection = None
+
+    def request(self, method, path, body=None, headers=None):
+        """Return ``(status, elapsed ms, response headers, body)``.
+
+        A reused connection the server has closed is retried once on a new
+        one, so servers without keep-alive are not reported as failing.
+        """
+        start = time.perf_counter()
+        for reused in (self.connection is not None, False):
+            if self.connection is None:
+                self.connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            try:
+                self.connection.request(method, path, body=body, headers=headers or {})
+                response = self.connection.getresponse()
+                content = response.read()
+            except (OSError, http.client.HTTPException):
+                self.connection.close()
+                self.connection = None
+                if reused:
+                    continue
+                return None, (time.perf_counter() - start) * 1000, {}, b""
+            if response.will_close:
+                self.connection.close()
+                self.connection = None
+            return response.status, (time.perf_counter() - start) * 1000, dict(response.getheaders()), content
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+
+
+def run_load(base_url, next_request, concurrency, duration, warmup=0, on_response=None):
+    """Run ``concurrency`` client threads against ``base_url``.
+
+    ``next_request(rng)`` returns ``(name, method, path, body, headers)``.
+    ``on_response(name, status, headers)`` is called from the client threads
+    for every measured response. Returns ``{name: summary}`` plus an
+    ``"overall"`` entry.
+    """
+    lock = threading.Lock()
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    started = time.monotonic()
+    measure_from = started + warmup
+    stop_at = measure_from + duration
+
+    def worker(seed):
+        rng = random.Random(seed)
+        client = Client(base_url)
+        local, local_errors = defaultdict(list), defaultdict(int)
+        try:
+            while True:
+                now = time.monotonic()
+                if now >= stop_at:
+                    break
+                name, method, path, body, headers = next_request(rng)
+                status, elapsed_ms, response_headers, _ = client.request(method, path, body, headers)
+                if now < measure_from:
+                    continue
+                if status is None or status >= 500:
+                    local_errors[name] += 1
+                else:
+                    local[name].append(elapsed_ms)
+                    if on_response:
+                        on_response(name, status, response_headers)
+        finally:
+            client.close()
+            with lock:
+                for name, values in local.items():
+                    latencies[name].extend(values)
+                for name, count in local_errors.items():
+                    errors[name] += count
+
+    threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    results = {
+        name: summarize(latencies[name], errors[name], duration)
+        for name in sorted(set(latencies) | set(errors))
+    }
+    results["overall"] = summarize(
+        [value for values in latencies.values() for value in values], sum(errors.values()), duration)
+    return results
+
+
+def employee_request_factory(employees, mix, amount="1.00"):
+    """Pick weighted requests from ``mix`` for random ``(pk, access token)`` pairs."""
+    names = [entry for entry in mix if entry[3] > 0]
+    weights = [entry[3] for entry in names]
+
+    def next_request(rng):
+        name, method, template, _ = rng.choices(names, weights)[0]
+        pk, token = rng.choice(employees)
+        headers = {"Authorization": f"Bearer {token}"}
+        body = None
+        if method == "POST":
+            body = json.dumps({"amount_requested": amount})
+            headers["Content-Type"] = "application/json"
+        return name, method, template.format(pk=pk), body, headers
+
+    return next_request
+
+
+def sample_employees(count):
+    ids = list(Employee.objects.order_by("?").values_list("pk", flat=True)[:count])
+    if not ids:
+        raise SystemExit("No employees found; seed a dataset with `python -m benchmarks.seed` first.")
+    return [(str(pk), issue_tokens(pk)["access"]) for pk in ids]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--target", action="append", required=True, metavar="NAME=URL",
+                        help="Server to drive; repeat to compare several.")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=20, help="Measured seconds per target.")
+    parser.add_argument("--warmup", type=float, default=3)
+    parser.add_argument("--employees", type=int, default=1000, help="Distinct employees to request.")
+    parser.add_argument("--write-weight", type=int, default=0,
+                        help="Weight of POST salary-advances in the mix (reads weigh 10).")
+    parser.add_argument("--json", help="Write the results to this file.")
+    args = parser.parse_args()
+
+    targets = dict(target.split("=", 1) for target in args.target)
+    mix = [entry if entry[1] == "GET" else entry[:3] + (args.write_weight,) for entry in DEFAULT_MIX]
+    next_request = employee_request_factory(sample_employees(args.employees), mix)
+
+    results = {}
+    for name, url in targets.items():
+        print(f"Driving {name} ({url}) with {args.concurrency} clients for {args.duration}s...")
+        results[name] = run_load(url, next_request, args.concurrency, args.duration, args.warmup)
+
+    print(f"\n{'target':<8}  {'endpoint':<22}  {'req/s':>8}  {'p50 ms':>8}  {'p99 ms':>8}  {'errors':>6}")
+    for name, endpoints in results.items():
+        for endpoint, stats in endpoints.items():
+            p50 = f"{stats['p50_ms']:8.2f}" if stats['p50_ms'] is not None else f"{'-':>8}"
+            p99 = f"{stats['p99_ms']:8.2f}" if stats['p99_ms'] is not None else f"{'-':>8}"
+            print(f"{name:<8}  {endpoint:<22}  {stats['rps']:8.1f}  {p50}  {p99}  {stats['errors']:6d}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"concurrency": args.concurrency, "duration": args.duration, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
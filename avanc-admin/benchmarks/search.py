@@ -0,0 +1,137 @@
+"""Measure employee search latency on a seeded dataset.
+
+Seeds ``--employees`` employees with realistic names across ``--employers``
+employers, then times ``employees.services.search.search_employees`` for
+sampled queries of each kind: full names, surname prefixes, surnames with a
+typo, email prefixes and employer names. The ``ILIKE`` scan across the same
+fields, which the admin used to run, is timed for comparison. With
+``--explain`` it prints the plan of one search per kind. Everything is rolled
+back at the end.
+
+    python -m benchmarks.search [--employees 1000000] [--queries 50] [--explain] [--no-ilike]
+"""
+import argparse
+import random
+import statistics
+import time
+import unicodedata
+from decimal import Decimal
+
+from benchmarks import setup_django
+
+setup_django()
+
+from django.db import connection, transaction  # noqa: E402
+from django.db.models import Q  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+
+from employees.models import Employee, Employer  # noqa: E402
+from employees.services import search  # noqa: E402
+
+FIRST_NAMES = (
+    "Ana", "María", "José", "Juan", "Luis", "Carlos", "Jorge", "Rosa", "Carmen", "Lucía", "Mario", "Pedro",
+    "Sofía", "Valeria", "Diego", "Andrés", "Gabriela", "Fernando", "Patricia", "Ricardo", "Daniela", "Miguel",
+)
+SURNAMES = (
+    "Gonzalez", "Rodriguez", "Mamani", "Quispe", "Flores", "Vargas", "Rojas", "Gutierrez", "Choque", "Fernandez",
+    "Lopez", "Perez", "Condori", "Torrez", "Morales", "Guzman", "Mendoza", "Aguilar", "Castro", "Villarroel",
+    "Salazar", "Zambrana", "Arce", "Paz", "Soliz", "Montaño", "Ribera", "Justiniano", "Suarez", "Cuellar",
+)
+COMPANIES = ("Andina", "Illimani", "Chiquitana", "Altiplano", "Amazonia", "Pantanal", "Yungas", "Sajama")
+SECTORS = ("Logística", "Alimentos", "Minería", "Textiles", "Servicios", "Comercial", "Construcción")
+
+
+def ascii_lower(text):
+    return unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode().lower()
+
+
+def seed(employees, employers, rng, batch_size=10000):
+    employer_objs = Employer.objects.bulk_create([
+        Employer(name=f"{rng.choice(COMPANIES)} {rng.choice(SECTORS)} {i}") for i in range(employers)
+    ])
+    for offset in range(0, employees, batch_size):
+        batch = []
+        for i in range(offset, min(offset + batch_size, employees)):
+            first, surname, second = rng.choice(FIRST_NAMES), rng.choice(SURNAMES), rng.choice(SURNAMES)
+            batch.append(Employee(
+                employer=employer_objs[i % employers], full_name=f"{first} {surname} {second}",
+                email=f"{ascii_lower(first)}.{ascii_lower(surname)}{i}@example.com",
+                salary=Decimal(rng.randrange(3000, 20000)), password="!"))
+        Employee.objects.bulk_create(batch)
+    with connection.cursor() as cursor:
+        cursor.execute(f"ANALYZE {connection.ops.quote_name(Employee._meta.db_table)}, "
+                       f"{connection.ops.quote_name(Employer._meta.db_table)}")
+    return employer_objs
+
+
+def typo(word, rng):
+    position = rng.randrange(1, len(word) - 1)
+    return word[:position] + word[position + 1] + word[position] + word[position + 2:]
+
+
+def sample_queries(count, employers, rng):
+    employees = list(Employee.objects.order_by("?").values_list("full_name", "email")[:count])
+    return {
+        "full name": [name for name, _ in employees],
+        "surname prefix": [name.split()[1][:4] for name, _ in employees],
+        "surname typo": [typo(name.split()[1], rng) for name, _ in employees],
+        "email prefix": [email.split("@")[0][:8] for _, email in employees],
+        "employer name": [rng.choice(employers).name for _ in range(count)],
+    }
+
+
+def ilike(query):
+    return list(Employee.objects.filter(
+        Q(full_name__icontains=query) | Q(email__icontains=query) | Q(employer__name__icontains=query),
+    ).values_list("pk", flat=True)[:20])
+
+
+def timings_ms(func, queries):
+    samples = []
+    for query in queries:
+        start = time.perf_counter()
+        func(query)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[max(0, int(len(samples) * 0.95) - 1)]
+
+
+def explain(query):
+    """EXPLAIN ANALYZE of the ranked employee query of a search."""
+    with CaptureQueriesContext(connection) as ctx:
+        search.search_employees(query)
+    with search.similarity_threshold(connection.alias), connection.cursor() as cursor:
+        cursor.execute("EXPLAIN ANALYZE " + ctx.captured_queries[-1]["sql"])
+        return "\n".join(row[0] for row in cursor.fetchall())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--employees", type=int, default=1000000)
+    parser.add_argument("--employers", type=int, default=500)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--explain", action="store_true")
+    parser.add_argument("--no-ilike", dest="ilike", action="store_false", help="skip the ILIKE baseline")
+    args = parser.parse_args()
+    rng = random.Random(0)
+
+    with transaction.atomic():
+        started = time.monotonic()
+        employers = seed(args.employees, args.employers, rng)
+        print(f"Seeded {args.employees} employees in {time.monotonic() - started:.1f}s")
+        queries = sample_queries(args.queries, employers, rng)
+
+        print(f"{'query kind':<16}  {'p50 ms':>8}  {'p95 ms':>8}  {'ILIKE p50 ms':>12}  {'ILIKE p95 ms':>12}  "
+              f"{'avg results':>11}")
+        for kind, texts in queries.items():
+            p50, p95 = timings_ms(search.search_employees, texts)
+            ilike_p50, ilike_p95 = timings_ms(ilike, texts) if args.ilike else (float("nan"),) * 2
+            results = statistics.mean(len(search.search_employees(text)) for text in texts)
+            print(f"{kind:<16}  {p50:8.2f}  {p95:8.2f}  {ilike_p50:12.2f}  {ilike_p95:12.2f}  {results:11.1f}")
+            if args.explain:
+                print(explain(texts[0]))
+        transaction.set_rollback(True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""Synthetic dataset for benchmarks.
+
+Creates employers, employees, months of salary advance requests (approved,
+pending and rejected), one transaction per approved request and the matching
+monthly advance ledger rows. Rows are generated and inserted in batches, so
+memory stays bounded regardless of the dataset size. Every email carries a
+per-run tag so seeding can be repeated against the same database.
+
+    python -m benchmarks.seed --employers 50 --employees 10000 --months 6
+"""
+import argparse
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from benchmarks import setup_django
+
+setup_django()
+
+from django.db import connection, transaction  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from employees.models import (  # noqa: E402
+    Employee, Employer, MonthlyAdvanceLedger, SalaryAdvanceRequest, Transaction, month_start)
+from employees.services.dashboard import rebuild_summaries  # noqa: E402
+from employees.services.partitions import ensure_partitions  # noqa: E402
+
+STATUS_WEIGHTS = (
+    (SalaryAdvanceRequest.APPROVED, 6),
+    (SalaryAdvanceRequest.PENDING, 2),
+    (SalaryAdvanceRequest.REJECTED, 2),
+)
+CITIES = ('Santa Cruz de la Sierra', 'La Paz', 'Cochabamba', 'Sucre', 'Tarija', 'Oruro')
+BANKS = [code for code, _ in Employee.BANK_CHOICES]
+
+
+def _months_back(count):
+    """First instants of the last ``count`` months, oldest first."""
+    current = month_start(timezone.now())
+    starts = []
+    for _ in range(count):
+        starts.append(timezone.make_aware(datetime(current.year, current.month, 1)))
+        current = (current - timedelta(days=1)).replace(day=1)
+    return starts[::-1]
+
+
+def _backdate_transactions(transactions, batch_size):
+    """``transaction_date`` is ``auto_now_add``; move it to the review date.
+
+    Rows move to the partition of their month, which ``seed_dataset`` creates first.
+    """
+    table = connection.ops.quote_name(Transaction._meta.db_table)
+    with connection.cursor() as cursor:
+        for offset in range(0, len(transactions), batch_size):
+            batch = transactions[offset:offset + batch_size]
+            values = ", ".join(["(%s::uuid, %s::timestamptz)"] * len(batch))
+            params = []
+            for item in batch:
+                params += [item.pk, item.request.review_date]
+            cursor.execute(
+                f"UPDATE {table} AS t SET transaction_date = v.review_date "
+                f"FROM (VALUES {values}) AS v(id, review_date) WHERE t.id = v.id",
+                params,
+            )
+
+
+def seed_dataset(employers=50, employees=10000, months=6, requests_per_month=2,
+                 batch_size=5000, password='!', seed=0, log=print):
+    """Insert the dataset and return a summary with the generated ids."""
+    rng = random.Random(seed)
+    tag = uuid.uuid4().hex[:8]
+    started = time.monotonic()
+    statuses = [status for status, weight in STATUS_WEIGHTS for _ in range(weight)]
+    month_starts = _months_back(months)
+    ensure_partitions(Transaction, start=month_starts[0].date())
+
+    employer_objs = Employer.objects.bulk_create([
+        Employer(name=f"Employer {tag}-{i}", contact_email=f"hr-{tag}-{i}@example.com")
+        for i in range(employers)
+    ])
+    employer_ids = [employer.pk for employer in employer_objs]
+
+    employee_ids = []
+    counts = {'requests': 0, 'transactions': 0}
+    for offset in range(0, employees, batch_size):
+        with transaction.atomic():
+            batch = Employee.objects.bulk_create([
+                Employee(
+                    employer_id=employer_ids[i % employers],
+                    full_name=f"Employee {tag} {i}",
+                    email=f"employee-{tag}-{i}@example.com",
+                    salary=Decimal(rng.randrange(3000, 20000)),
+                    city=rng.choice(CITIES),
+                    bank_name=rng.choice(BANKS),
+                    bank_account=str(rng.randrange(10 ** 9, 10 ** 10)),
+                    password=password,
+                )
+                for i in range(offset, min(offset + batch_size, employees))
+            ])
+            requests, transactions = [], []
+            for employee in batch:
+                employee_ids.append(employee.pk)
+                limit = employee.salary * Employee.ADVANCE_LIMIT_RATIO
+                for start in month_starts:
+                    for _ in range(requests_per_month):
+                        request_date = start + timedelta(
+                            days=rng.randrange(0, 27), seconds=rng.randrange(86400))
+                        status = rng.choice(statuses)
+                        advance = SalaryAdvanceRequest(
+                            employee=employee,
+                            amount_requested=(limit / (requests_per_month + 1)).quantize(Decimal('0.01')),
+                            status=status,
+                            request_date=request_date,
+                            review_date=(
+                                None if status == SalaryAdvanceRequest.PENDING
+                                else request_date + timedelta(hours=rng.randrange(1, 24))),
+                        )
+                        requests.append(advance)
+                        if status == SalaryAdvanceRequest.APPROVED:
+                            transactions.append(Transaction(request=advance, amount=advance.amount_requested))
+            SalaryAdvanceRequest.objects.bulk_create(requests, batch_size=batch_size)
+            Transaction.objects.bulk_create(transactions, batch_size=batch_size)
+            _backdate_transactions(transactions, batch_size)
+            counts['requests'] += len(requests)
+            counts['transactions'] += len(transactions)
+        log(f"seeded {len(employee_ids)}/{employees} employees")
+
+    with connection.cursor() as cursor:
+        # Fresh statistics keep the ledger aggregation below off nested loops.
+        cursor.execute("ANALYZE " + ", ".join(
+            connection.ops.quote_name(model._meta.db_table)
+            for model in (Employer, Employee, SalaryAdvanceRequest, Transaction)))
+    with transaction.atomic():
+        MonthlyAdvanceLedger.objects.bulk_create(
+            [
+                MonthlyAdvanceLedger(
+                    employee_id=row['employee_id'], month=row['month'], advanced_total=row['total'])
+                for row in MonthlyAdvanceLedger.objects.history_totals()
+                .filter(employee__employer_id__in=employer_ids).iterator()
+            ],
+            batch_size=batch_size,
+        )
+    rebuild_summaries(employer_ids)
+
+    return {
+        'tag': tag,
+        'employers': employer_ids,
+        'employees': len(employee_ids),
+        'sample_employee_ids': employee_ids[:: max(1, len(employee_ids) // 100)],
+        'requests': counts['requests'],
+        'transactions': counts['transactions'],
+        'seconds': round(time.monotonic() - started, 1),
+    }
+
+
+def add_arguments(parser):
+    parser.add_argument("--employers", type=int, default=50)
+    parser.add_argument("--employees", type=int, default=10000)
+    parser.add_argument("--months", type=int, default=6)
+    parser.add_argument("--requests-per-month", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def options(args):
+    return {
+        'employers': args.employers,
+        'employees': args.employees,
+        'months': args.months,
+        'requests_per_month': args.requests_per_month,
+        'seed': args.seed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed a synthetic benchmark dataset.")
+    add_arguments(parser)
+    summary = seed_dataset(**options(parser.parse_args()))
+    print(
+        f"Seeded {summary['employees']} employees, {summary['requests']} requests and "
+        f"{summary['transactions']} transactions in {summary['seconds']}s (tag {summary['tag']}).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Compare JSON encoders on large API payloads.
+
+Seeds one employee with ``--rows`` salary advance requests and as many
+transactions, then builds the body of ``GET /employees/<id>/transactions`` and
+``GET /employees/<id>/salary-advances`` three ways:
+
+- ``values()`` + ``JsonResponse``: the stdlib encoder with ``DjangoJSONEncoder``;
+- ``values()`` + orjson, calling ``DjangoJSONEncoder.default`` for every
+  Decimal and datetime;
+- the endpoint's ``Schema`` + orjson, with decimals and datetimes rendered as
+  text by Postgres.
+
+Reports the best fetch and encode times and the peak memory allocated by a
+fetch and encode (tracemalloc), and checks that every body decodes to the same
+data. Everything is rolled back at the end.
+
+    python -m benchmarks.serialization [--rows 10000] [--repeat 10]
+"""
+import argparse
+import json
+import random
+import time
+import tracemalloc
+from datetime import timedelta
+from decimal import Decimal
+
+from benchmarks import setup_django
+
+setup_django()
+
+from django.db import transaction  # noqa: E402
+from django.http import JsonResponse  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from employees.api.v1 import serializers  # noqa: E402
+from employees.models import Employee, Employer, SalaryAdvanceRequest, Transaction  # noqa: E402
+
+
+def seed(rows, rng):
+    employer = Employer.objects.create(name="serialization benchmark")
+    employee = Employee.objects.create(
+        employer=employer, full_name="Benchmark", email="serialization-benchmark@example.com",
+        salary=Decimal("100000.00"), password="!")
+    now = timezone.now()
+    requests = []
+    for _ in range(rows):
+        requested = now - timedelta(seconds=rng.randrange(10 ** 7), microseconds=rng.randrange(10 ** 6))
+        approved = rng.random() < 0.7
+        requests.append(SalaryAdvanceRequest(
+            employee=employee, amount_requested=Decimal(rng.randrange(100, 100000)) / 100,
+            status=SalaryAdvanceRequest.APPROVED if approved else SalaryAdvanceRequest.PENDING,
+            request_date=requested, review_date=requested + timedelta(hours=3) if approved else None))
+    SalaryAdvanceRequest.objects.bulk_create(requests, batch_size=5000)
+    Transaction.objects.bulk_create(
+        [Transaction(request=request, amount=request.amount_requested) for request in requests], batch_size=5000)
+    return employee
+
+
+def best_ms(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return min(samples)
+
+
+def peak_kib(func):
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    with transaction.atomic():
+        employee = seed(args.rows, random.Random(0))
+        payloads = {
+            "transactions": (
+                serializers.TRANSACTION, Transaction.objects.filter(request__employee=employee)),
+            "salary_advance_requests": (
+                serializers.SALARY_ADVANCE_REQUEST, SalaryAdvanceRequest.objects.filter(employee=employee)),
+        }
+        print(f"{'payload':<24}  {'encoder':<26}  {'fetch ms':>8}  {'encode ms':>9}  {'peak KiB':>9}  {'bytes':>8}")
+        for key, (schema, queryset) in payloads.items():
+            encoders = {
+                "values() + JsonResponse": (
+                    lambda: list(queryset.values(*schema.names)),
+                    lambda rows: JsonResponse({key: rows}).content),
+                "values() + orjson": (
+                    lambda: list(queryset.values(*schema.names)),
+                    lambda rows: serializers.dumps({key: rows})),
+                "Schema + orjson": (
+                    lambda: list(schema.rows(queryset)),
+                    lambda rows: serializers.dumps({key: schema.dump_many(rows)})),
+            }
+            expected = None
+            for name, (fetch, encode) in encoders.items():
+                rows = fetch()
+                body = encode(rows)
+                decoded = json.loads(body)
+                if expected is None:
+                    expected = decoded
+                elif decoded != expected:
+                    raise SystemExit(f"{name} output differs from JsonResponse for {key}")
+                fetch_ms = best_ms(fetch, args.repeat)
+                encode_ms = best_ms(lambda: encode(rows), args.repeat)
+                peak = peak_kib(lambda: encode(fetch()))
+                print(f"{key:<24}  {name:<26}  {fetch_ms:8.2f}  {encode_ms:9.2f}  {peak:9.0f}  {len(body):8}")
+        transaction.set_rollback(True)
+
+
+if __name__ == "__main__":
+    main()
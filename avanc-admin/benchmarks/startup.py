@@ -0,0 +1,185 @@
+"""Measure how fast the uWSGI service starts and how much memory its workers use.
+
+Starts uWSGI from ``uwsgi/uwsgi.ini`` on a local port, without the container's
+user, paths and static maps, once per ``--mode``:
+
+- ``preload``: the ini as shipped; the master loads the application and forks
+  the workers;
+- ``lazy``: with ``lazy-apps``, every worker loads the application itself.
+
+For each it reports the time from spawning uWSGI to the first 200 from
+``/ready`` and until every worker has answered a request, then the memory of
+the master and the workers after ``--requests`` requests to ``--path``, from
+``/proc/<pid>/smaps_rollup``: RSS, PSS (shared pages split between the
+processes sharing them) and USS (private pages, what a worker really costs).
+Linux only; needs a migrated database configured in the environment.
+
+    python -m benchmarks.startup [--mode preload --mode lazy] [--processes 4]
+        [--path /api/v1/employees/] [--requests 200] [--json results.json]
+"""
+import argparse
+import json
+import os
+import signal
+import socket
+import subprocess
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parent.parent
+INI = APP_DIR / "uwsgi" / "uwsgi.ini"
+# Container specifics the benchmark replaces.
+DROPPED = {"socket", "protocol", "uid", "gid", "chdir", "static-map", "lazy-apps", "processes", "threads"}
+
+
+def write_ini(path, port, mode, processes, threads):
+    lines = ["[uwsgi]"]
+    for line in INI.read_text().splitlines():
+        key = line.split("=", 1)[0].strip()
+        if "=" in line and not line.lstrip().startswith("#") and key not in DROPPED:
+            lines.append(line)
+    lines += [
+        f"http-socket = 127.0.0.1:{port}",
+        f"chdir = {APP_DIR}",
+        f"processes = {processes}",
+        f"threads = {threads}",
+        "disable-logging = true",
+    ]
+    if mode == "lazy":
+        lines.append("lazy-apps = true")
+    path.write_text("\n".join(lines) + "\n")
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def get(url):
+    try:
+        with urllib.request.urlopen(url, timeout=5) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as error:
+        return error.code, error.read()
+    except OSError:
+        return None, b""
+
+
+def children(pid):
+    found = []
+    for entry in Path("/proc").iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            stat = (entry / "stat").read_text()
+        except OSError:
+            continue
+        # The command name may contain spaces; the fields after it do not.
+        if int(stat.rsplit(")", 1)[1].split()[1]) == pid:
+            found.append(int(entry.name))
+    return sorted(found)
+
+
+def memory_kib(pid):
+    fields = {}
+    for line in Path(f"/proc/{pid}/smaps_rollup").read_text().splitlines()[1:]:
+        name, value = line.split(":", 1)
+        fields[name] = int(value.split()[0])
+    return {
+        "rss": fields["Rss"],
+        "pss": fields["Pss"],
+        "uss": fields["Private_Clean"] + fields["Private_Dirty"],
+    }
+
+
+def run(mode, args):
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    with tempfile.TemporaryDirectory() as tmp:
+        ini = Path(tmp) / "uwsgi.ini"
+        write_ini(ini, port, mode, args.processes, args.threads)
+        log_path = Path(tmp) / "uwsgi.log"
+        env = {"UWSGI_HARAKIRI": "60", **os.environ}
+        with open(log_path, "wb") as log:
+            start = time.perf_counter()
+            master = subprocess.Popen(["uwsgi", "--strict", "--ini", str(ini)], stdout=log, stderr=log, env=env)
+            try:
+                return measure(mode, master, base, start, args)
+            except SystemExit:
+                print(log_path.read_text())
+                raise
+            finally:
+                master.send_signal(signal.SIGTERM)
+                master.wait(timeout=30)
+
+
+def measure(mode, master, base, start, args):
+    deadline = start + args.timeout
+    while True:
+        if master.poll() is not None:
+            raise SystemExit(f"{mode}: uwsgi exited with {master.returncode}")
+        if time.perf_counter() > deadline:
+            raise SystemExit(f"{mode}: /ready did not answer 200 within {args.timeout}s")
+        status, _ = get(base + "/ready")
+        if status == 200:
+            first_ready = time.perf_counter() - start
+            break
+        time.sleep(0.01)
+
+    # Concurrent probes until every worker has answered one.
+    workers = set(children(master.pid))
+    answered = set()
+    with ThreadPoolExecutor(args.processes * args.threads) as pool:
+        while answered != workers:
+            if time.perf_counter() > deadline:
+                raise SystemExit(f"{mode}: only {len(answered)} of {len(workers)} workers answered /ready")
+            for status, body in pool.map(lambda _: get(base + "/ready"), range(args.processes * args.threads)):
+                if status == 200:
+                    answered.add(json.loads(body)["pid"])
+        all_ready = time.perf_counter() - start
+
+        for status, _ in pool.map(lambda _: get(base + args.path), range(args.requests)):
+            if status != 200:
+                raise SystemExit(f"{mode}: GET {args.path} answered {status}")
+    return {
+        "mode": mode,
+        "first_ready_s": round(first_ready, 3),
+        "all_workers_ready_s": round(all_ready, 3),
+        "master": memory_kib(master.pid),
+        "workers": [memory_kib(pid) for pid in sorted(workers)],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mode", action="append", choices=["preload", "lazy"])
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--path", default="/api/v1/employees/")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    results = [run(mode, args) for mode in args.mode or ["preload", "lazy"]]
+    print(f"{'mode':<8}  {'first /ready s':>14}  {'all workers s':>13}  "
+          f"{'master RSS MiB':>14}  {'worker RSS MiB':>14}  {'worker PSS MiB':>14}  {'worker USS MiB':>14}")
+    for result in results:
+        workers = result["workers"]
+
+        def mean(key):
+            return sum(worker[key] for worker in workers) / len(workers) / 1024
+
+        print(f"{result['mode']:<8}  {result['first_ready_s']:14.3f}  {result['all_workers_ready_s']:13.3f}  "
+              f"{result['master']['rss'] / 1024:14.1f}  {mean('rss'):14.1f}  {mean('pss'):14.1f}  {mean('uss'):14.1f}")
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
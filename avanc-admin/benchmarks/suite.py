@@ -0,0 +1,311 @@
+"""Reproducible load benchmark of the ``/api/v1/`` endpoints.
+
+Seeds a synthetic dataset (see ``benchmarks.seed``), drives a weighted mix of
+listing, detail, salary advance, sign-in and sign-up requests against a
+server, and reports throughput, p50/p95/p99 latency and the mean number of
+SQL queries per request for every endpoint. Queries are counted by replaying
+``--query-samples`` requests per endpoint in-process with the test client.
+
+Without ``--url`` the suite serves the project itself from a threaded WSGI
+server on a free local port. The seeded rows are deleted afterwards unless
+``--keep-data`` is given; ``--no-seed`` reuses the employees already in the
+database, which then must have been seeded with ``--password``.
+
+    python -m benchmarks.suite --employees 10000 --duration 30 --json results/$(git rev-parse --short HEAD).json
+    python -m benchmarks.suite ... --compare results/<previous>.json
+"""
+import argparse
+import json
+import random
+import subprocess
+import threading
+import uuid
+from collections import Counter, defaultdict
+from datetime import datetime, timezone as dt_timezone
+
+from benchmarks import setup_django
+from benchmarks import seed
+from benchmarks.load_test import run_load
+
+setup_django()
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth.hashers import make_password  # noqa: E402
+from django.core.handlers.wsgi import WSGIHandler  # noqa: E402
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+
+from employees.models import Employee, Employer  # noqa: E402
+from employees.tokens import issue_tokens  # noqa: E402
+
+# Relative weights of the endpoints in the mixed traffic.
+DEFAULT_WEIGHTS = {
+    "list employees": 15,
+    "list employees (filtered, next page)": 5,
+    "employee detail": 40,
+    "salary advances": 15,
+    "create salary advance": 10,
+    "sign-in": 10,
+    "sign-up": 5,
+}
+
+
+class Traffic:
+    """Builds ``(name, method, path, body, headers)`` requests for the mix."""
+
+    def __init__(self, employees, employer_names, password, weights):
+        self.employees = employees
+        self.employer_names = employer_names
+        self.password = password
+        self.names = [name for name, weight in weights.items() if weight > 0]
+        self.weights = [weights[name] for name in self.names]
+        self.cursors = []
+
+    def __call__(self, rng):
+        name = rng.choices(self.names, self.weights)[0]
+        return (name,) + self.build(name, rng)
+
+    def build(self, name, rng):
+        """``(method, path, body, headers)`` of one request to ``name``."""
+        handler = name.split(" (")[0].replace(" ", "_").replace("-", "_")
+        return getattr(self, "_" + handler)(name, rng)
+
+    def _auth(self, employee):
+        return {"Authorization": f"Bearer {employee['token']}"}
+
+    def _json(self, payload, headers=None):
+        return json.dumps(payload), {**(headers or {}), "Content-Type": "application/json"}
+
+    def _list_employees(self, name, rng):
+        if name == "list employees":
+            return "GET", "/api/v1/employees/?page_size=50", None, {}
+        employee = rng.choice(self.employees)
+        path = f"/api/v1/employees/?page_size=50&city={employee['city']}&employer={employee['employer_id']}"
+        if self.cursors:
+            path += f"&cursor={rng.choice(self.cursors)}"
+        return "GET", path, None, {}
+
+    def _employee_detail(self, name, rng):
+        employee = rng.choice(self.employees)
+        return "GET", f"/api/v1/employees/{employee['id']}", None, self._auth(employee)
+
+    def _salary_advances(self, name, rng):
+        employee = rng.choice(self.employees)
+        return "GET", f"/api/v1/employees/{employee['id']}/salary-advances", None, self._auth(employee)
+
+    def _create_salary_advance(self, name, rng):
+        employee = rng.choice(self.employees)
+        body, headers = self._json({"amount_requested": "1.00"}, self._auth(employee))
+        return "POST", f"/api/v1/employees/{employee['id']}/salary-advances", body, headers
+
+    def _sign_in(self, name, rng):
+        employee = rng.choice(self.employees)
+        body, headers = self._json({"email": employee["email"], "password": self.password})
+        return "POST", "/api/v1/signin/", body, headers
+
+    def _sign_up(self, name, rng):
+        body, headers = self._json({
+            "email": f"signup-{uuid.uuid4().hex}@example.com",
+            "password": self.password,
+            "full_name": "Benchmark Signup",
+            "salary": 5000,
+            "employer_name": rng.choice(self.employer_names),
+        })
+        return "POST", "/api/v1/signup/", body, headers
+
+
+def load_employees(employer_ids, count):
+    employees = Employee.objects.order_by("?")
+    if employer_ids is not None:
+        employees = employees.filter(employer_id__in=employer_ids)
+    rows = list(employees.values("id", "email", "city", "employer_id")[:count])
+    if not rows:
+        raise SystemExit("No employees found; run without --no-seed.")
+    for row in rows:
+        row["id"], row["employer_id"] = str(row["id"]), str(row["employer_id"])
+        row["token"] = issue_tokens(row["id"])["access"]
+    return rows
+
+
+def first_page_cursors(count):
+    """``next_cursor`` values of the first listing pages, for realistic page-2+ reads."""
+    client, cursors, path = Client(), [], "/api/v1/employees/?page_size=50"
+    for _ in range(count):
+        cursor = client.get(path).json().get("next_cursor")
+        if not cursor:
+            break
+        cursors.append(cursor)
+        path = f"/api/v1/employees/?page_size=50&cursor={cursor}"
+    return cursors
+
+
+def count_queries(traffic, samples, seed_value=0):
+    """Mean queries per request for each endpoint, replayed in-process."""
+    rng = random.Random(seed_value)
+    client = Client()
+    counts = defaultdict(list)
+    for name in traffic.names:
+        for _ in range(samples):
+            method, path, body, headers = traffic.build(name, rng)
+            extra = {"HTTP_" + key.upper().replace("-", "_"): value
+                     for key, value in headers.items() if key != "Content-Type"}
+            with CaptureQueriesContext(connection) as queries:
+                if method == "GET":
+                    client.get(path, **extra)
+                else:
+                    client.post(path, data=body, content_type="application/json", **extra)
+            counts[name].append(len(queries))
+    return {name: round(sum(values) / len(values), 2) for name, values in counts.items()}
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_in_thread():
+    """Serve the project on a free port; returns ``(base url, server)``."""
+    server = ThreadedWSGIServer(("127.0.0.1", 0), QuietHandler, allow_reuse_address=True)
+    server.set_app(WSGIHandler())
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}", server
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(endpoints, previous=None):
+    header = f"{'endpoint':<38} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'queries':>8} {'non-2xx':>8}"
+    if previous:
+        header += f" {'Δ p95':>8} {'Δ req/s':>8}"
+    print(header)
+    for name, stats in endpoints.items():
+        cells = [f"{stats['rps']:8.1f}"]
+        for key in ("p50_ms", "p95_ms", "p99_ms"):
+            cells.append(f"{stats[key]:8.2f}" if stats[key] is not None else f"{'-':>8}")
+        queries = stats.get("queries_per_request")
+        cells.append(f"{queries:8.2f}" if queries is not None else f"{'-':>8}")
+        cells.append(f"{stats.get('non_2xx', 0):8d}")
+        old = (previous or {}).get(name)
+        if previous:
+            if old and old.get("p95_ms") and stats["p95_ms"] is not None:
+                cells.append(f"{(stats['p95_ms'] - old['p95_ms']) / old['p95_ms']:+8.0%}")
+            else:
+                cells.append(f"{'-':>8}")
+            cells.append(f"{(stats['rps'] - old['rps']) / old['rps']:+8.0%}" if old and old["rps"] else f"{'-':>8}")
+        print(f"{name:<38} " + " ".join(cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    seed.add_arguments(parser)
+    parser.add_argument("--no-seed", action="store_true", help="Reuse the employees already in the database.")
+    parser.add_argument("--keep-data", action="store_true", help="Do not delete the seeded rows at the end.")
+    parser.add_argument("--password", default="benchmark-password",
+                        help="Password of the seeded employees, used by the sign-in traffic.")
+    parser.add_argument("--url", help="Server to drive; defaults to an in-process threaded WSGI server.")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--warmup", type=float, default=5)
+    parser.add_argument("--sample-employees", type=int, default=1000,
+                        help="Distinct employees the traffic is spread over.")
+    parser.add_argument("--query-samples", type=int, default=20,
+                        help="Requests per endpoint replayed to count queries.")
+    parser.add_argument("--weight", action="append", default=[], metavar="ENDPOINT=N",
+                        help=f"Override a traffic weight; endpoints: {', '.join(DEFAULT_WEIGHTS)}.")
+    parser.add_argument("--rate-limits", action="store_true",
+                        help="Keep the sign-in and salary advance rate limits of the in-process server on.")
+    parser.add_argument("--json", help="Write the results to this file.")
+    parser.add_argument("--compare", help="Previous --json results to print deltas against.")
+    args = parser.parse_args()
+
+    settings.ALLOWED_HOSTS = ["*"]
+    # All traffic comes from one address; measure the endpoints, not the limiter.
+    settings.RATE_LIMIT_ENABLED = args.rate_limits
+    weights = dict(DEFAULT_WEIGHTS)
+    for override in args.weight:
+        name, _, value = override.rpartition("=")
+        if name not in weights:
+            parser.error(f"Unknown endpoint {name!r}")
+        weights[name] = int(value)
+
+    summary, employer_ids = None, None
+    if not args.no_seed:
+        print(f"Seeding {args.employees} employees...")
+        summary = seed.seed_dataset(
+            password=make_password(args.password), log=lambda message: None, **seed.options(args))
+        employer_ids = summary["employers"]
+        print(f"Seeded in {summary['seconds']}s (tag {summary['tag']}).")
+
+    server = None
+    try:
+        employers = Employer.objects.all()
+        if employer_ids is not None:
+            employers = employers.filter(pk__in=employer_ids)
+        employer_names = list(employers.values_list("name", flat=True)[:1000])
+        traffic = Traffic(
+            load_employees(employer_ids, args.sample_employees), employer_names, args.password, weights)
+        traffic.cursors = first_page_cursors(20)
+
+        print("Counting queries per request...")
+        queries = count_queries(traffic, args.query_samples)
+
+        url = args.url
+        if url is None:
+            url, server = serve_in_thread()
+        statuses = defaultdict(Counter)
+        lock = threading.Lock()
+
+        def on_response(name, status, headers):
+            with lock:
+                statuses[name][status] += 1
+
+        print(f"Driving {url} with {args.concurrency} clients for {args.duration}s...")
+        started = datetime.now(dt_timezone.utc)
+        endpoints = run_load(url, traffic, args.concurrency, args.duration, args.warmup, on_response)
+        for name, stats in endpoints.items():
+            stats["queries_per_request"] = queries.get(name)
+            stats["non_2xx"] = sum(
+                count for status, count in statuses.get(name, {}).items() if not 200 <= status < 300)
+            stats["statuses"] = {str(status): count for status, count in sorted(statuses.get(name, {}).items())}
+        endpoints["overall"]["non_2xx"] = sum(stats["non_2xx"] for stats in endpoints.values())
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+        if summary is not None and not args.keep_data:
+            print("Deleting the seeded rows...")
+            Employer.objects.filter(pk__in=employer_ids).delete()
+
+    previous = None
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)["endpoints"]
+    print()
+    print_report(endpoints, previous)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                "commit": git_commit(),
+                "started": started.isoformat(),
+                "url": args.url or "in-process",
+                "dataset": {key: value for key, value in (summary or {}).items()
+                            if key in ("employees", "requests", "transactions")},
+                "config": {"concurrency": args.concurrency, "duration": args.duration,
+                           "warmup": args.warmup, "weights": weights, **seed.options(args)},
+                "endpoints": endpoints,
+            }, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,7 @@ INSTALLED_APPS = [
     "django.contrib.contenttypes",
     "django.contrib.sessions",
     "django.contrib.messages",
+    "django.contrib.postgres",
     "corsheaders",
     "django.contrib.staticfiles",
     "employees.apps.EmployeesConfig",
@@ -0,0 +1,37 @@
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+import os
+
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'avanc',
+        }
+    }
+
+# Seconds a cached EmployeeDetailApi response may be served for.
+EMPLOYEE_DETAIL_CACHE_TIMEOUT = int(os.environ.get('EMPLOYEE_DETAIL_CACHE_TIMEOUT', 300))
+
+# Token buckets of employees.ratelimit: name -> (capacity, seconds to refill it).
+RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', 'True') == 'True'
+RATE_LIMITS = {
+    'sign_in_ip': (20, 60),
+    'sign_in_email': (5, 300),
+    'advance_employee': (5, 60),
+    'advance_ip': (60, 60),
+}
+# META key holding the client address set by the proxy, e.g. HTTP_X_REAL_IP
+# behind nginx; REMOTE_ADDR is used when unset.
+RATE_LIMIT_CLIENT_IP_HEADER = os.environ.get('RATE_LIMIT_CLIENT_IP_HEADER') or None
+
+# Seconds a response is replayed for a repeated Idempotency-Key.
+IDEMPOTENCY_KEY_TIMEOUT = int(os.environ.get('IDEMPOTENCY_KEY_TIMEOUT', 24 * 60 * 60))
+
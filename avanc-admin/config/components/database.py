@@ -10,8 +10,38 @@ DATABASES = {
         'PASSWORD': os.environ.get('DB_PASSWORD'),
         'HOST': os.environ.get('DB_HOST', '127.0.0.1'),
         'PORT': os.environ.get('DB_PORT', 5432),
+        # Persistent connections for the threaded uWSGI workers. Under ASGI
+        # every request runs its ORM calls in a fresh thread, so persistent
+        # connections are never reused there: set DB_CONN_MAX_AGE=0 and let
+        # pgbouncer pool them instead.
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': True,
+        # Server-side cursors (QuerySet.iterator()) do not survive
+        # pgbouncer's transaction pooling.
+        'DISABLE_SERVER_SIDE_CURSORS': os.environ.get('DB_DISABLE_SERVER_SIDE_CURSORS', False) == 'True',
         'OPTIONS': {
             'options': '-c search_path=public,fintech'
         }
     }
 }
+
+# Read replicas: DB_REPLICA_HOSTS=host[:port],... adds one alias per host
+# with the primary's credentials. employees.db_router sends the reads of
+# GET requests and reporting commands there; tests use the primary.
+REPLICA_DATABASES = []
+for _number, _address in enumerate(filter(None, os.environ.get('DB_REPLICA_HOSTS', '').split(',')), 1):
+    _host, _, _port = _address.strip().partition(':')
+    REPLICA_DATABASES.append(f'replica_{_number}')
+    DATABASES[f'replica_{_number}'] = {
+        **DATABASES['default'],
+        'HOST': _host,
+        'PORT': _port or DATABASES['default']['PORT'],
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['employees.db_router.ReplicaRouter']
+# Replicas further behind than this are skipped until they catch up.
+REPLICA_MAX_LAG_SECONDS = float(os.environ.get('REPLICA_MAX_LAG_SECONDS', 5))
+REPLICA_LAG_CHECK_SECONDS = float(os.environ.get('REPLICA_LAG_CHECK_SECONDS', 2))
+# After a write, the client reads from the primary for this long.
+READ_YOUR_WRITES_SECONDS = int(os.environ.get('READ_YOUR_WRITES_SECONDS', 10))
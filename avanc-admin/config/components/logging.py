@@ -0,0 +1,33 @@
+# Logging
+# https://docs.djangoproject.com/en/4.2/topics/logging/
+import os
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'plain': {
+            'format': '%(asctime)s %(levelname)s %(name)s %(message)s',
+        },
+    },
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'plain',
+        },
+    },
+    'loggers': {
+        'employees': {
+            'handlers': ['console'],
+            'level': os.environ.get('LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+    },
+}
+
+# Per-request SQL instrumentation (employees.middleware.QueryInstrumentationMiddleware).
+# Share of requests that are measured, from 0 to 1.
+QUERY_INSTRUMENTATION_SAMPLE_RATE = float(os.environ.get('QUERY_INSTRUMENTATION_SAMPLE_RATE', 0.05))
+# A measured request over either threshold logs a warning naming its view.
+QUERY_COUNT_WARNING_THRESHOLD = int(os.environ.get('QUERY_COUNT_WARNING_THRESHOLD', 20))
+QUERY_TIME_WARNING_MS = float(os.environ.get('QUERY_TIME_WARNING_MS', 200))
@@ -10,8 +10,10 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+from datetime import timedelta
 from pathlib import Path
 import os
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 from split_settings.tools import include
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -21,6 +23,8 @@ load_dotenv()
 
 include(
     "components/database.py",
+    "components/cache.py",
+    "components/logging.py",
     "components/apps.py",
 )
 
@@ -45,12 +49,16 @@ CORS_ALLOWED_ORIGINS = [
 CORS_ALLOW_CREDENTIALS = True
 
 MIDDLEWARE = [
+    "employees.middleware.MetricsMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "employees.middleware.QueryInstrumentationMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "employees.middleware.TokenAuthenticationMiddleware",
+    "employees.middleware.ReplicaMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -78,6 +86,32 @@ TEMPLATES = [
 WSGI_APPLICATION = "config.wsgi.application"
 
 
+# Employee API tokens (see employees/tokens.py).
+ACCESS_TOKEN_LIFETIME = timedelta(minutes=int(os.environ.get('ACCESS_TOKEN_LIFETIME_MINUTES', 15)))
+REFRESH_TOKEN_LIFETIME = timedelta(days=int(os.environ.get('REFRESH_TOKEN_LIFETIME_DAYS', 7)))
+TOKEN_REVOCATION_CACHE_SIZE = 10000
+TOKEN_AUTH_PROTECTED_ROUTES = ['api/v1/employees/<uuid:pk>']
+# Key signing the tokens. Anyone who knows it can forge a token for any
+# employee, so it only ever comes from the environment.
+TOKEN_SIGNING_KEY = os.environ.get('TOKEN_SIGNING_KEY')
+if not TOKEN_SIGNING_KEY:
+    raise ImproperlyConfigured("TOKEN_SIGNING_KEY must be set to a long random secret.")
+
+# Serve the per-employee API routes with the async views in
+# employees/api/v1/async_views.py (for ASGI deployments).
+ASYNC_API_VIEWS = os.environ.get('ASYNC_API_VIEWS', False) == 'True'
+
+# Processes the outbox worker uses to hash the passwords of queued imports.
+ONBOARDING_HASH_WORKERS = int(os.environ.get('ONBOARDING_HASH_WORKERS', os.cpu_count() or 1))
+# Largest upload POST /employees/import hashes within the request; larger
+# ones are queued for the outbox worker.
+ONBOARDING_INLINE_MAX_ROWS = int(os.environ.get('ONBOARDING_INLINE_MAX_ROWS', 50))
+
+# pg_trgm word similarity (0 to 1) an employee search match must reach; lower
+# values tolerate more typos (see employees/services/search.py).
+EMPLOYEE_SEARCH_THRESHOLD = float(os.environ.get('EMPLOYEE_SEARCH_THRESHOLD', 0.4))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -17,7 +17,11 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from employees.api.v1.views import MetricsApi, ReadinessApi
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path('api/', include('employees.api.urls')),
+    path('metrics', MetricsApi.as_view(), name='metrics'),
+    path('ready', ReadinessApi.as_view(), name='ready'),
 ]
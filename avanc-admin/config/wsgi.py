@@ -7,6 +7,7 @@ For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/wsgi/
 """
 
+import gc
 import os
 
 from django.core.wsgi import get_wsgi_application
@@ -14,3 +15,12 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
 
 application = get_wsgi_application()
+
+# uWSGI loads this file in the master, before forking the workers: import
+# everything requests need now, then move it out of the garbage collector's
+# reach so that collections in the workers do not write to (and unshare) the
+# inherited pages.
+from employees.readiness import warm_up  # noqa: E402
+
+warm_up()
+gc.freeze()
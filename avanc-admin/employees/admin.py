@@ -1,32 +1,140 @@
-from django.contrib import admin
+from collections import Counter
+
+from django.contrib import admin, messages
+from django.contrib.admin.views.main import SEARCH_VAR
+from django.utils import timezone
 
 # Register your models here.
-from .models import Employee, Employer, SalaryAdvanceRequest, Transaction
+from .models import (
+    Disbursement, DisbursementBatch, Employee, Employer, OutboxEvent, PayrollSettlement, SalaryAdvanceRequest,
+    SettlementLine, Transaction)
 from .forms.salary_advance import SalaryAdvanceRequestForm
+from .services import search
+from .services.salary_advance import APPROVE, OVER_CAP, REJECT, review_salary_advances
 
 
 @admin.register(Employee)
 class EmployeeAdmin(admin.ModelAdmin):
     list_display = ("full_name", "employer", "salary", "available_amount", "email", "phone")
+    list_select_related = ("employer",)
 
     list_filter = ("employer",)
-    search_fields = ("full_name", "employer")
+    # Shows the search box; get_search_results matches the name, email and
+    # employer name with the trigram search instead of ILIKE scans.
+    search_fields = ("full_name", "email", "employer__name")
+    search_limit = 500
+
+    def _search_query(self, request):
+        query = search.normalize(request.GET.get(SEARCH_VAR, ""))
+        return query if len(query) >= search.MIN_QUERY_LENGTH else None
+
+    def get_queryset(self, request):
+        # available_amount reads the annotation instead of querying per row.
+        queryset = self.model._default_manager.get_queryset().with_current_month_advances()
+        # Annotated before get_ordering's "-search_rank" is applied; only the
+        # matches kept by get_search_results are ranked.
+        query = self._search_query(request)
+        if query:
+            queryset = queryset.annotate(search_rank=search.rank(query))
+        ordering = self.get_ordering(request)
+        if ordering:
+            queryset = queryset.order_by(*ordering)
+        return queryset
+
+    def get_search_results(self, request, queryset, search_term):
+        query = search.normalize(search_term)
+        if len(query) < search.MIN_QUERY_LENGTH:
+            return super().get_search_results(request, queryset, query)
+        matches = search.search_employees(query, queryset, self.search_limit)
+        return queryset.filter(pk__in=[pk for pk, _ in matches]), False
+
+    def get_ordering(self, request):
+        if self._search_query(request):
+            return ("-search_rank", "full_name")
+        return super().get_ordering(request)
 
 
 @admin.register(Employer)
-class EmployeeAdmin(admin.ModelAdmin):
+class EmployerAdmin(admin.ModelAdmin):
     list_display = ("name", "contact_email",)
     list_filter = ("name",)
     search_fields = ("name",)
 
 
 @admin.register(SalaryAdvanceRequest)
-class EmployeeAdmin(admin.ModelAdmin):
+class SalaryAdvanceRequestAdmin(admin.ModelAdmin):
     form = SalaryAdvanceRequestForm
 
     list_display = ("employee", "amount_requested",
                     "status", "request_date", "review_date")
+    list_select_related = ("employee",)
 
     list_filter = ("status", "request_date")
 
-    search_fields = ("employee", "status",)
+    search_fields = ("employee__full_name", "status",)
+    actions = ("approve_selected", "reject_selected")
+
+    @admin.action(description="Approve selected pending requests")
+    def approve_selected(self, request, queryset):
+        self._review(request, queryset, APPROVE)
+
+    @admin.action(description="Reject selected pending requests")
+    def reject_selected(self, request, queryset):
+        self._review(request, queryset, REJECT)
+
+    def _review(self, request, queryset, action):
+        results = review_salary_advances(list(queryset.values_list("pk", flat=True)), action)
+        counts = Counter(result["status"] for result in results)
+        summary = ", ".join(f"{count} {status.replace('_', ' ')}" for status, count in sorted(counts.items()))
+        level = messages.WARNING if counts.get(OVER_CAP) else messages.SUCCESS
+        self.message_user(request, f"Reviewed {len(results)} requests: {summary}.", level)
+
+
+@admin.register(PayrollSettlement)
+class PayrollSettlementAdmin(admin.ModelAdmin):
+    list_display = ("employer", "month", "employee_count", "deductions_total", "transactions_total", "modified")
+    list_select_related = ("employer",)
+
+    list_filter = ("month",)
+    search_fields = ("employer__name",)
+    readonly_fields = [field.name for field in PayrollSettlement._meta.fields]
+
+
+@admin.register(SettlementLine)
+class SettlementLineAdmin(admin.ModelAdmin):
+    list_display = ("employee", "settlement", "advances_count", "advances_total", "deduction")
+    list_select_related = ("employee", "settlement__employer")
+
+    list_filter = ("settlement__month",)
+    search_fields = ("employee__full_name", "settlement__employer__name")
+    raw_id_fields = ("employee", "settlement")
+
+
+@admin.register(OutboxEvent)
+class OutboxEventAdmin(admin.ModelAdmin):
+    list_display = ("topic", "status", "attempts", "available_at", "processed_at", "created")
+    list_filter = ("status", "topic")
+    readonly_fields = ("topic", "payload", "attempts", "processed_at", "last_error")
+    actions = ("retry_selected",)
+
+    @admin.action(description="Retry selected events now")
+    def retry_selected(self, request, queryset):
+        count = queryset.exclude(status=OutboxEvent.DONE).update(
+            status=OutboxEvent.PENDING, attempts=0, available_at=timezone.now())
+        self.message_user(request, f"{count} event(s) queued again.")
+
+
+@admin.register(Disbursement)
+class DisbursementAdmin(admin.ModelAdmin):
+    list_display = ("employee", "bank_name", "bank_account", "amount", "batch", "created")
+    list_select_related = ("employee", "batch")
+    list_filter = ("bank_name", ("batch", admin.EmptyFieldListFilter))
+    search_fields = ("employee__full_name", "bank_account")
+    raw_id_fields = ("employee", "request", "batch")
+
+
+@admin.register(DisbursementBatch)
+class DisbursementBatchAdmin(admin.ModelAdmin):
+    list_display = ("bank_name", "file_format", "disbursement_count", "total_amount", "file_name", "created")
+    list_filter = ("bank_name", "file_format")
+    readonly_fields = ("bank_name", "file_format", "file_name", "disbursement_count", "total_amount")
@@ -0,0 +1,165 @@
+"""Async versions of the per-employee API views.
+
+They keep the URLs, payloads and status codes of their counterparts in
+``views`` but read through Django's async ORM, so an ASGI worker keeps
+serving other requests while it waits on Postgres. The salary advance
+creation runs the locking service in a worker thread, since
+``select_for_update`` needs a transaction and those are sync-only in Django.
+Enabled with ``ASYNC_API_VIEWS``.
+"""
+import json
+from decimal import Decimal
+
+from asgiref.sync import sync_to_async
+from django.db import DEFAULT_DB_ALIAS
+from django.http import JsonResponse
+from django.views import View
+
+from employees import cache as detail_cache
+from employees import idempotency, ratelimit
+from employees.api.v1 import serializers
+from employees.api.v1.views import cached_detail_response, employee_detail
+from employees.models import Employee, SalaryAdvanceRequest, Transaction
+from employees.services.salary_advance import create_salary_advance
+
+
+class AsyncApiView(View):
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # csrf_exempt() would hide the coroutine function from the handler
+        # in Django 4.2, so mark the view directly.
+        view = super().as_view(**initkwargs)
+        view.csrf_exempt = True
+        return view
+
+
+class AsyncEmployeeDetailApi(AsyncApiView):
+    http_method_names = ['get', 'post', 'put']
+
+    async def get(self, request, *args, **kwargs):
+        employee_id = kwargs.get('pk')
+        entry = await detail_cache.aget_detail(employee_id)
+        cache_status = "HIT"
+        if entry is None:
+            cache_status = "MISS"
+            try:
+                employee = await (
+                    Employee.objects.using(DEFAULT_DB_ALIAS).with_current_month_advances().aget(pk=employee_id))
+            except Employee.DoesNotExist:
+                return JsonResponse({"error": "Employee not found"}, status=404)
+            entry = await detail_cache.aset_detail(employee_id, serializers.dumps(employee_detail(employee)))
+        return cached_detail_response(request, entry, cache_status)
+
+    async def post(self, request, *args, **kwargs):
+        try:
+            data = json.loads(request.body)
+            employee = await Employee.objects.acreate(**data)
+            return JsonResponse({"id": employee.id}, status=201)
+        except Exception as e:
+            return JsonResponse({"error": str(e)}, status=400)
+
+    async def put(self, request, *args, **kwargs):
+        employee_id = kwargs.get('pk')
+        try:
+            employee = await Employee.objects.aget(pk=employee_id)
+            data = json.loads(request.body)
+            for key, value in data.items():
+                setattr(employee, key, value)
+            await employee.asave()
+            return JsonResponse({"id": employee.id})
+        except Employee.DoesNotExist:
+            return JsonResponse({"error": "Employee not found"}, status=404)
+        except Exception as e:
+            return JsonResponse({"error": str(e)}, status=400)
+
+
+class AsyncEmployeeTransactionsApi(AsyncApiView):
+    http_method_names = ['get', 'post']
+
+    async def get(self, request, *args, **kwargs):
+        employee_id = kwargs.get('pk')
+        if not await Employee.objects.filter(pk=employee_id).aexists():
+            return JsonResponse({"error": "Employee not found"}, status=404)
+        transactions = Transaction.objects.filter(request__employee_id=employee_id)
+        data = serializers.TRANSACTION.dump_many(
+            [row async for row in serializers.TRANSACTION.rows(transactions)])
+        return serializers.json_response({"transactions": data})
+
+    async def post(self, request, *args, **kwargs):
+        employee_id = kwargs.get('pk')
+        try:
+            employee = await Employee.objects.aget(pk=employee_id)
+            data = json.loads(request.body)
+            request_id = data.get('request_id')
+            amount = data.get('amount')
+            if not request_id or not amount:
+                return JsonResponse({"error": "Invalid data"}, status=400)
+            salary_request = await SalaryAdvanceRequest.objects.aget(
+                pk=request_id, employee=employee)
+            transaction = await Transaction.objects.acreate(
+                request=salary_request, amount=amount)
+            return JsonResponse({"id": transaction.id}, status=201)
+        except Employee.DoesNotExist:
+            return JsonResponse({"error": "Employee not found"}, status=404)
+        except SalaryAdvanceRequest.DoesNotExist:
+            return JsonResponse({"error": "Salary advance request not found"}, status=404)
+        except Exception as e:
+            return JsonResponse({"error": str(e)}, status=400)
+
+
+class AsyncEmployeeSalaryAdvanceRequestApi(AsyncApiView):
+    http_method_names = ['get', 'post']
+
+    async def get(self, request, *args, **kwargs):
+        employee_id = kwargs.get('pk')
+        if not await Employee.objects.filter(pk=employee_id).aexists():
+            return JsonResponse({"error": "Employee not found"}, status=404)
+        requests = SalaryAdvanceRequest.objects.filter(employee_id=employee_id)
+        data = serializers.SALARY_ADVANCE_REQUEST.dump_many(
+            [row async for row in serializers.SALARY_ADVANCE_REQUEST.rows(requests)])
+        return serializers.json_response({"salary_advance_requests": data})
+
+    async def post(self, request, *args, **kwargs):
+        employee_id = kwargs.get('pk')
+        key = request.headers.get(idempotency.HEADER)
+        scope = f'salary-advance:{employee_id}'
+        body_fingerprint = idempotency.fingerprint(request.body)
+        if key:
+            replay = await idempotency.aclaim(scope, key, body_fingerprint)
+            if replay is not None:
+                return replay
+        retry_after = await ratelimit.acheck(
+            [('advance_employee', employee_id), ('advance_ip', ratelimit.client_ip(request))])
+        if retry_after:
+            if key:
+                await idempotency.arelease(scope, key)
+            return ratelimit.too_many_requests(retry_after)
+
+        try:
+            response = await self.create(request, employee_id)
+        except BaseException:
+            if key:
+                await idempotency.arelease(scope, key)
+            raise
+        if key:
+            await idempotency.astore(scope, key, body_fingerprint, response)
+        return response
+
+    async def create(self, request, employee_id):
+        try:
+            data = json.loads(request.body)
+            amount_requested = data.get('amount_requested')
+
+            if not amount_requested:
+                return JsonResponse({"error": "Invalid data"}, status=400)
+
+            salary_request = await sync_to_async(create_salary_advance)(
+                employee_id, Decimal(str(amount_requested)))
+
+            return JsonResponse({"id": salary_request.id}, status=201)
+
+        except Employee.DoesNotExist:
+            return JsonResponse({"error": "Employee not found"}, status=404)
+        except Exception as e:
+            return JsonResponse({"error": str(e)}, status=400)
@@ -0,0 +1,177 @@
+import csv
+from datetime import datetime, time
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.views import View
+
+from employees.db_router import replica_reads
+from employees.models import Employee, SalaryAdvanceRequest, Transaction
+
+
+class Echo:
+    """File-like object whose ``write`` hands the value back to csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def buffered(chunks, size=64 * 1024):
+    """Join small encoded chunks into blocks of roughly ``size`` bytes."""
+    buffer, length = [], 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        length += len(chunk)
+        if length >= size:
+            yield "".join(buffer)
+            buffer, length = [], 0
+    if buffer:
+        yield "".join(buffer)
+
+
+def keyset_rows(queryset, date_field, lookups, chunk_size):
+    """Yield the ``lookups`` of ``queryset`` in ``(date_field, id)`` order.
+
+    Every chunk is its own query resuming after the last row of the previous
+    one, so no cursor or transaction stays open while the response streams.
+    Exports are reports: the chunks are read from a replica, even within the
+    client's read-your-writes window.
+    """
+    queryset = queryset.order_by(date_field, "id").values_list(*lookups, date_field, "id")
+    page = queryset
+    while True:
+        with replica_reads():
+            rows = list(page[:chunk_size])
+        for row in rows:
+            yield row[:-2]
+        if len(rows) < chunk_size:
+            return
+        last_date, last_id = rows[-1][-2:]
+        # date >= ... keeps the predicate sargable on the (date, id) order.
+        page = queryset.filter(
+            Q(**{f"{date_field}__gt": last_date}) | Q(id__gt=last_id), **{f"{date_field}__gte": last_date})
+
+
+def ndjson_rows(columns, rows):
+    encoder = DjangoJSONEncoder()
+    for row in rows:
+        yield encoder.encode(dict(zip(columns, row))) + "\n"
+
+
+def csv_rows(columns, rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+class BaseExportApi(View):
+    """Stream a filtered table as NDJSON (default) or CSV.
+
+    Rows are read ``chunk_size`` at a time by keyset pagination and encoded
+    as they arrive, so memory use does not depend on the export size, with or
+    without server-side cursors (which pgbouncer's transaction pooling rules
+    out).
+    Query parameters: ``format`` (``ndjson`` or ``csv``), ``employer`` and a
+    ``start`` (inclusive) / ``end`` (exclusive) date range on ``date_field``.
+    Restricted to staff users.
+    """
+    http_method_names = ['get']
+    chunk_size = 2000
+    name = None
+    model = None
+    # (column name, ORM lookup) pairs.
+    columns = ()
+    date_field = None
+    employer_lookup = None
+
+    formats = {
+        "ndjson": ("application/x-ndjson", ndjson_rows),
+        "csv": ("text/csv", csv_rows),
+    }
+
+    def get(self, request, *args, **kwargs):
+        if not request.user.is_staff:
+            return JsonResponse({"error": "Forbidden"}, status=403)
+        export_format = request.GET.get("format", "ndjson")
+        if export_format not in self.formats:
+            return JsonResponse({"error": "Invalid format"}, status=400)
+
+        filters = {}
+        for param, lookup in (("start", "gte"), ("end", "lt")):
+            if request.GET.get(param):
+                try:
+                    day = parse_date(request.GET[param])
+                except ValueError:
+                    day = None
+                if day is None:
+                    return JsonResponse({"error": f"Invalid {param} date"}, status=400)
+                filters[f"{self.date_field}__{lookup}"] = timezone.make_aware(
+                    datetime.combine(day, time.min))
+        if request.GET.get("employer"):
+            filters[self.employer_lookup] = request.GET["employer"]
+
+        try:
+            queryset = self.model.objects.filter(**filters)
+        except ValidationError:
+            return JsonResponse({"error": "Invalid employer"}, status=400)
+
+        names = [name for name, _ in self.columns]
+        rows = keyset_rows(
+            queryset, self.date_field, [lookup for _, lookup in self.columns], self.chunk_size)
+        content_type, encode = self.formats[export_format]
+        response = StreamingHttpResponse(buffered(encode(names, rows)), content_type=content_type)
+        response["Content-Disposition"] = f'attachment; filename="{self.name}.{export_format}"'
+        return response
+
+
+class EmployeeExportApi(BaseExportApi):
+    name = "employees"
+    model = Employee
+    columns = (
+        ("id", "id"),
+        ("employer", "employer_id"),
+        ("full_name", "full_name"),
+        ("email", "email"),
+        ("phone", "phone"),
+        ("salary", "salary"),
+        ("bank_name", "bank_name"),
+        ("bank_account", "bank_account"),
+        ("city", "city"),
+        ("created", "created"),
+    )
+    date_field = "created"
+    employer_lookup = "employer_id"
+
+
+class SalaryAdvanceRequestExportApi(BaseExportApi):
+    name = "salary-advances"
+    model = SalaryAdvanceRequest
+    columns = (
+        ("id", "id"),
+        ("employee", "employee_id"),
+        ("amount_requested", "amount_requested"),
+        ("status", "status"),
+        ("request_date", "request_date"),
+        ("review_date", "review_date"),
+    )
+    date_field = "request_date"
+    employer_lookup = "employee__employer_id"
+
+
+class TransactionExportApi(BaseExportApi):
+    name = "transactions"
+    model = Transaction
+    columns = (
+        ("id", "id"),
+        ("request", "request_id"),
+        ("employee", "request__employee_id"),
+        ("amount", "amount"),
+        ("transaction_date", "transaction_date"),
+    )
+    date_field = "transaction_date"
+    employer_lookup = "request__employee__employer_id"
@@ -0,0 +1,89 @@
+"""JSON encoding of API responses.
+
+``dumps`` and ``json_response`` encode with orjson instead of ``JsonResponse``'s
+stdlib encoder, and keep the output of ``DjangoJSONEncoder``: decimals as
+strings, datetimes in ISO 8601 with milliseconds and ``Z`` for UTC, UUIDs in
+their dashed form. The bytes differ only in whitespace and in non-ASCII text,
+which is sent as UTF-8 rather than ``\\u`` escapes.
+
+List endpoints read their rows through a ``Schema``, which names the fields
+they return. Decimal and datetime fields are rendered as text by Postgres in
+the same formats, so no ``Decimal`` or ``datetime`` is built for them and the
+rows reach orjson as plain strings, UUIDs and numbers. ``python -m
+benchmarks.serialization`` compares the encoders.
+"""
+import orjson
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Func, TextField
+from django.db.models.functions import Cast
+from django.http import HttpResponse
+
+_encoder = DjangoJSONEncoder()
+
+# orjson would write datetimes with microseconds and "+00:00"; hand them to
+# DjangoJSONEncoder like every other type orjson does not know.
+_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME
+
+
+def dumps(data):
+    return orjson.dumps(data, default=_encoder.default, option=_OPTIONS)
+
+
+def json_response(data, status=200):
+    return HttpResponse(dumps(data), status=status, content_type="application/json")
+
+
+class JSONTimestamp(Func):
+    """A timestamp as ``DjangoJSONEncoder`` writes it: UTC with a ``Z``,
+    milliseconds (truncated) unless it falls on a whole second."""
+
+    template = (
+        "to_char(%(expressions)s AT TIME ZONE 'UTC', "
+        "CASE WHEN %(expressions)s = date_trunc('second', %(expressions)s) "
+        "THEN 'YYYY-MM-DD\"T\"HH24:MI:SS\"Z\"' ELSE 'YYYY-MM-DD\"T\"HH24:MI:SS.MS\"Z\"' END)"
+    )
+    output_field = TextField()
+
+
+# Field conversions, applied in the query.
+def decimal(lookup):
+    return Cast(lookup, TextField())
+
+
+def timestamp(lookup):
+    return JSONTimestamp(lookup)
+
+
+class Schema:
+    """The fields of a serialized row, as ``name=conversion``.
+
+    ``None`` marks values orjson encodes as the database returns them
+    (strings, numbers, booleans, UUIDs).
+    """
+
+    def __init__(self, **fields):
+        self.fields = fields
+        self.names = tuple(fields)
+        self.columns = [name if convert is None else convert(name) for name, convert in fields.items()]
+
+    def only(self, names):
+        return Schema(**{name: self.fields[name] for name in names})
+
+    def rows(self, queryset, *extra):
+        """``queryset.values_list()`` of the schema's columns, then ``extra``."""
+        return queryset.values_list(*self.columns, *extra)
+
+    def dump_many(self, rows):
+        # zip() stops at the schema's fields and leaves out the extra columns.
+        names = self.names
+        return [dict(zip(names, row)) for row in rows]
+
+
+EMPLOYEE = Schema(
+    id=None, full_name=None, employer=None, email=None, phone=None, salary=decimal,
+    bank_name=None, bank_account=None, city=None, created=timestamp, modified=timestamp,
+)
+TRANSACTION = Schema(id=None, amount=decimal, transaction_date=timestamp)
+SALARY_ADVANCE_REQUEST = Schema(
+    id=None, amount_requested=decimal, status=None, request_date=timestamp, review_date=timestamp,
+)
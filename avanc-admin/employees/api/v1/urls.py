@@ -1,16 +1,39 @@
+from django.conf import settings
 from django.urls import path
 from django.views.decorators.csrf import csrf_exempt
 
-from employees.api.v1 import views
-from employees.api.v1.views import SignUpApi, SignInApi
+from employees.api.v1 import async_views, exports, views
+from employees.api.v1.views import SignUpApi, SignInApi, SignOutApi, TokenRefreshApi
 
 urlpatterns = [
     path('employees/', csrf_exempt(views.EmployeeListApi.as_view())),
-    path('employees/<uuid:pk>', csrf_exempt(views.EmployeeDetailApi.as_view())),
-    path('employees/<uuid:pk>/transactions',
-         csrf_exempt(views.EmployeeTransactionsApi.as_view())),
-    path('employees/<uuid:pk>/salary-advances',
-         csrf_exempt(views.EmployeeSalaryAdvanceRequestApi.as_view())),
+    path('employees/import', views.EmployeeImportApi.as_view()),
+    path('employees/search', views.EmployeeSearchApi.as_view()),
+    path('salary-advances/review', views.SalaryAdvanceReviewApi.as_view()),
+    path('employers/<uuid:pk>/dashboard', views.EmployerDashboardApi.as_view()),
+    path('exports/employees', exports.EmployeeExportApi.as_view()),
+    path('exports/salary-advances', exports.SalaryAdvanceRequestExportApi.as_view()),
+    path('exports/transactions', exports.TransactionExportApi.as_view()),
+    path('cache/stats', views.CacheStatsApi.as_view()),
     path('signup/', csrf_exempt(SignUpApi.as_view()), name='signup'),
     path('signin/', csrf_exempt(SignInApi.as_view()), name='signin'),
+    path('signout/', csrf_exempt(SignOutApi.as_view()), name='signout'),
+    path('token/refresh/', csrf_exempt(TokenRefreshApi.as_view()), name='token-refresh'),
 ]
+
+if settings.ASYNC_API_VIEWS:
+    urlpatterns += [
+        path('employees/<uuid:pk>', async_views.AsyncEmployeeDetailApi.as_view()),
+        path('employees/<uuid:pk>/transactions',
+             async_views.AsyncEmployeeTransactionsApi.as_view()),
+        path('employees/<uuid:pk>/salary-advances',
+             async_views.AsyncEmployeeSalaryAdvanceRequestApi.as_view()),
+    ]
+else:
+    urlpatterns += [
+        path('employees/<uuid:pk>', csrf_exempt(views.EmployeeDetailApi.as_view())),
+        path('employees/<uuid:pk>/transactions',
+             csrf_exempt(views.EmployeeTransactionsApi.as_view())),
+        path('employees/<uuid:pk>/salary-advances',
+             csrf_exempt(views.EmployeeSalaryAdvanceRequestApi.as_view())),
+    ]
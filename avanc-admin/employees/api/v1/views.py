@@ -1,25 +1,138 @@
 from django.contrib.postgres.aggregates import ArrayAgg
 from django.db.models import QuerySet, Q
-from django.http import JsonResponse
+from django.http import HttpResponse, HttpResponseNotModified, JsonResponse
+from django.utils.http import parse_etags
 from django.views.generic.detail import BaseDetailView
 from django.views.generic.list import BaseListView
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 from django.views import View
+import base64
+import binascii
 import json
+import os
+import uuid
+from collections import Counter
+from datetime import datetime
+from decimal import Decimal
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import DEFAULT_DB_ALIAS
 from django.contrib.auth.hashers import make_password, check_password
-from django.middleware.csrf import get_token
 
+from employees import cache as detail_cache
+from employees import idempotency, metrics, ratelimit, readiness
+from employees.api.v1 import serializers
 from employees.models import Employee, SalaryAdvanceRequest, Transaction, Employer
+from employees.services import search
+from employees.services.dashboard import employer_dashboard
+from employees.services.employees import bulk_update_employees
+from employees.services.onboarding import import_upload
+from employees.services.salary_advance import create_salary_advance, review_salary_advances
+from employees.tokens import REFRESH, InvalidToken, issue_tokens, revoke_token, verify_token
+
+
+def encode_cursor(created, pk):
+    payload = json.dumps([created.isoformat(), str(pk)]).encode()
+    return base64.urlsafe_b64encode(payload).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        created, pk = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(created), uuid.UUID(pk)
+    except (TypeError, ValueError, binascii.Error):
+        raise ValueError("Invalid cursor")
+
+
+def employee_detail(employee):
+    """Body of ``EmployeeDetailApi.get`` for an employee annotated by
+    ``with_current_month_advances()``."""
+    current_month_advances = employee.get_current_month_advances()
+    return {
+        "id": employee.id,
+        "full_name": employee.full_name,
+        "salary": employee.salary,
+        "available_amount": employee.advance_limit - current_month_advances,
+        "get_current_month_advances": current_month_advances,
+    }
+
+
+def cached_detail_response(request, entry, cache_status):
+    if entry["etag"] in parse_etags(request.headers.get("If-None-Match", "")):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(entry["body"], content_type="application/json")
+    response["ETag"] = entry["etag"]
+    response["X-Cache"] = cache_status
+    return response
 
 
 class EmployeeListApi(View):
     http_method_names = ['get', 'post', 'put']
 
+    paginate_by = 50
+    max_page_size = 500
+    default_fields = ("id", "full_name", "employer")
+    allowed_fields = (
+        "id", "full_name", "employer", "email", "phone", "salary",
+        "bank_name", "bank_account", "city", "created", "modified",
+    )
+    filters = {"employer": "employer_id", "city": "city", "bank": "bank_name"}
+
     def get(self, request, *args, **kwargs):
-        employees = Employee.objects.all()
-        data = list(employees.values("id", "full_name", "employer"))
-        return JsonResponse({"results": data})
+        """Keyset-paginated listing ordered by ``(created, id)``.
+
+        Query parameters: ``cursor`` (the ``next_cursor`` of the previous
+        page), ``page_size``, ``fields`` (comma separated projection) and the
+        ``employer``, ``city`` and ``bank`` filters.
+        """
+        try:
+            page_size = min(int(request.GET.get("page_size", self.paginate_by)), self.max_page_size)
+            if page_size < 1:
+                raise ValueError
+        except ValueError:
+            return JsonResponse({"error": "Invalid page_size"}, status=400)
+
+        fields = self.default_fields
+        if request.GET.get("fields"):
+            fields = tuple(dict.fromkeys(request.GET["fields"].split(",")))
+            unknown = set(fields) - set(self.allowed_fields)
+            if unknown:
+                return JsonResponse(
+                    {"error": f"Unknown fields: {', '.join(sorted(unknown))}"}, status=400)
+
+        cursor = None
+        if request.GET.get("cursor"):
+            try:
+                cursor = decode_cursor(request.GET["cursor"])
+            except ValueError:
+                return JsonResponse({"error": "Invalid cursor"}, status=400)
+
+        try:
+            employees = Employee.objects.filter(**{
+                lookup: request.GET[param]
+                for param, lookup in self.filters.items()
+                if request.GET.get(param)
+            })
+        except ValidationError:
+            return JsonResponse({"error": "Invalid filter"}, status=400)
+        if cursor:
+            created, last_id = cursor
+            # created >= ... keeps the predicate sargable on the (created, id) indexes.
+            employees = employees.filter(
+                Q(created__gt=created) | Q(id__gt=last_id), created__gte=created)
+
+        schema = serializers.EMPLOYEE.only(fields)
+        # The raw created and id follow the schema's columns, for the cursor.
+        rows = list(schema.rows(employees.order_by("created", "id"), "created", "id")[:page_size + 1])
+
+        next_cursor = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            next_cursor = encode_cursor(rows[-1][-2], rows[-1][-1])
+        data = schema.dump_many(rows)
+        return serializers.json_response({"results": data, "next_cursor": next_cursor})
 
     @method_decorator(csrf_exempt)
     def post(self, request, *args, **kwargs):
@@ -34,39 +147,115 @@ class EmployeeListApi(View):
     def put(self, request, *args, **kwargs):
         try:
             data = json.loads(request.body)
-            for item in data:
-                employee_id = item.get('id')
-                if not employee_id:
-                    continue
-                try:
-                    employee = Employee.objects.get(pk=employee_id)
-                    for key, value in item.items():
-                        setattr(employee, key, value)
-                    employee.save()
-                except Employee.DoesNotExist:
-                    continue
-            return JsonResponse({"status": "success"})
+            if not isinstance(data, list):
+                return JsonResponse({"error": "Expected a list of employees"}, status=400)
+            results = bulk_update_employees(data)
+            return JsonResponse({"results": results})
         except Exception as e:
             return JsonResponse({"error": str(e)}, status=400)
 
 
+class EmployeeSearchApi(View):
+    """Employees ranked by how well ``q`` matches their name, email or employer name.
+
+    Query parameters: ``q`` (at least two characters; prefixes and typos
+    match), ``limit``, and the ``fields`` and filters of the listing. Each
+    result carries its ``score``, from 0 to 1. Restricted to staff users.
+    """
+    http_method_names = ['get']
+
+    default_limit = 20
+    max_limit = 100
+
+    def get(self, request, *args, **kwargs):
+        if not request.user.is_staff:
+            return JsonResponse({"error": "Forbidden"}, status=403)
+        query = search.normalize(request.GET.get("q", ""))
+        if len(query) < search.MIN_QUERY_LENGTH:
+            return JsonResponse(
+                {"error": f"q must have at least {search.MIN_QUERY_LENGTH} characters"}, status=400)
+        try:
+            limit = min(int(request.GET.get("limit", self.default_limit)), self.max_limit)
+            if limit < 1:
+                raise ValueError
+        except ValueError:
+            return JsonResponse({"error": "Invalid limit"}, status=400)
+
+        fields = EmployeeListApi.default_fields
+        if request.GET.get("fields"):
+            fields = tuple(dict.fromkeys(request.GET["fields"].split(",")))
+            unknown = set(fields) - set(EmployeeListApi.allowed_fields)
+            if unknown:
+                return JsonResponse(
+                    {"error": f"Unknown fields: {', '.join(sorted(unknown))}"}, status=400)
+
+        try:
+            employees = Employee.objects.filter(**{
+                lookup: request.GET[param]
+                for param, lookup in EmployeeListApi.filters.items()
+                if request.GET.get(param)
+            })
+            schema = serializers.EMPLOYEE.only(fields)
+            rows = search.search_employees(query, employees, limit, schema.columns)
+        except ValidationError:
+            return JsonResponse({"error": "Invalid filter"}, status=400)
+
+        data = schema.dump_many(rows)
+        for item, row in zip(data, rows):
+            item["score"] = round(row[-1], 3)
+        return serializers.json_response({"results": data})
+
+
+class EmployeeImportApi(View):
+    """Bulk onboarding from a CSV or JSON-lines upload.
+
+    Accepts either a multipart ``file`` field or the raw body, with the format
+    taken from the file extension or the ``Content-Type`` (``text/csv`` or
+    ``application/x-ndjson``). Uploads of up to ``ONBOARDING_INLINE_MAX_ROWS``
+    rows are imported at once (201 with the summary); larger ones are queued
+    for the outbox worker (202 with the event id). Restricted to staff users;
+    authenticated by the session cookie, so CSRF protection applies.
+    """
+    http_method_names = ['post']
+
+    def post(self, request, *args, **kwargs):
+        if not request.user.is_staff:
+            return JsonResponse({"error": "Forbidden"}, status=403)
+        upload = request.FILES.get('file')
+        if upload is not None:
+            content = upload.read()
+            fmt = 'csv' if upload.name.lower().endswith('.csv') else 'jsonl'
+        else:
+            content = request.body
+            fmt = 'csv' if request.content_type == 'text/csv' else 'jsonl'
+        if not content:
+            return JsonResponse({"error": "Invalid data"}, status=400)
+        try:
+            summary, event = import_upload(content, fmt, settings.ONBOARDING_INLINE_MAX_ROWS)
+        except Exception as e:
+            return JsonResponse({"error": str(e)}, status=400)
+        if event is not None:
+            return JsonResponse({"queued": True, "event": str(event.pk)}, status=202)
+        return JsonResponse(summary, status=201)
+
+
 class EmployeeDetailApi(View):
     http_method_names = ['get', 'post', 'put']
 
     def get(self, request, *args, **kwargs):
+        """Served from the per-employee cache, with ETag / If-None-Match support."""
         employee_id = kwargs.get('pk')
-        try:
-            employee = Employee.objects.get(pk=employee_id)
-            data = {
-                "id": employee.id,
-                "full_name": employee.full_name,
-                "salary": employee.salary,
-                "available_amount" : employee.available_amount,
-                "get_current_month_advances" : employee.get_current_month_advances,
-            }
-            return JsonResponse(data)
-        except Employee.DoesNotExist:
-            return JsonResponse({"error": "Employee not found"}, status=404)
+        entry = detail_cache.get_detail(employee_id)
+        cache_status = "HIT"
+        if entry is None:
+            cache_status = "MISS"
+            try:
+                # Entries outlive a lagging replica, so they are filled from the primary.
+                employee = Employee.objects.using(DEFAULT_DB_ALIAS).with_current_month_advances().get(pk=employee_id)
+            except Employee.DoesNotExist:
+                return JsonResponse({"error": "Employee not found"}, status=404)
+            entry = detail_cache.set_detail(employee_id, serializers.dumps(employee_detail(employee)))
+        return cached_detail_response(request, entry, cache_status)
 
     @method_decorator(csrf_exempt)
     def post(self, request, *args, **kwargs):
@@ -97,9 +286,8 @@ class EmployeeDetailApi(View):
         try:
             employee = Employee.objects.get(pk=employee_id)
             transactions = employee.get_all_transactions()
-            data = list(transactions.values(
-                "id", "amount", "transaction_date"))
-            return JsonResponse({"transactions": data})
+            data = serializers.TRANSACTION.dump_many(serializers.TRANSACTION.rows(transactions))
+            return serializers.json_response({"transactions": data})
         except Employee.DoesNotExist:
             return JsonResponse({"error": "Employee not found"}, status=404)
 
@@ -112,9 +300,8 @@ class EmployeeTransactionsApi(View):
         try:
             employee = Employee.objects.get(pk=employee_id)
             transactions = employee.get_all_transactions()
-            data = list(transactions.values(
-                "id", "amount", "transaction_date"))
-            return JsonResponse({"transactions": data})
+            data = serializers.TRANSACTION.dump_many(serializers.TRANSACTION.rows(transactions))
+            return serializers.json_response({"transactions": data})
         except Employee.DoesNotExist:
             return JsonResponse({"error": "Employee not found"}, status=404)
 
@@ -149,34 +336,49 @@ class EmployeeSalaryAdvanceRequestApi(View):
         try:
             employee = Employee.objects.get(pk=employee_id)
             requests = SalaryAdvanceRequest.objects.filter(employee=employee)
-            data = list(requests.values("id", "amount_requested",
-                        "status", "request_date", "review_date"))
-            return JsonResponse({"salary_advance_requests": data})
+            data = serializers.SALARY_ADVANCE_REQUEST.dump_many(serializers.SALARY_ADVANCE_REQUEST.rows(requests))
+            return serializers.json_response({"salary_advance_requests": data})
         except Employee.DoesNotExist:
             return JsonResponse({"error": "Employee not found"}, status=404)
 
     @method_decorator(csrf_exempt)
     def post(self, request, *args, **kwargs):
         employee_id = kwargs.get('pk')
+        key = request.headers.get(idempotency.HEADER)
+        scope = f'salary-advance:{employee_id}'
+        body_fingerprint = idempotency.fingerprint(request.body)
+        if key:
+            replay = idempotency.claim(scope, key, body_fingerprint)
+            if replay is not None:
+                return replay
+        retry_after = ratelimit.check(
+            [('advance_employee', employee_id), ('advance_ip', ratelimit.client_ip(request))])
+        if retry_after:
+            if key:
+                idempotency.release(scope, key)
+            return ratelimit.too_many_requests(retry_after)
+
+        try:
+            response = self.create(request, employee_id)
+        except BaseException:
+            if key:
+                idempotency.release(scope, key)
+            raise
+        if key:
+            idempotency.store(scope, key, body_fingerprint, response)
+        return response
+
+    def create(self, request, employee_id):
         try:
-            employee = Employee.objects.get(pk=employee_id)
             data = json.loads(request.body)
             amount_requested = data.get('amount_requested')
-            
+
             if not amount_requested:
                 return JsonResponse({"error": "Invalid data"}, status=400)
 
-            if amount_requested > employee.available_amount:
-                return JsonResponse({
-                    "error": f'Amount requested ({amount_requested}) exceeds available amount ({employee.available_amount})'
-                }, status=400)
-
-            salary_request = SalaryAdvanceRequest.objects.create(
-                employee=employee, amount_requested=amount_requested)
-            
-            salary_request.clean()
-            salary_request.save()
-            
+            salary_request = create_salary_advance(
+                employee_id, Decimal(str(amount_requested)))
+
             return JsonResponse({"id": salary_request.id}, status=201)
 
         except Employee.DoesNotExist:
@@ -185,6 +387,58 @@ class EmployeeSalaryAdvanceRequestApi(View):
             return JsonResponse({"error": str(e)}, status=400)
 
 
+class SalaryAdvanceReviewApi(View):
+    """Approve or reject many pending salary advance requests at once.
+
+    Body: ``{"action": "approve" | "reject", "ids": [<request id>, ...]}``.
+    Restricted to staff users; authenticated by the session cookie, so CSRF
+    protected.
+    """
+    http_method_names = ['post']
+    max_batch_size = 5000
+
+    def post(self, request, *args, **kwargs):
+        if not request.user.is_staff:
+            return JsonResponse({"error": "Forbidden"}, status=403)
+        try:
+            data = json.loads(request.body)
+            ids = data.get('ids')
+            if not isinstance(ids, list) or not ids:
+                return JsonResponse({"error": "Expected a list of ids"}, status=400)
+            if len(ids) > self.max_batch_size:
+                return JsonResponse(
+                    {"error": f"At most {self.max_batch_size} ids per request"}, status=400)
+            results = review_salary_advances(ids, data.get('action'))
+            summary = Counter(result["status"] for result in results)
+            return JsonResponse({"results": results, "summary": summary})
+        except Exception as e:
+            return JsonResponse({"error": str(e)}, status=400)
+
+
+class EmployerDashboardApi(View):
+    """Exposure of one employer, read from the precomputed summaries.
+
+    ``?months=N`` (1-60, default 12) sets how many months of approvals are
+    returned. Restricted to staff users.
+    """
+    http_method_names = ['get']
+
+    def get(self, request, *args, **kwargs):
+        if not request.user.is_staff:
+            return JsonResponse({"error": "Forbidden"}, status=403)
+        try:
+            months = int(request.GET.get('months', 12))
+        except ValueError:
+            return JsonResponse({"error": "Invalid months"}, status=400)
+        if not 1 <= months <= 60:
+            return JsonResponse({"error": "months must be between 1 and 60"}, status=400)
+        try:
+            employer = Employer.objects.get(pk=kwargs.get('pk'))
+        except Employer.DoesNotExist:
+            return JsonResponse({"error": "Employer not found"}, status=404)
+        return serializers.json_response(employer_dashboard(employer, months))
+
+
 class SignUpApi(View):
     http_method_names = ['post']
 
@@ -220,19 +474,95 @@ class SignInApi(View):
             email = data.get('email')
             password = data.get('password')
             if not email or not password:
+                metrics.SIGN_IN_FAILURES.labels('invalid_data').inc()
                 return JsonResponse({"error": "Invalid data"}, status=400)
+            retry_after = ratelimit.check(
+                [('sign_in_ip', ratelimit.client_ip(request)), ('sign_in_email', email.lower())])
+            if retry_after:
+                metrics.SIGN_IN_FAILURES.labels('rate_limited').inc()
+                return ratelimit.too_many_requests(retry_after)
             try:
                 employee = Employee.objects.get(email=email)
-                print(password == employee.password)
-                print(password)
-                print(employee.password)
-
                 if check_password(password, employee.password):
-                    token = get_token(request)
-                    return JsonResponse({"token": token}, status=200)
+                    tokens = issue_tokens(employee.id)
+                    # "token" is kept for clients written against the old response.
+                    return JsonResponse({"token": tokens["access"], **tokens}, status=200)
                 else:
+                    metrics.SIGN_IN_FAILURES.labels('invalid_credentials').inc()
                     return JsonResponse({"error": "Invalid credentials"}, status=401)
             except Employee.DoesNotExist:
+                metrics.SIGN_IN_FAILURES.labels('unknown_email').inc()
                 return JsonResponse({"error": "Invalid credentials"}, status=401)
         except Exception as e:
+            metrics.SIGN_IN_FAILURES.labels('error').inc()
             return JsonResponse({"error": str(e)}, status=400)
+
+
+class TokenRefreshApi(View):
+    http_method_names = ['post']
+
+    @method_decorator(csrf_exempt)
+    def post(self, request, *args, **kwargs):
+        try:
+            data = json.loads(request.body)
+            refresh = data.get('refresh')
+            if not refresh:
+                return JsonResponse({"error": "Invalid data"}, status=400)
+            payload = verify_token(refresh, REFRESH)
+            # Refresh tokens are single use.
+            revoke_token(payload)
+            tokens = issue_tokens(payload['sub'])
+            return JsonResponse({"token": tokens["access"], **tokens}, status=200)
+        except InvalidToken as e:
+            return JsonResponse({"error": str(e)}, status=401)
+        except Exception as e:
+            return JsonResponse({"error": str(e)}, status=400)
+
+
+class SignOutApi(View):
+    """Revoke the bearer access token and, if given, the refresh token."""
+    http_method_names = ['post']
+
+    @method_decorator(csrf_exempt)
+    def post(self, request, *args, **kwargs):
+        try:
+            data = json.loads(request.body or b'{}')
+            scheme, _, access = request.headers.get('Authorization', '').partition(' ')
+            if scheme.lower() == 'bearer' and access:
+                revoke_token(verify_token(access.strip()))
+            if data.get('refresh'):
+                revoke_token(verify_token(data['refresh'], REFRESH))
+            return JsonResponse({"status": "success"}, status=200)
+        except InvalidToken as e:
+            return JsonResponse({"error": str(e)}, status=401)
+        except Exception as e:
+            return JsonResponse({"error": str(e)}, status=400)
+
+
+class CacheStatsApi(View):
+    http_method_names = ['get']
+
+    def get(self, request, *args, **kwargs):
+        return JsonResponse({"employee_detail": detail_cache.stats()})
+
+
+class MetricsApi(View):
+    """Prometheus text exposition of ``employees.metrics``."""
+    http_method_names = ['get']
+
+    def get(self, request, *args, **kwargs):
+        body, content_type = metrics.render()
+        return HttpResponse(body, content_type=content_type)
+
+
+class ReadinessApi(View):
+    """200 once this worker can serve requests, 503 with the failed checks until then."""
+    http_method_names = ['get']
+
+    def get(self, request, *args, **kwargs):
+        checks = readiness.checks()
+        ready = all(checks.values())
+        return JsonResponse(
+            {"status": "ready" if ready else "unavailable", "checks": checks, "pid": os.getpid()},
+            status=200 if ready else 503,
+        )
@@ -0,0 +1,73 @@
+"""Per-employee cache of ``EmployeeDetailApi`` responses.
+
+Entries hold the encoded JSON body and its ETag, keyed by employee and
+month, since the available balance resets every month. The signal handlers
+in ``employees.signals`` and the bulk code paths that bypass signals call
+``invalidate_employees`` after commit.
+"""
+import hashlib
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def _key(employee_id):
+    return f'employees:detail:{employee_id}:{timezone.localdate():%Y-%m}'
+
+
+def _count(name):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def make_etag(body):
+    return f'"{hashlib.md5(body, usedforsecurity=False).hexdigest()}"'
+
+
+def get_detail(employee_id):
+    """Return the cached ``{"body", "etag"}`` entry or ``None``."""
+    entry = cache.get(_key(employee_id))
+    _count('hits' if entry is not None else 'misses')
+    return entry
+
+
+def set_detail(employee_id, body):
+    entry = {'body': body, 'etag': make_etag(body)}
+    cache.set(_key(employee_id), entry, timeout=settings.EMPLOYEE_DETAIL_CACHE_TIMEOUT)
+    return entry
+
+
+async def aget_detail(employee_id):
+    entry = await cache.aget(_key(employee_id))
+    _count('hits' if entry is not None else 'misses')
+    return entry
+
+
+async def aset_detail(employee_id, body):
+    entry = {'body': body, 'etag': make_etag(body)}
+    await cache.aset(_key(employee_id), entry, timeout=settings.EMPLOYEE_DETAIL_CACHE_TIMEOUT)
+    return entry
+
+
+def invalidate_employees(employee_ids):
+    """Drop cached details once the current transaction commits."""
+    keys = [_key(employee_id) for employee_id in set(employee_ids)]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def stats():
+    with _stats_lock:
+        return {'hits': _stats['hits'], 'misses': _stats['misses']}
+
+
+def reset_stats():
+    with _stats_lock:
+        _stats.clear()
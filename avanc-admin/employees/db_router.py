@@ -0,0 +1,117 @@
+"""Read replica routing.
+
+Reads go to a replica in ``REPLICA_DATABASES`` only inside ``replica_reads()``;
+everywhere else, and for every write, the router picks the primary
+(``default``). ``ReplicaMiddleware`` enables replica reads for GET and HEAD
+requests, unless the client wrote within the last ``READ_YOUR_WRITES_SECONDS``
+and might not see its own write on a replica yet.
+
+Each process measures a replica's lag at most every
+``REPLICA_LAG_CHECK_SECONDS``; a replica more than ``REPLICA_MAX_LAG_SECONDS``
+behind, or unreachable, is skipped until it catches up. Reads fall back to
+the primary when no replica is usable, and inside a transaction on the
+primary so they see its uncommitted writes.
+"""
+import contextvars
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger('employees.db')
+
+_replica_reads = contextvars.ContextVar('replica_reads', default=False)
+
+_lag_lock = threading.Lock()
+# alias -> (checked at, lag in seconds)
+_lags = {}
+
+# Caught up when everything received is replayed; otherwise the age of the
+# last replayed commit, which errs on the late side after an idle period.
+# Before the first replayed commit the lag is unknown and taken as infinite.
+LAG_SQL = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())::float8, 'Infinity')
+END
+"""
+
+
+def set_replica_reads(enabled):
+    _replica_reads.set(enabled)
+
+
+@contextmanager
+def replica_reads(enabled=True):
+    """Route the reads in the block to a replica (or, with ``False``, the primary)."""
+    token = _replica_reads.set(enabled)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def replica_lag(alias):
+    """Seconds ``alias`` is behind the primary, ``None`` if it is unreachable."""
+    try:
+        with connections[alias].cursor() as cursor:
+            cursor.execute(LAG_SQL)
+            return float(cursor.fetchone()[0])
+    except DatabaseError:
+        logger.warning("Replica %s is unreachable", alias, exc_info=True)
+        return None
+
+
+def _lag(alias):
+    now = time.monotonic()
+    with _lag_lock:
+        checked = _lags.get(alias)
+        if checked is not None and now - checked[0] < settings.REPLICA_LAG_CHECK_SECONDS:
+            return checked[1]
+        # Other threads keep using the previous value while this one checks.
+        _lags[alias] = (now, checked[1] if checked else None)
+    lag = replica_lag(alias)
+    with _lag_lock:
+        _lags[alias] = (time.monotonic(), lag)
+    return lag
+
+
+def reset_lags():
+    with _lag_lock:
+        _lags.clear()
+
+
+def usable_replicas():
+    max_lag = settings.REPLICA_MAX_LAG_SECONDS
+    usable = []
+    for alias in settings.REPLICA_DATABASES:
+        lag = _lag(alias)
+        if lag is not None and lag <= max_lag:
+            usable.append(alias)
+    return usable
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if not _replica_reads.get() or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        replicas = usable_replicas()
+        return random.choice(replicas) if replicas else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        # Objects read from a replica are saved to the primary too.
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        pool = {DEFAULT_DB_ALIAS, *settings.REPLICA_DATABASES}
+        if obj1._state.db in pool and obj2._state.db in pool:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.REPLICA_DATABASES
@@ -0,0 +1,97 @@
+"""``Idempotency-Key`` support for POST endpoints, backed by the default cache.
+
+The first request with a key claims it with ``cache.add`` (atomic on Redis
+and ``LocMemCache``), runs, and stores its status and body for
+``IDEMPOTENCY_KEY_TIMEOUT`` seconds. Requests repeating the key get the
+stored response back without touching the database. A repeat that arrives
+while the first is still running gets a 409, and one with a different body
+a 422. Keys are scoped per endpoint and per caller.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, JsonResponse
+
+HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+# How long a claimed key blocks repeats if its request dies without storing.
+IN_PROGRESS_TIMEOUT = 60
+
+_IN_PROGRESS = 'in-progress'
+
+
+def _key(scope, key):
+    return f'idempotency:{scope}:{hashlib.sha256(key.encode()).hexdigest()}'
+
+
+def fingerprint(body):
+    return hashlib.sha256(body).hexdigest()
+
+
+def _replay(entry, body_fingerprint):
+    if entry['fingerprint'] != body_fingerprint:
+        return JsonResponse(
+            {"error": "Idempotency-Key was already used with a different request body"}, status=422)
+    if entry['status'] == _IN_PROGRESS:
+        return JsonResponse({"error": "A request with this Idempotency-Key is in progress"}, status=409)
+    response = HttpResponse(entry['body'], status=entry['status'], content_type='application/json')
+    response['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def _invalid(key):
+    if len(key) > MAX_KEY_LENGTH:
+        return JsonResponse({"error": f"Idempotency-Key is longer than {MAX_KEY_LENGTH} characters"}, status=400)
+    return None
+
+
+def claim(scope, key, body_fingerprint):
+    """Claim ``key``; return ``None`` to proceed or the response to send instead."""
+    invalid = _invalid(key)
+    if invalid:
+        return invalid
+    entry = {'status': _IN_PROGRESS, 'fingerprint': body_fingerprint}
+    if cache.add(_key(scope, key), entry, timeout=IN_PROGRESS_TIMEOUT):
+        return None
+    entry = cache.get(_key(scope, key))
+    if entry is None:
+        # Expired in between; let the caller retry.
+        return JsonResponse({"error": "A request with this Idempotency-Key is in progress"}, status=409)
+    return _replay(entry, body_fingerprint)
+
+
+def store(scope, key, body_fingerprint, response):
+    """Keep ``response`` as the answer to ``key``; return it."""
+    cache.set(_key(scope, key), {
+        'status': response.status_code, 'fingerprint': body_fingerprint, 'body': response.content,
+    }, timeout=settings.IDEMPOTENCY_KEY_TIMEOUT)
+    return response
+
+
+def release(scope, key):
+    cache.delete(_key(scope, key))
+
+
+async def aclaim(scope, key, body_fingerprint):
+    invalid = _invalid(key)
+    if invalid:
+        return invalid
+    entry = {'status': _IN_PROGRESS, 'fingerprint': body_fingerprint}
+    if await cache.aadd(_key(scope, key), entry, timeout=IN_PROGRESS_TIMEOUT):
+        return None
+    entry = await cache.aget(_key(scope, key))
+    if entry is None:
+        return JsonResponse({"error": "A request with this Idempotency-Key is in progress"}, status=409)
+    return _replay(entry, body_fingerprint)
+
+
+async def astore(scope, key, body_fingerprint, response):
+    await cache.aset(_key(scope, key), {
+        'status': response.status_code, 'fingerprint': body_fingerprint, 'body': response.content,
+    }, timeout=settings.IDEMPOTENCY_KEY_TIMEOUT)
+    return response
+
+
+async def arelease(scope, key):
+    await cache.adelete(_key(scope, key))
@@ -0,0 +1,40 @@
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+
+from employees.models import DisbursementBatch
+from employees.services.disbursements import generate_disbursement_files, write_batch_file
+
+
+class Command(BaseCommand):
+    help = "Write one payment file per bank for approved, unpaid salary advances and mark them paid."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--format', choices=[code for code, _ in DisbursementBatch.FORMAT_CHOICES],
+            default=DisbursementBatch.CSV, help="File format (default: csv).")
+        parser.add_argument(
+            '--bank', action='append', default=[], help="Only this bank; repeat for several.")
+        parser.add_argument(
+            '--output-dir', default='disbursements', help="Directory for the payment files.")
+        parser.add_argument('--chunk-size', type=int, default=2000, help="Rows fetched per round trip.")
+        parser.add_argument(
+            '--rewrite', metavar='BATCH_ID',
+            help="Write the file of an existing batch again instead of creating new batches.")
+
+    def handle(self, *args, **options):
+        if options['rewrite']:
+            try:
+                batch = DisbursementBatch.objects.get(pk=uuid.UUID(options['rewrite']))
+            except (ValueError, DisbursementBatch.DoesNotExist):
+                raise CommandError(f"Disbursement batch not found: {options['rewrite']}")
+            path = write_batch_file(batch, options['output_dir'], options['chunk_size'])
+            self.stdout.write(self.style.SUCCESS(f"Rewrote {path}."))
+            return
+
+        written = generate_disbursement_files(
+            options['output_dir'], options['format'], options['bank'], options['chunk_size'])
+        for batch, path in written:
+            self.stdout.write(
+                f"{batch.bank_name}: {batch.disbursement_count} disbursements, {batch.total_amount} -> {path}")
+        self.stdout.write(self.style.SUCCESS(f"Wrote {len(written)} disbursement file(s)."))
@@ -0,0 +1,40 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from employees.services.onboarding import EmployeeImporter, read_records
+
+
+class Command(BaseCommand):
+    help = "Onboard employees in bulk from a CSV or JSON-lines file."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV (with a header row) or JSON-lines file.")
+        parser.add_argument(
+            '--format', choices=('csv', 'jsonl'),
+            help="File format. Defaults to the file extension.")
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count(),
+            help="Processes used to hash passwords (default: CPU count).")
+
+    def handle(self, *args, **options):
+        fmt = options['format'] or ('csv' if options['path'].endswith('.csv') else 'jsonl')
+        importer = EmployeeImporter(
+            batch_size=options['batch_size'], workers=options['workers'], progress=self.report)
+        try:
+            with open(options['path'], newline='', encoding='utf-8-sig') as stream:
+                summary = importer.run(read_records(stream, fmt))
+        except OSError as e:
+            raise CommandError(e)
+
+        for error in summary['errors']:
+            self.stderr.write(f"line {error['line']}: {error['errors']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {summary['created']} employees, {summary['failed']} failed, "
+            f"in {summary['elapsed_seconds']}s ({summary['rows_per_second']} rows/s)."))
+
+    def report(self, importer):
+        self.stdout.write(
+            f"{importer.created} imported, {len(importer.errors)} failed "
+            f"({importer.rate:.1f} rows/s)")
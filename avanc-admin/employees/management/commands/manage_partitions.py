@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from employees.models import Transaction, month_start
+from employees.services.partitions import (
+    ARCHIVE_SCHEMA, add_months, detach_partitions, ensure_partitions)
+
+PARTITIONED_MODELS = [Transaction]
+
+
+class Command(BaseCommand):
+    help = "Create upcoming monthly partitions and detach old ones."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months-ahead', type=int, default=3,
+            help="Months after the current one to create partitions for (default: 3).")
+        parser.add_argument(
+            '--keep-months', type=int,
+            help="Detach the partitions older than this many months, counting the current one.")
+        parser.add_argument(
+            '--archive-schema', default=ARCHIVE_SCHEMA,
+            help=f"Schema detached partitions are moved to (default: {ARCHIVE_SCHEMA}).")
+        parser.add_argument(
+            '--drop', action='store_true', help="Drop detached partitions instead of archiving them.")
+
+    def handle(self, *args, **options):
+        if options['months_ahead'] < 0:
+            raise CommandError("--months-ahead cannot be negative.")
+        if options['keep_months'] is not None and options['keep_months'] < 1:
+            raise CommandError("--keep-months must be at least 1.")
+
+        for model in PARTITIONED_MODELS:
+            table = model._meta.db_table.split('"."')[-1]
+            created = ensure_partitions(model, options['months_ahead'])
+            for month in created:
+                self.stdout.write(f"{table}: created the {month:%Y-%m} partition")
+            if options['keep_months']:
+                before = add_months(month_start(timezone.now()), 1 - options['keep_months'])
+                detached = detach_partitions(
+                    model, before, options['archive_schema'], options['drop'])
+                action = "dropped" if options['drop'] else f"moved to {options['archive_schema']}"
+                for name in detached:
+                    self.stdout.write(f"{table}: detached {name} and {action}")
+        self.stdout.write(self.style.SUCCESS("Partitions are up to date."))
@@ -0,0 +1,73 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from employees.db_router import replica_reads
+from employees.models import MonthlyAdvanceLedger
+
+
+class Command(BaseCommand):
+    help = "Rebuild or reconcile the monthly advance ledger from approved salary advance requests."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help="Only report ledger rows that differ from the request history, reading from a replica.")
+        parser.add_argument(
+            '--rebuild', action='store_true',
+            help="Drop every ledger row and recreate the ledger from scratch.")
+
+    def handle(self, *args, **options):
+        if options['rebuild'] and not options['dry_run']:
+            self.rebuild()
+        elif options['dry_run']:
+            with replica_reads():
+                self.reconcile(dry_run=True)
+        else:
+            self.reconcile(dry_run=False)
+
+    def rebuild(self):
+        with transaction.atomic():
+            MonthlyAdvanceLedger.objects.all().delete()
+            rows = [
+                MonthlyAdvanceLedger(
+                    employee_id=row['employee_id'], month=row['month'], advanced_total=row['total'])
+                for row in MonthlyAdvanceLedger.objects.history_totals().iterator()
+            ]
+            MonthlyAdvanceLedger.objects.bulk_create(rows, batch_size=1000)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt ledger with {len(rows)} rows."))
+
+    def reconcile(self, dry_run):
+        current = {
+            (row.employee_id, row.month): row
+            for row in MonthlyAdvanceLedger.objects.all()
+        }
+        to_create, to_update = [], []
+        for row in MonthlyAdvanceLedger.objects.history_totals().iterator():
+            ledger = current.pop((row['employee_id'], row['month']), None)
+            if ledger is None:
+                to_create.append(MonthlyAdvanceLedger(
+                    employee_id=row['employee_id'], month=row['month'], advanced_total=row['total']))
+            elif ledger.advanced_total != row['total']:
+                ledger.advanced_total = row['total']
+                ledger.modified = timezone.now()
+                to_update.append(ledger)
+        stale = [ledger.pk for ledger in current.values() if ledger.advanced_total]
+
+        for ledger in to_create:
+            self.stdout.write(f"missing: {ledger.employee_id} {ledger.month:%Y-%m} {ledger.advanced_total}")
+        for ledger in to_update:
+            self.stdout.write(f"mismatch: {ledger.employee_id} {ledger.month:%Y-%m} {ledger.advanced_total}")
+
+        if not dry_run:
+            with transaction.atomic():
+                MonthlyAdvanceLedger.objects.bulk_create(to_create, batch_size=1000)
+                MonthlyAdvanceLedger.objects.bulk_update(
+                    to_update, ['advanced_total', 'modified'], batch_size=1000)
+                MonthlyAdvanceLedger.objects.filter(pk__in=stale).update(
+                    advanced_total=0, modified=timezone.now())
+
+        verb = "Found" if dry_run else "Fixed"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {len(to_create)} missing, {len(to_update)} mismatched "
+            f"and {len(stale)} stale ledger rows."))
@@ -0,0 +1,31 @@
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+
+from employees.models import Employer
+from employees.services.dashboard import rebuild_summaries
+
+
+class Command(BaseCommand):
+    help = "Recompute the employer dashboard summaries from employees and salary advance requests."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--employer', help="Employer id or name (default: every employer).")
+
+    def handle(self, *args, **options):
+        employer_ids = None
+        if options['employer']:
+            employer_ids = list(Employer.objects.filter(
+                **self.employer_lookup(options['employer'])).values_list('pk', flat=True))
+            if not employer_ids:
+                raise CommandError(f"Employer not found: {options['employer']}")
+        rebuild_summaries(employer_ids)
+        scope = "every employer" if employer_ids is None else f"{len(employer_ids)} employer(s)"
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt the dashboard summaries of {scope}."))
+
+    def employer_lookup(self, value):
+        try:
+            return {'pk': uuid.UUID(value)}
+        except ValueError:
+            return {'name': value}
@@ -0,0 +1,52 @@
+import signal
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+from django.utils import timezone
+
+from employees.services.outbox import process_batch, purge_processed
+
+
+class Command(BaseCommand):
+    help = "Drain the outbox: run the follow-up work of approved salary advances."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help="Events claimed per transaction.")
+        parser.add_argument(
+            '--max-attempts', type=int, default=5, help="Attempts before an event is marked failed.")
+        parser.add_argument(
+            '--poll-interval', type=float, default=1.0, help="Seconds to sleep when the outbox is empty.")
+        parser.add_argument(
+            '--keep-days', type=int, default=7, help="Days to keep processed events before purging them.")
+        parser.add_argument('--once', action='store_true', help="Exit once no event is due.")
+
+    def handle(self, *args, **options):
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        next_purge = time.monotonic()
+
+        while not self.stopping:
+            if not connection.in_atomic_block:
+                # Drop connections the server closed, as a request would.
+                close_old_connections()
+            if time.monotonic() >= next_purge:
+                purged = purge_processed(timezone.now() - timedelta(days=options['keep_days']))
+                if purged:
+                    self.stdout.write(f"Purged {purged} processed events.")
+                next_purge = time.monotonic() + 3600
+
+            done, retried, failed = process_batch(options['batch_size'], options['max_attempts'])
+            if done or retried or failed:
+                self.stdout.write(f"{done} done, {retried} to retry, {failed} failed.")
+            elif options['once']:
+                break
+            else:
+                time.sleep(options['poll_interval'])
+        self.stdout.write(self.style.SUCCESS("Outbox worker stopped."))
+
+    def stop(self, signum, frame):
+        # Finish the current batch, then exit.
+        self.stopping = True
@@ -0,0 +1,59 @@
+import os
+import uuid
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from employees.models import Employer
+from employees.services.payroll import settle_employer, write_deduction_file
+
+
+class Command(BaseCommand):
+    help = "Settle a payroll month: deduct approved salary advances per employer."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--month', help="Month to settle as YYYY-MM (default: the previous month).")
+        parser.add_argument(
+            '--employer', help="Employer id or name (default: every employer).")
+        parser.add_argument(
+            '--output-dir', default='settlements',
+            help="Directory for the per-employer deduction files.")
+
+    def handle(self, *args, **options):
+        month = self.parse_month(options['month'])
+        employers = Employer.objects.order_by('name')
+        if options['employer']:
+            employers = employers.filter(**self.employer_lookup(options['employer']))
+            if not employers.exists():
+                raise CommandError(f"Employer not found: {options['employer']}")
+        os.makedirs(options['output_dir'], exist_ok=True)
+
+        # The employer cursor needs a transaction to avoid WITH HOLD, so the
+        # month commits as a whole; a failed run leaves no settlement behind
+        # and re-running it rewrites the deduction files.
+        with transaction.atomic():
+            for employer in employers.iterator():
+                settlement = settle_employer(employer, month)
+                path = write_deduction_file(settlement, os.path.join(
+                    options['output_dir'], f"deductions_{employer.pk}_{month:%Y-%m}.csv"))
+                self.stdout.write(
+                    f"{employer.name}: {settlement.employee_count} employees, "
+                    f"{settlement.deductions_total} to deduct -> {path}")
+        self.stdout.write(self.style.SUCCESS(f"Settled {month:%Y-%m}."))
+
+    def parse_month(self, value):
+        if not value:
+            return (timezone.localdate().replace(day=1) - timedelta(days=1)).replace(day=1)
+        try:
+            return datetime.strptime(value, '%Y-%m').date()
+        except ValueError:
+            raise CommandError(f"Invalid month {value!r}, expected YYYY-MM.")
+
+    def employer_lookup(self, value):
+        try:
+            return {'pk': uuid.UUID(value)}
+        except ValueError:
+            return {'name': value}
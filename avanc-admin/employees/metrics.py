@@ -0,0 +1,85 @@
+"""Prometheus metrics for the API and the salary advance flow.
+
+Counters and histograms are process-local and cost a lock and an add per
+update. When ``PROMETHEUS_MULTIPROC_DIR`` is set (see ``run_uwsgi.sh``) every
+worker writes its samples to mmap-backed files in that directory and
+``/metrics`` sums them across workers, so scrapes hitting any worker see the
+totals of all of them.
+"""
+import os
+
+from django.db import DatabaseError, connection
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess)
+from prometheus_client.core import GaugeMetricFamily
+
+REQUEST_LATENCY = Histogram(
+    'avanc_http_request_duration_seconds', 'HTTP request latency by URL pattern.',
+    ['method', 'route'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+REQUESTS = Counter(
+    'avanc_http_requests_total', 'HTTP responses by URL pattern and status.',
+    ['method', 'route', 'status'],
+)
+SALARY_ADVANCES_CREATED = Counter(
+    'avanc_salary_advances_created_total', 'Salary advance requests created.')
+SALARY_ADVANCES_APPROVED = Counter(
+    'avanc_salary_advances_approved_total', 'Salary advance requests approved.')
+SALARY_ADVANCES_OVER_CAP = Counter(
+    'avanc_salary_advances_over_cap_total',
+    'Salary advances refused because they exceed the available amount.',
+    ['operation'],
+)
+SIGN_IN_FAILURES = Counter(
+    'avanc_sign_in_failures_total', 'Failed sign-in attempts.', ['reason'])
+
+
+class DatabaseConnectionsCollector:
+    """Server-side connection usage, read from ``pg_stat_activity`` at scrape time.
+
+    Behind pgbouncer these are the pooled server connections.
+    """
+
+    def describe(self):
+        # Registering must not query the database.
+        return self._families()
+
+    def _families(self):
+        return (
+            GaugeMetricFamily(
+                'avanc_db_connections', 'Connections to the application database by state.',
+                labels=['state']),
+            GaugeMetricFamily('avanc_db_max_connections', 'Connection limit of the database server.'),
+        )
+
+    def collect(self):
+        connections, limit = self._families()
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT coalesce(state, 'unknown'), count(*) FROM pg_stat_activity "
+                    "WHERE datname = current_database() GROUP BY 1")
+                rows = cursor.fetchall()
+                cursor.execute("SELECT current_setting('max_connections')::int")
+                max_connections = cursor.fetchone()[0]
+        except DatabaseError:
+            return
+        for state, count in rows:
+            connections.add_metric([state], count)
+        limit.add_metric([], max_connections)
+        yield connections
+        yield limit
+
+
+REGISTRY.register(DatabaseConnectionsCollector())
+
+
+def render():
+    """Return ``(body, content type)`` of the text exposition."""
+    registry = REGISTRY
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        registry.register(DatabaseConnectionsCollector())
+    return generate_latest(registry), CONTENT_TYPE_LATEST
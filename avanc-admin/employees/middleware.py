@@ -0,0 +1,243 @@
+import json
+import logging
+import random
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.http import JsonResponse
+from django.utils.deprecation import MiddlewareMixin
+
+from employees import metrics
+from employees.db_router import set_replica_reads
+from employees.tokens import InvalidToken, verify_token
+
+query_logger = logging.getLogger('employees.queries')
+
+
+class TokenAuthenticationMiddleware(MiddlewareMixin):
+    """Require a bearer access token on the per-employee API routes.
+
+    Routes whose pattern starts with one of ``TOKEN_AUTH_PROTECTED_ROUTES``
+    must send ``Authorization: Bearer <access token>`` issued to the employee
+    in the URL. The authenticated id is stored on ``request.employee_id``.
+    The mixin makes it usable from both sync and async handler chains.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.protected_routes = tuple(settings.TOKEN_AUTH_PROTECTED_ROUTES)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not request.resolver_match.route.startswith(self.protected_routes):
+            return None
+
+        scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+        if scheme.lower() != 'bearer' or not token:
+            return JsonResponse({"error": "Authentication required"}, status=401)
+        try:
+            payload = verify_token(token.strip())
+        except InvalidToken as e:
+            return JsonResponse({"error": str(e)}, status=401)
+
+        if payload['sub'] != str(view_kwargs.get('pk')):
+            return JsonResponse({"error": "Forbidden"}, status=403)
+        request.employee_id = payload['sub']
+        request.auth_token = payload
+        return None
+
+
+class QueryStats:
+    """``execute_wrapper`` that counts and times every statement."""
+
+    sql_max_length = 500
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.slowest_duration = 0.0
+        self.slowest_sql = None
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.count += 1
+            self.duration += elapsed
+            if elapsed >= self.slowest_duration:
+                self.slowest_duration = elapsed
+                self.slowest_sql = sql[:self.sql_max_length]
+
+
+class QueryInstrumentationMiddleware:
+    """Measure the SQL run by a sample of requests.
+
+    ``QUERY_INSTRUMENTATION_SAMPLE_RATE`` of the requests get a
+    ``Server-Timing`` header with the query count and database time, and an
+    INFO line on the ``employees.queries`` logger with the view, the totals
+    and the slowest statement. Requests over ``QUERY_COUNT_WARNING_THRESHOLD``
+    queries or ``QUERY_TIME_WARNING_MS`` of database time log a WARNING
+    instead. Statements run while a streaming response is consumed are not
+    counted. Sync and async capable: under ASGI unsampled requests pass
+    straight through, and sampled ones wrap the connections of the request's
+    ``sync_to_async`` thread, where async views run their queries.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        self.sample_rate = settings.QUERY_INSTRUMENTATION_SAMPLE_RATE
+        self.count_threshold = settings.QUERY_COUNT_WARNING_THRESHOLD
+        self.time_threshold_ms = settings.QUERY_TIME_WARNING_MS
+
+    def _sampled(self):
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def _wrap_connections(self, stats):
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(stats))
+        return stack
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self._sampled():
+            return self.get_response(request)
+
+        stats = QueryStats()
+        start = time.perf_counter()
+        with self._wrap_connections(stats):
+            response = self.get_response(request)
+        return self._report(request, response, stats, start)
+
+    async def __acall__(self, request):
+        if not self._sampled():
+            return await self.get_response(request)
+
+        stats = QueryStats()
+        start = time.perf_counter()
+        # Async code queries through sync_to_async, on the connections of the
+        # request's thread rather than this context's.
+        stack = await sync_to_async(self._wrap_connections)(stats)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        return self._report(request, response, stats, start)
+
+    def _report(self, request, response, stats, start):
+        total_ms = (time.perf_counter() - start) * 1000
+        db_ms = stats.duration * 1000
+
+        response['Server-Timing'] = (
+            f'db;dur={db_ms:.2f};desc="{stats.count} queries", app;dur={total_ms:.2f}')
+
+        match = request.resolver_match
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'queries': stats.count,
+            'db_ms': round(db_ms, 2),
+            'total_ms': round(total_ms, 2),
+            'slowest_ms': round(stats.slowest_duration * 1000, 2),
+            'slowest_sql': stats.slowest_sql,
+        }
+        exceeded = [
+            name for name, over in (
+                ('queries', stats.count > self.count_threshold),
+                ('db_ms', db_ms > self.time_threshold_ms),
+            ) if over
+        ]
+        if exceeded:
+            record['exceeded'] = exceeded
+            query_logger.warning(json.dumps(record))
+        else:
+            query_logger.info(json.dumps(record))
+        return response
+
+
+class MetricsMiddleware(MiddlewareMixin):
+    """Observe request latency and response status per URL pattern.
+
+    The label is the matched route (``api/v1/employees/<uuid:pk>``) rather
+    than the path, so the number of series stays bounded.
+    """
+
+    def process_request(self, request):
+        request._metrics_start = time.perf_counter()
+
+    def process_response(self, request, response):
+        start = getattr(request, '_metrics_start', None)
+        if start is None:
+            return response
+        match = getattr(request, 'resolver_match', None)
+        route = match.route if match else 'unmatched'
+        metrics.REQUEST_LATENCY.labels(request.method, route).observe(time.perf_counter() - start)
+        metrics.REQUESTS.labels(request.method, route, response.status_code).inc()
+        return response
+
+
+class ReplicaMiddleware(MiddlewareMixin):
+    """Send the reads of GET and HEAD requests to a read replica.
+
+    A client that wrote (any other method, answered below 400) reads from
+    the primary for ``READ_YOUR_WRITES_SECONDS`` afterwards, so it sees its
+    own write even while the replicas lag. Browsers are recognised by the
+    ``PRIMARY_COOKIE`` cookie, API clients by their bearer token's employee,
+    so it must come after ``TokenAuthenticationMiddleware``.
+    """
+
+    PRIMARY_COOKIE = 'db_primary_until'
+    safe_methods = ('GET', 'HEAD')
+
+    def _pin_key(self, employee_id):
+        return f'db:primary:{employee_id}'
+
+    def _recently_wrote(self, request):
+        try:
+            if float(request.COOKIES.get(self.PRIMARY_COOKIE, 0)) > time.time():
+                return True
+        except ValueError:
+            pass
+        employee_id = getattr(request, 'employee_id', None)
+        return employee_id is not None and cache.get(self._pin_key(employee_id)) is not None
+
+    def process_request(self, request):
+        # The thread's previous request may have left replica reads on; reads
+        # before process_view, or in responses short-circuited before it, go
+        # to the primary.
+        set_replica_reads(False)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        set_replica_reads(
+            bool(settings.REPLICA_DATABASES) and request.method in self.safe_methods
+            and not self._recently_wrote(request))
+        return None
+
+    def process_response(self, request, response):
+        # Streaming responses read while they are consumed; request_finished
+        # turns replica reads off once they are closed.
+        if not response.streaming:
+            set_replica_reads(False)
+        if request.method in self.safe_methods or response.status_code >= 400:
+            return response
+        window = settings.READ_YOUR_WRITES_SECONDS
+        response.set_cookie(
+            self.PRIMARY_COOKIE, f'{time.time() + window:.0f}', max_age=window, httponly=True, samesite='Lax')
+        employee_id = getattr(request, 'employee_id', None)
+        if employee_id is not None:
+            cache.set(self._pin_key(employee_id), 1, timeout=window)
+        return response
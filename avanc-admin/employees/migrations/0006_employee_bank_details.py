@@ -0,0 +1,64 @@
+# Generated by Django 4.2.11 on 2026-10-18 11:48
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("employees", "0005_alter_salaryadvancerequest_status"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="employee",
+            name="bank_account",
+            field=models.CharField(
+                default="1234567", max_length=20, verbose_name="bank account"
+            ),
+        ),
+        migrations.AddField(
+            model_name="employee",
+            name="bank_name",
+            field=models.CharField(
+                choices=[
+                    ("Banco Unión S.A.", "Banco Unión S.A."),
+                    (
+                        "Banco Mercantil Santa Cruz S.A.",
+                        "Banco Mercantil Santa Cruz S.A.",
+                    ),
+                    (
+                        "Banco Nacional de Bolivia S.A. (BNB)",
+                        "Banco Nacional de Bolivia S.A. (BNB)",
+                    ),
+                    ("Banco BISA S.A.", "Banco BISA S.A."),
+                    (
+                        "Banco de Crédito de Bolivia S.A. (BCP)",
+                        "Banco de Crédito de Bolivia S.A. (BCP)",
+                    ),
+                    ("Banco Ganadero S.A.", "Banco Ganadero S.A."),
+                    ("Banco Económico S.A.", "Banco Económico S.A."),
+                    ("BancoSol S.A.", "BancoSol S.A."),
+                    ("Banco FIE S.A.", "Banco FIE S.A."),
+                ],
+                default="Banco Unión S.A.",
+                max_length=100,
+                verbose_name="bank name",
+            ),
+        ),
+        migrations.AddField(
+            model_name="employee",
+            name="city",
+            field=models.CharField(
+                default="Santa Cruz de la Sierra", max_length=100, verbose_name="city"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="salaryadvancerequest",
+            name="request_date",
+            field=models.DateTimeField(
+                default=django.utils.timezone.now, verbose_name="request date"
+            ),
+        ),
+    ]
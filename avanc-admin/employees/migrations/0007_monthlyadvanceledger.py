@@ -0,0 +1,88 @@
+# Generated by Django 4.2.11 on 2026-10-18 11:48
+
+from django.db import migrations, models
+from django.db.models import Sum
+from django.db.models.functions import TruncMonth
+import django.db.models.deletion
+import uuid
+
+
+def populate_ledger(apps, schema_editor):
+    SalaryAdvanceRequest = apps.get_model("employees", "SalaryAdvanceRequest")
+    MonthlyAdvanceLedger = apps.get_model("employees", "MonthlyAdvanceLedger")
+    totals = (
+        SalaryAdvanceRequest.objects.filter(
+            status="aprobado", review_date__isnull=False
+        )
+        .annotate(month=TruncMonth("review_date", output_field=models.DateField()))
+        .values("employee_id", "month")
+        .annotate(total=Sum("amount_requested"))
+        .order_by()
+    )
+    MonthlyAdvanceLedger.objects.bulk_create(
+        [
+            MonthlyAdvanceLedger(
+                employee_id=row["employee_id"],
+                month=row["month"],
+                advanced_total=row["total"],
+            )
+            for row in totals.iterator()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("employees", "0006_employee_bank_details"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MonthlyAdvanceLedger",
+            fields=[
+                ("created", models.DateTimeField(auto_now_add=True)),
+                ("modified", models.DateTimeField(auto_now=True)),
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("month", models.DateField(verbose_name="month")),
+                (
+                    "advanced_total",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        max_digits=12,
+                        verbose_name="advanced total",
+                    ),
+                ),
+                (
+                    "employee",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="monthly_advances",
+                        to="employees.employee",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Monthly Advance Ledger",
+                "verbose_name_plural": "Monthly Advance Ledgers",
+                "db_table": 'fintech"."monthly_advance_ledger',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="monthlyadvanceledger",
+            constraint=models.UniqueConstraint(
+                fields=("employee", "month"), name="unique_employee_month_ledger"
+            ),
+        ),
+        migrations.RunPython(populate_ledger, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.11 on 2026-10-18 11:51
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # The indexes are built without blocking writes: the release step runs
+    # migrations while the previous version is still serving.
+    atomic = False
+
+    dependencies = [
+        ("employees", "0007_monthlyadvanceledger"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="employee",
+            index=models.Index(
+                fields=["created", "id"], name="employee_created_id_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="employee",
+            index=models.Index(
+                fields=["employer", "created", "id"], name="employee_employer_page_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="employee",
+            index=models.Index(
+                fields=["city", "created", "id"], name="employee_city_page_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="employee",
+            index=models.Index(
+                fields=["bank_name", "created", "id"], name="employee_bank_page_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,100 @@
+# Generated by Django 4.2.11 on 2026-10-18 11:56
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def check_duplicate_emails(apps, schema_editor):
+    Employee = apps.get_model("employees", "Employee")
+    duplicates = list(
+        Employee.objects.values("email")
+        .annotate(count=Count("id"))
+        .filter(count__gt=1)
+        .values_list("email", flat=True)[:20]
+    )
+    if duplicates:
+        raise RuntimeError(
+            "Cannot make Employee.email unique, duplicated emails: "
+            + ", ".join(duplicates)
+        )
+
+
+class Migration(migrations.Migration):
+    # The indexes and the email constraint are built without blocking
+    # writes: the release step runs migrations while the previous version is
+    # still serving.
+    atomic = False
+
+    dependencies = [
+        ("employees", "0008_employee_listing_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(check_duplicate_emails, migrations.RunPython.noop),
+        # The schema editor would build these under a write lock, and does
+        # not find them on the schema-qualified tables when reversing.
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    [
+                        'CREATE UNIQUE INDEX CONCURRENTLY "employee_email_b10e8c9e_uniq" '
+                        'ON "fintech"."employee" ("email")',
+                        'ALTER TABLE "fintech"."employee" ADD CONSTRAINT "employee_email_b10e8c9e_uniq" '
+                        'UNIQUE USING INDEX "employee_email_b10e8c9e_uniq"',
+                        'CREATE INDEX CONCURRENTLY "employee_email_b10e8c9e_like" '
+                        'ON "fintech"."employee" ("email" varchar_pattern_ops)',
+                    ],
+                    [
+                        'DROP INDEX CONCURRENTLY "fintech"."employee_email_b10e8c9e_like"',
+                        'ALTER TABLE "fintech"."employee" DROP CONSTRAINT "employee_email_b10e8c9e_uniq"',
+                    ],
+                ),
+                migrations.RunSQL(
+                    [
+                        'CREATE INDEX CONCURRENTLY "employer_name_54536acc" ON "fintech"."employer" ("name")',
+                        'CREATE INDEX CONCURRENTLY "employer_name_54536acc_like" '
+                        'ON "fintech"."employer" ("name" varchar_pattern_ops)',
+                    ],
+                    [
+                        'DROP INDEX CONCURRENTLY "fintech"."employer_name_54536acc_like"',
+                        'DROP INDEX CONCURRENTLY "fintech"."employer_name_54536acc"',
+                    ],
+                ),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name="employee",
+                    name="email",
+                    field=models.EmailField(max_length=254, unique=True, verbose_name="email"),
+                ),
+                migrations.AlterField(
+                    model_name="employer",
+                    name="name",
+                    field=models.CharField(db_index=True, max_length=255, verbose_name="name"),
+                ),
+            ],
+        ),
+        AddIndexConcurrently(
+            model_name="salaryadvancerequest",
+            index=models.Index(
+                fields=["employee", "status", "review_date"],
+                name="sar_employee_status_review_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="salaryadvancerequest",
+            index=models.Index(
+                condition=models.Q(("status", "aprobado")),
+                fields=["employee", "review_date"],
+                name="sar_approved_review_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="transaction",
+            index=models.Index(
+                fields=["request", "transaction_date"],
+                name="transaction_request_date_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,161 @@
+# Generated by Django 4.2.11 on 2026-10-18 12:32
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("employees", "0009_hot_path_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PayrollSettlement",
+            fields=[
+                ("created", models.DateTimeField(auto_now_add=True)),
+                ("modified", models.DateTimeField(auto_now=True)),
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("month", models.DateField(verbose_name="month")),
+                ("period_start", models.DateTimeField(verbose_name="period start")),
+                ("period_end", models.DateTimeField(verbose_name="period end")),
+                (
+                    "employee_count",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="employee count"
+                    ),
+                ),
+                (
+                    "advances_total",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        max_digits=14,
+                        verbose_name="advances total",
+                    ),
+                ),
+                (
+                    "transactions_total",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        max_digits=14,
+                        verbose_name="transactions total",
+                    ),
+                ),
+                (
+                    "deductions_total",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        max_digits=14,
+                        verbose_name="deductions total",
+                    ),
+                ),
+                (
+                    "employer",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="payroll_settlements",
+                        to="employees.employer",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Payroll Settlement",
+                "verbose_name_plural": "Payroll Settlements",
+                "db_table": 'fintech"."payroll_settlement',
+            },
+        ),
+        migrations.CreateModel(
+            name="SettlementLine",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "advances_count",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="advances count"
+                    ),
+                ),
+                (
+                    "advances_total",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        max_digits=12,
+                        verbose_name="advances total",
+                    ),
+                ),
+                (
+                    "transactions_total",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        max_digits=12,
+                        verbose_name="transactions total",
+                    ),
+                ),
+                (
+                    "deduction",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        max_digits=12,
+                        verbose_name="deduction",
+                    ),
+                ),
+                (
+                    "employee",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="settlement_lines",
+                        to="employees.employee",
+                    ),
+                ),
+                (
+                    "settlement",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="lines",
+                        to="employees.payrollsettlement",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Settlement Line",
+                "verbose_name_plural": "Settlement Lines",
+                "db_table": 'fintech"."settlement_line',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="settlementline",
+            constraint=models.UniqueConstraint(
+                fields=("settlement", "employee"),
+                name="unique_settlement_employee_line",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="payrollsettlement",
+            constraint=models.UniqueConstraint(
+                fields=("employer", "month"), name="unique_employer_month_settlement"
+            ),
+        ),
+    ]
@@ -0,0 +1,223 @@
+# Generated by Django 4.2.11 on 2026-10-18 12:43
+
+from django.db import migrations, models
+from django.utils import timezone
+import django.db.models.deletion
+import uuid
+
+
+def populate_summaries(apps, schema_editor):
+    # The summaries as of this migration; later schema changes must not
+    # change what it writes, so the SQL is not shared with the app code.
+    tz = timezone.get_current_timezone_name()
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            """
+            INSERT INTO "fintech"."employer_summary"
+                (id, created, modified, employer_id, employee_count, salary_total,
+                 pending_count, pending_total)
+            SELECT gen_random_uuid(), now(), now(), e.employer_id, COUNT(*), SUM(e.salary),
+                   COALESCE(SUM(p.pending_count), 0), COALESCE(SUM(p.pending_total), 0)
+            FROM "fintech"."employee" e
+            LEFT JOIN (
+                SELECT employee_id, COUNT(*) AS pending_count, SUM(amount_requested) AS pending_total
+                FROM "fintech"."salary_advance_request" WHERE status = 'pendiente' GROUP BY employee_id
+            ) p ON p.employee_id = e.id
+            GROUP BY e.employer_id
+            """)
+        cursor.execute(
+            """
+            INSERT INTO "fintech"."employer_monthly_summary"
+                (id, created, modified, employer_id, month, requested_count, approved_count,
+                 approved_total, rejected_count)
+            SELECT gen_random_uuid(), now(), now(), employer_id, month, SUM(requested_count),
+                   SUM(approved_count), SUM(approved_total), SUM(rejected_count)
+            FROM (
+                SELECT e.employer_id, date_trunc('month', r.request_date AT TIME ZONE %(tz)s)::date AS month,
+                       1 AS requested_count, 0 AS approved_count, 0 AS approved_total,
+                       0 AS rejected_count
+                FROM "fintech"."salary_advance_request" r JOIN "fintech"."employee" e ON e.id = r.employee_id
+                UNION ALL
+                SELECT e.employer_id, date_trunc('month', r.review_date AT TIME ZONE %(tz)s)::date,
+                       0, (r.status = 'aprobado')::int,
+                       CASE WHEN r.status = 'aprobado' THEN r.amount_requested ELSE 0 END,
+                       (r.status = 'rechazado')::int
+                FROM "fintech"."salary_advance_request" r JOIN "fintech"."employee" e ON e.id = r.employee_id
+                WHERE r.status IN ('aprobado', 'rechazado') AND r.review_date IS NOT NULL
+            ) changes
+            GROUP BY employer_id, month
+            """, {'tz': tz})
+        cursor.execute(
+            """
+            INSERT INTO "fintech"."employer_bank_summary"
+                (id, created, modified, employer_id, bank_name, employee_count)
+            SELECT gen_random_uuid(), now(), now(), e.employer_id, e.bank_name, COUNT(*)
+            FROM "fintech"."employee" e
+            GROUP BY e.employer_id, e.bank_name
+            """)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("employees", "0010_payroll_settlement"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EmployerSummary",
+            fields=[
+                ("created", models.DateTimeField(auto_now_add=True)),
+                ("modified", models.DateTimeField(auto_now=True)),
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "employee_count",
+                    models.IntegerField(default=0, verbose_name="employee count"),
+                ),
+                (
+                    "salary_total",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        max_digits=16,
+                        verbose_name="salary total",
+                    ),
+                ),
+                (
+                    "pending_count",
+                    models.IntegerField(default=0, verbose_name="pending count"),
+                ),
+                (
+                    "pending_total",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        max_digits=16,
+                        verbose_name="pending total",
+                    ),
+                ),
+                (
+                    "employer",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="summary",
+                        to="employees.employer",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Employer Summary",
+                "verbose_name_plural": "Employer Summaries",
+                "db_table": 'fintech"."employer_summary',
+            },
+        ),
+        migrations.CreateModel(
+            name="EmployerMonthlySummary",
+            fields=[
+                ("created", models.DateTimeField(auto_now_add=True)),
+                ("modified", models.DateTimeField(auto_now=True)),
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("month", models.DateField(verbose_name="month")),
+                (
+                    "requested_count",
+                    models.IntegerField(default=0, verbose_name="requested count"),
+                ),
+                (
+                    "approved_count",
+                    models.IntegerField(default=0, verbose_name="approved count"),
+                ),
+                (
+                    "approved_total",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        max_digits=16,
+                        verbose_name="approved total",
+                    ),
+                ),
+                (
+                    "rejected_count",
+                    models.IntegerField(default=0, verbose_name="rejected count"),
+                ),
+                (
+                    "employer",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="monthly_summaries",
+                        to="employees.employer",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Employer Monthly Summary",
+                "verbose_name_plural": "Employer Monthly Summaries",
+                "db_table": 'fintech"."employer_monthly_summary',
+            },
+        ),
+        migrations.CreateModel(
+            name="EmployerBankSummary",
+            fields=[
+                ("created", models.DateTimeField(auto_now_add=True)),
+                ("modified", models.DateTimeField(auto_now=True)),
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "bank_name",
+                    models.CharField(max_length=255, verbose_name="bank name"),
+                ),
+                (
+                    "employee_count",
+                    models.IntegerField(default=0, verbose_name="employee count"),
+                ),
+                (
+                    "employer",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="bank_summaries",
+                        to="employees.employer",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Employer Bank Summary",
+                "verbose_name_plural": "Employer Bank Summaries",
+                "db_table": 'fintech"."employer_bank_summary',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="employermonthlysummary",
+            constraint=models.UniqueConstraint(
+                fields=("employer", "month"), name="unique_employer_month_summary"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="employerbanksummary",
+            constraint=models.UniqueConstraint(
+                fields=("employer", "bank_name"), name="unique_employer_bank_summary"
+            ),
+        ),
+        migrations.RunPython(populate_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,100 @@
+# Generated by Django 4.2.11 on 2026-10-18 12:48
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("employees", "0012_outbox_and_disbursements"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DisbursementBatch",
+            fields=[
+                ("created", models.DateTimeField(auto_now_add=True)),
+                ("modified", models.DateTimeField(auto_now=True)),
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "bank_name",
+                    models.CharField(max_length=100, verbose_name="bank name"),
+                ),
+                (
+                    "file_format",
+                    models.CharField(
+                        choices=[("csv", "CSV"), ("fixed", "Fixed width")],
+                        default="csv",
+                        max_length=10,
+                        verbose_name="file format",
+                    ),
+                ),
+                (
+                    "file_name",
+                    models.CharField(
+                        blank=True, max_length=255, verbose_name="file name"
+                    ),
+                ),
+                (
+                    "disbursement_count",
+                    models.IntegerField(default=0, verbose_name="disbursement count"),
+                ),
+                (
+                    "total_amount",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        max_digits=16,
+                        verbose_name="total amount",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Disbursement Batch",
+                "verbose_name_plural": "Disbursement Batches",
+                "db_table": 'fintech"."disbursement_batch',
+            },
+        ),
+        migrations.AddField(
+            model_name="salaryadvancerequest",
+            name="paid_at",
+            field=models.DateTimeField(blank=True, null=True, verbose_name="paid at"),
+        ),
+        migrations.AddField(
+            model_name="disbursement",
+            name="batch",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="disbursements",
+                to="employees.disbursementbatch",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="disbursement",
+            index=models.Index(
+                condition=models.Q(("batch__isnull", True)),
+                fields=["bank_name"],
+                name="disbursement_unbatched_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="salaryadvancerequest",
+            index=models.Index(
+                condition=models.Q(("paid_at__isnull", True), ("status", "aprobado")),
+                fields=["review_date"],
+                name="sar_unpaid_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,83 @@
+# Generated by Django 4.2.11 on 2026-10-18 13:20
+
+from datetime import date, datetime
+
+from django.db import migrations
+from django.utils import timezone
+
+TABLE = '"fintech"."transaction"'
+COPY = '"fintech"."transaction_copy"'
+MONTHS_AHEAD = 3
+
+# The primary key of a partitioned table must contain the partition key, so
+# it is (id, transaction_date) and the database no longer enforces that id
+# is unique on its own. It stays unique because ids are random UUIDs from
+# UUIDMixin's default: rows must never be inserted with an id copied from
+# another row.
+CONSTRAINTS = """
+ALTER TABLE {table} ADD CONSTRAINT transaction_pkey PRIMARY KEY ({pk});
+ALTER TABLE {table} ADD CONSTRAINT transaction_request_id_f8942148_fk_salary_advance_request_id
+    FOREIGN KEY (request_id) REFERENCES "fintech"."salary_advance_request" (id) DEFERRABLE INITIALLY DEFERRED;
+CREATE INDEX transaction_request_id_f8942148 ON {table} (request_id);
+CREATE INDEX transaction_request_date_idx ON {table} (request_id, transaction_date);
+"""
+
+
+# Month math and partition DDL as of this migration, on the migrating
+# connection; employees.services.partitions maintains the partitions later.
+def _next_month(month):
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def _month_start(value):
+    return timezone.localtime(value).date().replace(day=1)
+
+
+def partition_transactions(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"SELECT min(transaction_date) FROM {TABLE}")
+        (oldest,) = cursor.fetchone()
+        cursor.execute(f"ALTER TABLE {TABLE} RENAME TO transaction_copy")
+        cursor.execute(
+            f"CREATE TABLE {TABLE} (LIKE {COPY} INCLUDING DEFAULTS) PARTITION BY RANGE (transaction_date)"
+        )
+        cursor.execute(f'CREATE TABLE "fintech"."transaction_default" PARTITION OF {TABLE} DEFAULT')
+        current = _month_start(timezone.now())
+        last = current
+        for _ in range(MONTHS_AHEAD):
+            last = _next_month(last)
+        month = _month_start(oldest) if oldest else current
+        while month <= last:
+            bounds = [
+                timezone.make_aware(datetime(month.year, month.month, 1)),
+                timezone.make_aware(datetime.combine(_next_month(month), datetime.min.time())),
+            ]
+            cursor.execute(
+                f'CREATE TABLE "fintech"."transaction_p{month:%Y_%m}" PARTITION OF {TABLE} '
+                f"FOR VALUES FROM (%s) TO (%s)",
+                bounds,
+            )
+            month = _next_month(month)
+        cursor.execute(f"INSERT INTO {TABLE} SELECT * FROM {COPY}")
+        cursor.execute(f"DROP TABLE {COPY}")
+        cursor.execute(CONSTRAINTS.format(table=TABLE, pk="id, transaction_date"))
+
+
+def unpartition_transactions(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"ALTER TABLE {TABLE} RENAME TO transaction_copy")
+        cursor.execute(f"CREATE TABLE {TABLE} (LIKE {COPY} INCLUDING DEFAULTS)")
+        cursor.execute(f"INSERT INTO {TABLE} SELECT * FROM {COPY}")
+        cursor.execute(f"DROP TABLE {COPY} CASCADE")
+        cursor.execute(CONSTRAINTS.format(table=TABLE, pk="id"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("employees", "0013_disbursement_batches"),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_transactions, unpartition_transactions),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.11 on 2026-10-18 13:40
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently, TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # The indexes are built without blocking writes: the release step runs
+    # migrations while the previous version is still serving.
+    atomic = False
+
+    dependencies = [
+        ("employees", "0014_partition_transactions"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        AddIndexConcurrently(
+            model_name="employee",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["full_name"],
+                name="employee_full_name_trgm",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="employee",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["email"], name="employee_email_trgm", opclasses=["gin_trgm_ops"]
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="employer",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["name"], name="employer_name_trgm", opclasses=["gin_trgm_ops"]
+            ),
+        ),
+    ]
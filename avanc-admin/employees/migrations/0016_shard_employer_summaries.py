@@ -0,0 +1,66 @@
+# Generated by Django 4.2.11 on 2026-10-18 13:41
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    # Summaries ship in the same release as this migration (0011), so no
+    # running version upserts on the constraints it replaces.
+
+    dependencies = [
+        ("employees", "0015_employee_search_indexes"),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name="employermonthlysummary",
+            name="unique_employer_month_summary",
+        ),
+        migrations.AddField(
+            model_name="employermonthlysummary",
+            name="shard",
+            field=models.SmallIntegerField(default=0, verbose_name="shard"),
+        ),
+        migrations.AddField(
+            model_name="employersummary",
+            name="shard",
+            field=models.SmallIntegerField(default=0, verbose_name="shard"),
+        ),
+        # The schema editor does not find the one-to-one's unique constraint
+        # on the schema-qualified table, and the (employer_id, shard)
+        # constraint below indexes employer_id already.
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    'ALTER TABLE "fintech"."employer_summary" DROP CONSTRAINT "employer_summary_employer_id_key"',
+                    'ALTER TABLE "fintech"."employer_summary" ADD CONSTRAINT "employer_summary_employer_id_key" '
+                    'UNIQUE ("employer_id")',
+                ),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name="employersummary",
+                    name="employer",
+                    field=models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="summaries",
+                        to="employees.employer",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="employermonthlysummary",
+            constraint=models.UniqueConstraint(
+                fields=("employer", "month", "shard"),
+                name="unique_employer_month_summary_shard",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="employersummary",
+            constraint=models.UniqueConstraint(
+                fields=("employer", "shard"), name="unique_employer_summary_shard"
+            ),
+        ),
+    ]
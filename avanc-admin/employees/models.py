@@ -1,12 +1,22 @@
 import uuid
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
 from decimal import Decimal
-from django.db.models import Sum
+from django.db import connections, models, transaction
+from django.db.models import OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, TruncMonth
 from django.core.exceptions import ValidationError
 
+from employees import metrics
+
+
+def month_start(value):
+    """Return the first day of the month ``value`` falls in (local time)."""
+    return timezone.localtime(value).date().replace(day=1)
+
+
 class TimeStampedMixin(models.Model):
     created = models.DateTimeField(auto_now_add=True)
     modified = models.DateTimeField(auto_now=True)
@@ -23,7 +33,7 @@ class UUIDMixin(models.Model):
 
 
 class Employer(TimeStampedMixin, UUIDMixin):
-    name = models.CharField(_('name'), max_length=255)
+    name = models.CharField(_('name'), max_length=255, db_index=True)
     address = models.TextField(_('address'), blank=True)
     contact_email = models.EmailField(_('contact email'), blank=True)
     contact_phone = models.CharField(
@@ -36,6 +46,49 @@ class Employer(TimeStampedMixin, UUIDMixin):
         db_table = "fintech\".\"employer"
         verbose_name = _('Employer')
         verbose_name_plural = _('Employers')
+        indexes = [
+            # Employee search (employees.services.search).
+            GinIndex(fields=['name'], name='employer_name_trgm', opclasses=['gin_trgm_ops']),
+        ]
+
+
+class EmployeeQuerySet(models.QuerySet):
+    def with_current_month_advances(self):
+        """Annotate ``current_month_advanced`` from the ledger in the same query."""
+        ledger = MonthlyAdvanceLedger.objects.filter(
+            employee=OuterRef('pk'),
+            month=month_start(timezone.now()),
+        ).values('advanced_total')[:1]
+        return self.annotate(current_month_advanced=Coalesce(
+            Subquery(ledger), Value(Decimal('0')), output_field=models.DecimalField()))
+
+    def lock_for_advance(self, employee_id):
+        """Lock the employee row until the end of the transaction.
+
+        The month total is read in a separate statement once the lock is held:
+        a subquery in the locking SELECT would still see the snapshot taken
+        before waiting on a concurrent approval.
+        """
+        employee = self.select_for_update().get(pk=employee_id)
+        employee.current_month_advanced = employee.get_current_month_advances()
+        return employee
+
+    def lock_many_for_advance(self, employee_ids):
+        """Lock several employees and return them by primary key.
+
+        Rows are locked in primary key order so concurrent batches cannot
+        deadlock, and the month totals are read afterwards in one statement.
+        """
+        employees = {
+            employee.pk: employee
+            for employee in self.select_for_update().filter(pk__in=employee_ids).order_by('pk')
+        }
+        totals = dict(MonthlyAdvanceLedger.objects.filter(
+            employee_id__in=employees, month=month_start(timezone.now()),
+        ).values_list('employee_id', 'advanced_total'))
+        for pk, employee in employees.items():
+            employee.current_month_advanced = totals.get(pk, Decimal('0'))
+        return employees
 
 
 class Employee(TimeStampedMixin, UUIDMixin):
@@ -64,39 +117,60 @@ class Employee(TimeStampedMixin, UUIDMixin):
     employer = models.ForeignKey(
         Employer, on_delete=models.CASCADE, related_name='employees')
     full_name = models.CharField(_('full name'), max_length=255)
-    email = models.EmailField(_('email'))
+    email = models.EmailField(_('email'), unique=True)
     phone = models.CharField(_('phone'), max_length=15, blank=True)
     salary = models.DecimalField(
         _('salary'), max_digits=10, decimal_places=2, validators=[MinValueValidator(0)])
 
     bank_account = models.CharField(_('bank account'), max_length=20, default="1234567")
     bank_name = models.CharField(
-        _('bank name'), 
+        _('bank name'),
         max_length=100,
         choices=BANK_CHOICES,
         default=BANCO_UNION
-    )    
-    
+    )
+
     city = models.CharField(_('city'), max_length=100, default="Santa Cruz de la Sierra")
     password = models.CharField(_('password'), max_length=128)
 
+    ADVANCE_LIMIT_RATIO = Decimal('0.70')
+
+    objects = EmployeeQuerySet.as_manager()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Loaded state, compared on save to keep the employer summaries current.
+        if {'employer_id', 'salary', 'bank_name'} <= set(field_names):
+            instance._summary_state = instance.summary_state()
+        return instance
+
+    def summary_state(self):
+        return (self.employer_id, self.salary, self.bank_name)
+
     def get_current_month_advances(self):
-        current_date = timezone.now()
-        return SalaryAdvanceRequest.objects.filter(
+        if hasattr(self, 'current_month_advanced'):
+            return self.current_month_advanced
+        totals = MonthlyAdvanceLedger.objects.filter(
             employee=self,
-            status=SalaryAdvanceRequest.APPROVED,
-            review_date__year=current_date.year,
-            review_date__month=current_date.month
-        ).aggregate(total=Sum('amount_requested'))['total'] or 0
+            month=month_start(timezone.now()),
+        ).values_list('advanced_total', flat=True)
+        return totals[0] if totals else 0
+
+    @property
+    def advance_limit(self):
+        return self.salary * self.ADVANCE_LIMIT_RATIO
 
     @property
     def available_amount(self):
-        return (self.salary * Decimal('0.70')) - self.get_current_month_advances()
+        return self.advance_limit - self.get_current_month_advances()
 
     def update_available_amount(self, amount_to_subtract):
-        if self.available_amount >= amount_to_subtract:
+        available_amount = self.available_amount
+        if available_amount >= amount_to_subtract:
             return True
-        raise ValueError("Requested amount exceeds available amount")
+        raise ValueError(
+            f"Amount requested ({amount_to_subtract}) exceeds available amount ({available_amount})")
 
     def get_all_transactions(self):
         return Transaction.objects.filter(request__employee=self)
@@ -108,6 +182,16 @@ class Employee(TimeStampedMixin, UUIDMixin):
         db_table = "fintech\".\"employee"
         verbose_name = _('Employee')
         verbose_name_plural = _('Employees')
+        indexes = [
+            # Keyset pagination of the employee listing, unfiltered and per filter.
+            models.Index(fields=['created', 'id'], name='employee_created_id_idx'),
+            models.Index(fields=['employer', 'created', 'id'], name='employee_employer_page_idx'),
+            models.Index(fields=['city', 'created', 'id'], name='employee_city_page_idx'),
+            models.Index(fields=['bank_name', 'created', 'id'], name='employee_bank_page_idx'),
+            # Employee search (employees.services.search).
+            GinIndex(fields=['full_name'], name='employee_full_name_trgm', opclasses=['gin_trgm_ops']),
+            GinIndex(fields=['email'], name='employee_email_trgm', opclasses=['gin_trgm_ops']),
+        ]
 
 
 class SalaryAdvanceRequest(TimeStampedMixin, UUIDMixin):
@@ -129,39 +213,110 @@ class SalaryAdvanceRequest(TimeStampedMixin, UUIDMixin):
         _('status'), max_length=20, choices=STATUS_CHOICES, default=PENDING, auto_created=True)
     request_date = models.DateTimeField(_('request date'), default=timezone.now)
     review_date = models.DateTimeField(_('review date'), null=True, blank=True)
+    paid_at = models.DateTimeField(_('paid at'), null=True, blank=True)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if {'employee_id', 'status', 'amount_requested', 'request_date', 'review_date'} <= set(field_names):
+            instance._summary_state = instance.summary_state()
+        return instance
+
+    def summary_state(self):
+        """What the employer summaries count this request as."""
+        return (
+            self.employee_id,
+            self.status,
+            Decimal(self.amount_requested),
+            month_start(self.request_date),
+            month_start(self.review_date) if self.review_date else None,
+        )
 
     def __str__(self):
         return f"Request {self.id} by {self.employee.full_name}"
 
     def clean(self):
         if self.amount_requested and self.employee:
-            if self.amount_requested > self.employee.available_amount:
+            available_amount = self.employee.available_amount
+            if self.amount_requested > available_amount:
                 raise ValidationError({
                     'amount_requested': _(
                         'Amount requested (%(requested)s) exceeds available amount (%(available)s)'
                     ) % {
                         'requested': self.amount_requested,
-                        'available': self.employee.available_amount,
+                        'available': available_amount,
                     }
                 })
 
+    def ledger_entries(self, sign=1):
+        """``MonthlyAdvanceLedger.record_many`` triples for what this request counts."""
+        if self.status != self.APPROVED or not self.review_date:
+            return []
+        return [(self.employee_id, self.review_date, sign * Decimal(self.amount_requested))]
+
     def save(self, *args, **kwargs):
-        if self.status == self.APPROVED and not self.review_date:
+        newly_approved = self.status == self.APPROVED and not self.review_date
+        if newly_approved:
             self.review_date = timezone.now()
-            if hasattr(self, 'employee'):
-                self.employee.update_available_amount(self.amount_requested)
         elif self.status == self.REJECTED:
             self.review_date = timezone.now()
-        
-        super().save(*args, **kwargs)
+
+        with transaction.atomic(savepoint=False):
+            stored = None
+            if newly_approved:
+                employee = Employee.objects.lock_for_advance(self.employee_id)
+                try:
+                    employee.update_available_amount(self.amount_requested)
+                except ValueError:
+                    metrics.SALARY_ADVANCES_OVER_CAP.labels('approve').inc()
+                    raise
+                # Concurrent saves of the same pending request must approve
+                # it only once, as in approve_salary_advance.
+                if not self._state.adding and not type(self)._base_manager.filter(
+                    pk=self.pk, status=self.PENDING,
+                ).update(status=self.APPROVED, review_date=self.review_date, modified=timezone.now()):
+                    raise ValueError("Only pending salary advance requests can be approved")
+            elif not self._state.adding:
+                stored = type(self)._base_manager.select_for_update().filter(
+                    pk=self.pk, status=self.APPROVED).first()
+            super().save(*args, **kwargs)
+            if newly_approved:
+                MonthlyAdvanceLedger.objects.record_many(self.ledger_entries())
+                # The post_save signal already updates the employer summaries.
+                OutboxEvent.objects.enqueue_approvals([self], summaries=False)
+            elif stored is not None:
+                # An approved request was edited: move its amount in the ledger.
+                if stored.ledger_entries() != self.ledger_entries():
+                    MonthlyAdvanceLedger.objects.record_many(
+                        stored.ledger_entries(sign=-1) + self.ledger_entries())
+        if newly_approved:
+            metrics.SALARY_ADVANCES_APPROVED.inc()
 
     class Meta:
         db_table = "fintech\".\"salary_advance_request"
         verbose_name = _('Salary Advance Request')
         verbose_name_plural = _('Salary Advance Requests')
+        indexes = [
+            models.Index(
+                fields=['employee', 'status', 'review_date'], name='sar_employee_status_review_idx'),
+            # Monthly approved totals per employee (ledger rebuilds, reporting).
+            models.Index(
+                fields=['employee', 'review_date'], name='sar_approved_review_idx',
+                condition=models.Q(status='aprobado')),
+            # Approved requests not yet in a disbursement file.
+            models.Index(
+                fields=['review_date'], name='sar_unpaid_idx',
+                condition=models.Q(status='aprobado', paid_at__isnull=True)),
+        ]
 
 
 class Transaction(UUIDMixin):
+    """Partitioned by month of ``transaction_date`` (``employees.services.partitions``).
+
+    The primary key is ``(id, transaction_date)`` in the database, so ``id`` is
+    only unique because it is a random UUID; never insert rows with a reused id.
+    """
+
     request = models.ForeignKey(
         SalaryAdvanceRequest, on_delete=models.CASCADE, related_name='transactions')
     transaction_date = models.DateTimeField(
@@ -176,3 +331,345 @@ class Transaction(UUIDMixin):
         db_table = "fintech\".\"transaction"
         verbose_name = _('Transaction')
         verbose_name_plural = _('Transactions')
+        indexes = [
+            models.Index(fields=['request', 'transaction_date'], name='transaction_request_date_idx'),
+        ]
+
+
+class MonthlyAdvanceLedgerManager(models.Manager):
+    def record(self, employee_id, review_date, amount):
+        """Add an approved advance to the employee's ledger row for its month."""
+        self.record_many([(employee_id, review_date, amount)])
+
+    def record_many(self, advances):
+        """Upsert ``(employee_id, review_date, amount)`` triples in one statement.
+
+        Rows for the same employee and month are merged into the running
+        total with ``INSERT ... ON CONFLICT DO UPDATE``.
+        """
+        totals = {}
+        for employee_id, review_date, amount in advances:
+            key = (employee_id, month_start(review_date))
+            totals[key] = totals.get(key, 0) + amount
+        if not totals:
+            return
+
+        now = timezone.now()
+        connection = connections[self.db]
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        values = ", ".join(["(%s, %s, %s, %s, %s, %s)"] * len(totals))
+        params = []
+        for (employee_id, month), amount in totals.items():
+            params += [uuid.uuid4(), now, now, employee_id, month, amount]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {table} AS ledger "
+                f"(id, created, modified, employee_id, month, advanced_total) "
+                f"VALUES {values} "
+                f"ON CONFLICT (employee_id, month) DO UPDATE SET "
+                f"advanced_total = ledger.advanced_total + EXCLUDED.advanced_total, "
+                f"modified = EXCLUDED.modified",
+                params,
+            )
+
+    def history_totals(self):
+        """Approved advance totals per employee and month, from request history."""
+        return (
+            SalaryAdvanceRequest.objects
+            .filter(status=SalaryAdvanceRequest.APPROVED, review_date__isnull=False)
+            .annotate(month=TruncMonth('review_date', output_field=models.DateField()))
+            .values('employee_id', 'month')
+            .annotate(total=Sum('amount_requested'))
+            .order_by()
+        )
+
+
+class MonthlyAdvanceLedger(TimeStampedMixin, UUIDMixin):
+    """Running total of approved advances per employee and calendar month.
+
+    Kept up to date by ``SalaryAdvanceRequest.save()`` on approval and on
+    edits of approved requests, and on their deletion, so that
+    ``Employee.available_amount`` is a single-row lookup. Use the
+    ``rebuild_advance_ledger`` management command to reconcile it with the
+    request history.
+    """
+    employee = models.ForeignKey(
+        Employee, on_delete=models.CASCADE, related_name='monthly_advances')
+    month = models.DateField(_('month'))
+    advanced_total = models.DecimalField(
+        _('advanced total'), max_digits=12, decimal_places=2, default=0)
+
+    objects = MonthlyAdvanceLedgerManager()
+
+    def __str__(self):
+        return f"{self.employee} {self.month:%Y-%m}: {self.advanced_total}"
+
+    class Meta:
+        db_table = "fintech\".\"monthly_advance_ledger"
+        verbose_name = _('Monthly Advance Ledger')
+        verbose_name_plural = _('Monthly Advance Ledgers')
+        constraints = [
+            models.UniqueConstraint(
+                fields=['employee', 'month'], name='unique_employee_month_ledger'),
+        ]
+
+
+class PayrollSettlement(TimeStampedMixin, UUIDMixin):
+    """An employer's payroll month closed by ``settle_payroll``.
+
+    Totals summarize the ``SettlementLine`` rows; re-running the settlement
+    for the same employer and month replaces them.
+    """
+    employer = models.ForeignKey(
+        Employer, on_delete=models.CASCADE, related_name='payroll_settlements')
+    month = models.DateField(_('month'))
+    period_start = models.DateTimeField(_('period start'))
+    period_end = models.DateTimeField(_('period end'))
+    employee_count = models.PositiveIntegerField(_('employee count'), default=0)
+    advances_total = models.DecimalField(
+        _('advances total'), max_digits=14, decimal_places=2, default=0)
+    transactions_total = models.DecimalField(
+        _('transactions total'), max_digits=14, decimal_places=2, default=0)
+    deductions_total = models.DecimalField(
+        _('deductions total'), max_digits=14, decimal_places=2, default=0)
+
+    def __str__(self):
+        return f"{self.employer} {self.month:%Y-%m} {self.shard}"
+
+    class Meta:
+        db_table = "fintech\".\"payroll_settlement"
+        verbose_name = _('Payroll Settlement')
+        verbose_name_plural = _('Payroll Settlements')
+        constraints = [
+            models.UniqueConstraint(
+                fields=['employer', 'month'], name='unique_employer_month_settlement'),
+        ]
+
+
+class SettlementLine(UUIDMixin):
+    """One employee's approved advances and transactions in a settled month."""
+    settlement = models.ForeignKey(
+        PayrollSettlement, on_delete=models.CASCADE, related_name='lines')
+    employee = models.ForeignKey(
+        Employee, on_delete=models.CASCADE, related_name='settlement_lines')
+    advances_count = models.PositiveIntegerField(_('advances count'), default=0)
+    advances_total = models.DecimalField(
+        _('advances total'), max_digits=12, decimal_places=2, default=0)
+    transactions_total = models.DecimalField(
+        _('transactions total'), max_digits=12, decimal_places=2, default=0)
+    deduction = models.DecimalField(
+        _('deduction'), max_digits=12, decimal_places=2, default=0)
+
+    def __str__(self):
+        return f"{self.employee}: {self.deduction}"
+
+    class Meta:
+        db_table = "fintech\".\"settlement_line"
+        verbose_name = _('Settlement Line')
+        verbose_name_plural = _('Settlement Lines')
+        constraints = [
+            models.UniqueConstraint(
+                fields=['settlement', 'employee'], name='unique_settlement_employee_line'),
+        ]
+
+
+class EmployerSummary(TimeStampedMixin, UUIDMixin):
+    """Current totals of an employer, kept up to date by
+    ``employees.services.dashboard`` as employees and requests change.
+
+    The totals are split over up to ``dashboard.SUMMARY_SHARDS`` rows per
+    employer, one per ``shard``, so concurrent writes for different employees
+    rarely wait on the same row; readers add the shards up.
+    """
+    employer = models.ForeignKey(
+        Employer, on_delete=models.CASCADE, related_name='summaries')
+    shard = models.SmallIntegerField(_('shard'), default=0)
+    employee_count = models.IntegerField(_('employee count'), default=0)
+    salary_total = models.DecimalField(_('salary total'), max_digits=16, decimal_places=2, default=0)
+    pending_count = models.IntegerField(_('pending count'), default=0)
+    pending_total = models.DecimalField(_('pending total'), max_digits=16, decimal_places=2, default=0)
+
+    def __str__(self):
+        return f"{self.employer} summary {self.shard}"
+
+    class Meta:
+        db_table = "fintech\".\"employer_summary"
+        verbose_name = _('Employer Summary')
+        verbose_name_plural = _('Employer Summaries')
+        constraints = [
+            models.UniqueConstraint(fields=['employer', 'shard'], name='unique_employer_summary_shard'),
+        ]
+
+
+class EmployerMonthlySummary(TimeStampedMixin, UUIDMixin):
+    """Requests of an employer's employees per calendar month.
+
+    Requests count in the month they were made; approvals and rejections in
+    the month they were reviewed. Sharded like ``EmployerSummary``.
+    """
+    employer = models.ForeignKey(
+        Employer, on_delete=models.CASCADE, related_name='monthly_summaries')
+    month = models.DateField(_('month'))
+    shard = models.SmallIntegerField(_('shard'), default=0)
+    requested_count = models.IntegerField(_('requested count'), default=0)
+    approved_count = models.IntegerField(_('approved count'), default=0)
+    approved_total = models.DecimalField(_('approved total'), max_digits=16, decimal_places=2, default=0)
+    rejected_count = models.IntegerField(_('rejected count'), default=0)
+
+    def __str__(self):
+        return f"{self.employer} {self.month:%Y-%m} {self.shard}"
+
+    class Meta:
+        db_table = "fintech\".\"employer_monthly_summary"
+        verbose_name = _('Employer Monthly Summary')
+        verbose_name_plural = _('Employer Monthly Summaries')
+        constraints = [
+            models.UniqueConstraint(
+                fields=['employer', 'month', 'shard'], name='unique_employer_month_summary_shard'),
+        ]
+
+
+class EmployerBankSummary(TimeStampedMixin, UUIDMixin):
+    """Employees of an employer per bank."""
+    employer = models.ForeignKey(
+        Employer, on_delete=models.CASCADE, related_name='bank_summaries')
+    bank_name = models.CharField(_('bank name'), max_length=255)
+    employee_count = models.IntegerField(_('employee count'), default=0)
+
+    def __str__(self):
+        return f"{self.employer} {self.bank_name}"
+
+    class Meta:
+        db_table = "fintech\".\"employer_bank_summary"
+        verbose_name = _('Employer Bank Summary')
+        verbose_name_plural = _('Employer Bank Summaries')
+        constraints = [
+            models.UniqueConstraint(
+                fields=['employer', 'bank_name'], name='unique_employer_bank_summary'),
+        ]
+
+
+class OutboxEventManager(models.Manager):
+    def enqueue_approvals(self, salary_requests, summaries=True):
+        """Queue the follow-up work of approved requests in the current transaction.
+
+        ``summaries`` leaves the employer summary update to the worker; pass
+        ``False`` when the caller already applied it.
+        """
+        events = [
+            OutboxEvent(topic=OutboxEvent.SALARY_ADVANCE_APPROVED, payload={
+                'request_id': str(salary_request.pk),
+                'employee_id': str(salary_request.employee_id),
+                'amount': str(salary_request.amount_requested),
+                'request_date': salary_request.request_date.isoformat(),
+                'review_date': salary_request.review_date.isoformat(),
+                'summaries': summaries,
+            })
+            for salary_request in salary_requests
+        ]
+        return self.bulk_create(events)
+
+    def enqueue_import(self, text, fmt):
+        """Queue an employee upload too large to import during the request."""
+        return self.create(topic=OutboxEvent.EMPLOYEES_IMPORT, payload={'format': fmt, 'content': text})
+
+
+class OutboxEvent(TimeStampedMixin, UUIDMixin):
+    """Work to do after a transaction commits, written in that transaction.
+
+    ``run_outbox_worker`` claims pending events with ``SKIP LOCKED`` and runs
+    the handlers of their topic; failures are retried with backoff until
+    ``attempts`` reaches the worker's limit.
+    """
+    SALARY_ADVANCE_APPROVED = 'salary_advance.approved'
+    EMPLOYEES_IMPORT = 'employees.import'
+
+    PENDING = 'pending'
+    DONE = 'done'
+    FAILED = 'failed'
+
+    STATUS_CHOICES = [
+        (PENDING, _('Pending')),
+        (DONE, _('Done')),
+        (FAILED, _('Failed')),
+    ]
+
+    topic = models.CharField(_('topic'), max_length=100)
+    payload = models.JSONField(_('payload'), default=dict)
+    status = models.CharField(_('status'), max_length=20, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.IntegerField(_('attempts'), default=0)
+    available_at = models.DateTimeField(_('available at'), default=timezone.now)
+    processed_at = models.DateTimeField(_('processed at'), null=True, blank=True)
+    last_error = models.TextField(_('last error'), blank=True)
+
+    objects = OutboxEventManager()
+
+    def __str__(self):
+        return f"{self.topic} {self.id} ({self.status})"
+
+    class Meta:
+        db_table = "fintech\".\"outbox_event"
+        verbose_name = _('Outbox Event')
+        verbose_name_plural = _('Outbox Events')
+        indexes = [
+            # The worker's claim query; done events do not bloat it.
+            models.Index(
+                fields=['available_at'], name='outbox_event_pending_idx',
+                condition=models.Q(status='pending')),
+        ]
+
+
+class DisbursementBatch(TimeStampedMixin, UUIDMixin):
+    """One bank's payment file, written by ``generate_disbursements``."""
+    CSV = 'csv'
+    FIXED = 'fixed'
+
+    FORMAT_CHOICES = [
+        (CSV, _('CSV')),
+        (FIXED, _('Fixed width')),
+    ]
+
+    bank_name = models.CharField(_('bank name'), max_length=100)
+    file_format = models.CharField(_('file format'), max_length=10, choices=FORMAT_CHOICES, default=CSV)
+    file_name = models.CharField(_('file name'), max_length=255, blank=True)
+    disbursement_count = models.IntegerField(_('disbursement count'), default=0)
+    total_amount = models.DecimalField(_('total amount'), max_digits=16, decimal_places=2, default=0)
+
+    def __str__(self):
+        return f"{self.bank_name} {self.created:%Y-%m-%d %H:%M}"
+
+    class Meta:
+        db_table = "fintech\".\"disbursement_batch"
+        verbose_name = _('Disbursement Batch')
+        verbose_name_plural = _('Disbursement Batches')
+
+
+class Disbursement(TimeStampedMixin, UUIDMixin):
+    """Payment instruction of an approved advance to the employee's bank account.
+
+    Bank details are copied at approval time, so later profile edits do not
+    redirect a payment that is already under way.
+    """
+    request = models.OneToOneField(
+        SalaryAdvanceRequest, on_delete=models.CASCADE, related_name='disbursement')
+    employee = models.ForeignKey(
+        Employee, on_delete=models.CASCADE, related_name='disbursements')
+    bank_name = models.CharField(_('bank name'), max_length=100)
+    bank_account = models.CharField(_('bank account'), max_length=20)
+    amount = models.DecimalField(_('amount'), max_digits=10, decimal_places=2)
+    batch = models.ForeignKey(
+        DisbursementBatch, on_delete=models.PROTECT, null=True, blank=True, related_name='disbursements')
+
+    def __str__(self):
+        return f"Disbursement of {self.amount} to {self.bank_name} {self.bank_account}"
+
+    class Meta:
+        db_table = "fintech\".\"disbursement"
+        verbose_name = _('Disbursement')
+        verbose_name_plural = _('Disbursements')
+        indexes = [
+            # Disbursements still waiting for a payment file, per bank.
+            models.Index(
+                fields=['bank_name'], name='disbursement_unbatched_idx',
+                condition=models.Q(batch__isnull=True)),
+        ]
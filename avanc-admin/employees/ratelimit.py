@@ -0,0 +1,112 @@
+"""Token bucket rate limiting on the default cache.
+
+A bucket holds up to ``capacity`` tokens and refills continuously at
+``capacity`` tokens per ``period`` seconds; every request takes one token and
+is refused while the bucket is empty. Buckets live in the default cache, so
+every worker sharing the cache (Redis in production, ``LocMemCache`` within a
+process) shares the limits.
+
+On Redis a bucket is updated by one Lua script, which Redis runs atomically,
+so concurrent workers never overwrite each other's takes and no lock is held
+across the round trip. Other backends read and write the bucket separately;
+concurrent takes may let a request or two too many through, which is fine
+for local development.
+"""
+import math
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.redis import RedisCache
+from django.http import JsonResponse
+
+# The Lua version of TokenBucket._take. The bucket is stored as
+# "<tokens> <updated>"; anything else, such as a missing key, is a full bucket.
+TAKE_SCRIPT = """
+local capacity, rate, now = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local tokens = capacity
+local state = redis.call('GET', KEYS[1])
+if state then
+    local stored, updated = string.match(state, '^(%S+) (%S+)$')
+    if stored then
+        tokens = math.min(capacity, tonumber(stored) + math.max(0, now - tonumber(updated)) * rate)
+    end
+end
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    retry_after = (1 - tokens) / rate
+end
+redis.call('SET', KEYS[1], string.format('%.17g %.17g', tokens, now), 'EX', ARGV[4])
+return tostring(retry_after)
+"""
+
+
+class TokenBucket:
+    def __init__(self, name, capacity, period):
+        self.name = name
+        self.capacity = capacity
+        self.period = period
+        self.rate = capacity / period
+
+    @classmethod
+    def from_settings(cls, name):
+        capacity, period = settings.RATE_LIMITS[name]
+        return cls(name, capacity, period)
+
+    def _key(self, identity):
+        return f'ratelimit:{self.name}:{identity}'
+
+    def _take(self, state, now):
+        tokens, updated = state if state is not None else (self.capacity, now)
+        tokens = min(self.capacity, tokens + (now - updated) * self.rate)
+        if tokens >= 1:
+            return (tokens - 1, now), 0
+        return (tokens, now), (1 - tokens) / self.rate
+
+    def take(self, identity):
+        """Take a token for ``identity``; return ``0`` or the seconds to wait."""
+        key = self._key(identity)
+        timeout = int(self.period) + 1
+        backend = caches['default']
+        if isinstance(backend, RedisCache):
+            key = backend.make_and_validate_key(key)
+            script = backend._cache.get_client(key, write=True).register_script(TAKE_SCRIPT)
+            return float(script(keys=[key], args=[self.capacity, self.rate, time.time(), timeout]))
+        state, retry_after = self._take(backend.get(key), time.time())
+        backend.set(key, state, timeout=timeout)
+        return retry_after
+
+    async def atake(self, identity):
+        # Both the Redis client and LocMemCache are thread-safe.
+        return await sync_to_async(self.take, thread_sensitive=False)(identity)
+
+
+def client_ip(request):
+    """The client address, from ``RATE_LIMIT_CLIENT_IP_HEADER`` behind a proxy."""
+    header = settings.RATE_LIMIT_CLIENT_IP_HEADER
+    if header and request.META.get(header):
+        return request.META[header].split(',')[0].strip()
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def check(limits):
+    """Take a token from each ``(bucket name, identity)``; return the longest wait."""
+    if not settings.RATE_LIMIT_ENABLED:
+        return 0
+    return max([TokenBucket.from_settings(name).take(identity) for name, identity in limits], default=0)
+
+
+async def acheck(limits):
+    if not settings.RATE_LIMIT_ENABLED:
+        return 0
+    waits = [await TokenBucket.from_settings(name).atake(identity) for name, identity in limits]
+    return max(waits, default=0)
+
+
+def too_many_requests(retry_after):
+    response = JsonResponse({"error": "Too many requests"}, status=429)
+    response['Retry-After'] = str(math.ceil(retry_after))
+    return response
@@ -0,0 +1,65 @@
+"""Warm-up and readiness checks.
+
+``warm_up`` loads what requests need: the URLconf with every view module
+behind it, and the migration graph. It opens no database or cache
+connection and starts no thread, so ``config.wsgi`` runs it in the uWSGI
+master, before the workers fork and share the loaded code copy-on-write.
+
+``checks`` backs ``GET /ready``. A worker is ready once it is warm, reaches
+the database and the cache, and the database has every migration this code
+knows about (the release step runs them before the service starts).
+"""
+import logging
+
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.executor import MigrationExecutor
+from django.db.migrations.loader import MigrationLoader
+from django.urls import get_resolver
+
+logger = logging.getLogger('employees.readiness')
+
+_warm = False
+_migrated = False
+
+
+def warm_up():
+    global _warm
+    # Building the reverse lookup imports every urls and views module.
+    get_resolver().reverse_dict
+    MigrationLoader(None, ignore_no_migrations=True)
+    _warm = True
+
+
+def _database():
+    with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+        cursor.execute("SELECT 1")
+    return True
+
+
+def _migrations():
+    global _migrated
+    if not _migrated:
+        executor = MigrationExecutor(connections[DEFAULT_DB_ALIAS])
+        _migrated = not executor.migration_plan(executor.loader.graph.leaf_nodes())
+    return _migrated
+
+
+def _cache():
+    cache.get('readiness')
+    return True
+
+
+def checks():
+    """Return ``{check: passed}``; the worker is ready when all passed."""
+    if not _warm:
+        # Served without config.wsgi, e.g. by runserver or uvicorn.
+        warm_up()
+    results = {'app': True}
+    for name, check in (('database', _database), ('migrations', _migrations), ('cache', _cache)):
+        try:
+            results[name] = check()
+        except Exception:
+            logger.warning("Readiness check %s failed", name, exc_info=True)
+            results[name] = False
+    return results
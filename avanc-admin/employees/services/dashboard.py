@@ -0,0 +1,336 @@
+"""Employer dashboard aggregates.
+
+``EmployerSummary``, ``EmployerMonthlySummary`` and ``EmployerBankSummary``
+hold per-employer totals, so the dashboard reads a handful of small rows
+however long the request history grows. They are maintained incrementally:
+every write path passes ``(old state, new state)`` pairs of the rows it
+changed (see ``summary_state`` on the models) to ``record_request_changes``
+or ``record_employee_changes``, which add the difference to the summaries
+with one upsert in the writer's transaction. Model saves and deletes do so
+from ``employees.signals``; bulk paths call them directly, except approvals,
+which reach the summaries through the outbox worker.
+
+``EmployerSummary`` and ``EmployerMonthlySummary`` are sharded: a request's
+changes go to the shard of its employee, employer-wide changes to shard 0, and
+readers add the shards up. Requests of different employees of one employer
+then rarely wait on each other's row lock, while requests of one employee are
+serialized by the employee lock anyway.
+
+An employee moving to another employer moves all of its requests, so both
+employers are rebuilt from scratch instead. ``rebuild_summaries`` (and the
+``rebuild_employer_summaries`` command) recomputes everything after writes
+that bypass these hooks, such as raw SQL or ``QuerySet.update``.
+"""
+import uuid
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from employees.models import (
+    Employee, EmployerBankSummary, EmployerMonthlySummary, EmployerSummary, PayrollSettlement,
+    SalaryAdvanceRequest, month_start)
+
+
+def _table(model):
+    return connection.ops.quote_name(model._meta.db_table)
+
+
+# Rows per employer in EmployerSummary and EmployerMonthlySummary.
+SUMMARY_SHARDS = 16
+SUMMARY_FIELDS = ('employee_count', 'salary_total', 'pending_count', 'pending_total')
+MONTHLY_FIELDS = ('requested_count', 'approved_count', 'approved_total', 'rejected_count')
+
+
+def _shard(employee_id):
+    return uuid.UUID(str(employee_id)).int % SUMMARY_SHARDS if employee_id else 0
+
+
+def _request_contributions(state):
+    """``(pending count, pending total, {month: monthly deltas})`` of one request."""
+    employee_id, status, amount, request_month, review_month = state
+    monthly = {request_month: [1, 0, Decimal('0'), 0]}
+    if status == SalaryAdvanceRequest.PENDING:
+        return 1, amount, monthly
+    if review_month is not None:
+        row = monthly.setdefault(review_month, [0, 0, Decimal('0'), 0])
+        if status == SalaryAdvanceRequest.APPROVED:
+            row[1] += 1
+            row[2] += amount
+        elif status == SalaryAdvanceRequest.REJECTED:
+            row[3] += 1
+    return 0, Decimal('0'), monthly
+
+
+def record_request_changes(changes):
+    """Apply ``(old, new)`` ``SalaryAdvanceRequest.summary_state()`` pairs.
+
+    ``old`` is ``None`` for a created request and ``new`` for a deleted one.
+    """
+    summary = defaultdict(lambda: [0, Decimal('0'), 0, Decimal('0')])
+    monthly = defaultdict(lambda: [0, 0, Decimal('0'), 0])
+    for old, new in changes:
+        if old == new:
+            continue
+        for state, sign in ((old, -1), (new, 1)):
+            if state is None:
+                continue
+            pending_count, pending_total, months = _request_contributions(state)
+            row = summary[(state[0], None)]
+            row[2] += sign * pending_count
+            row[3] += sign * pending_total
+            for month, values in months.items():
+                row = monthly[(state[0], None, month)]
+                for index, value in enumerate(values):
+                    row[index] += sign * value
+    _apply(summary, monthly, {})
+
+
+def record_employee_changes(changes):
+    """Apply ``(old, new)`` ``Employee.summary_state()`` pairs.
+
+    Must run after the rows are written, since employees that changed
+    employer are rebuilt from the database.
+    """
+    summary = defaultdict(lambda: [0, Decimal('0'), 0, Decimal('0')])
+    banks = defaultdict(int)
+    moved = set()
+    for old, new in changes:
+        if old == new:
+            continue
+        if old is not None and new is not None and old[0] != new[0]:
+            moved.update((old[0], new[0]))
+            continue
+        for state, sign in ((old, -1), (new, 1)):
+            if state is None:
+                continue
+            employer_id, salary, bank_name = state
+            row = summary[(None, employer_id)]
+            row[0] += sign
+            row[1] += sign * Decimal(salary)
+            banks[(employer_id, bank_name)] += sign
+    _apply(summary, {}, banks)
+    if moved:
+        rebuild_summaries(moved)
+
+
+def _apply(summary, monthly, banks):
+    """Add the deltas to the summary tables in a single statement.
+
+    ``summary`` and ``monthly`` are keyed by ``(employee_id, employer_id, ...)``
+    with one of the two ids set; employees are mapped to their employer in
+    the database. Each CTE groups its rows by the conflict key, so one
+    statement never touches the same summary row twice.
+    """
+    summary = {key: row for key, row in summary.items() if any(row)}
+    monthly = {key: row for key, row in monthly.items() if any(row)}
+    banks = {key: count for key, count in banks.items() if count}
+    if not (summary or monthly or banks):
+        return
+
+    ctes, params = [], []
+    employee = _table(Employee)
+    if summary:
+        table = _table(EmployerSummary)
+        values = ', '.join(['(%s::uuid, %s::uuid, %s::smallint, %s::int, %s::numeric, %s::int, %s::numeric)']
+                           * len(summary))
+        ctes.append(
+            f"""s AS (
+                INSERT INTO {table}
+                    (id, created, modified, employer_id, shard, employee_count, salary_total,
+                     pending_count, pending_total)
+                SELECT gen_random_uuid(), now(), now(), COALESCE(d.employer_id, e.employer_id), d.shard,
+                       SUM(d.employee_count), SUM(d.salary_total), SUM(d.pending_count),
+                       SUM(d.pending_total)
+                FROM (VALUES {values})
+                    AS d(employee_id, employer_id, shard, employee_count, salary_total, pending_count,
+                         pending_total)
+                LEFT JOIN {employee} e ON e.id = d.employee_id
+                WHERE COALESCE(d.employer_id, e.employer_id) IS NOT NULL
+                GROUP BY 4, 5
+                ON CONFLICT (employer_id, shard) DO UPDATE SET
+                    employee_count = {table}.employee_count + EXCLUDED.employee_count,
+                    salary_total = {table}.salary_total + EXCLUDED.salary_total,
+                    pending_count = {table}.pending_count + EXCLUDED.pending_count,
+                    pending_total = {table}.pending_total + EXCLUDED.pending_total,
+                    modified = EXCLUDED.modified
+            )""")
+        for (employee_id, employer_id), row in summary.items():
+            params += [employee_id, employer_id, _shard(employee_id), *row]
+    if monthly:
+        table = _table(EmployerMonthlySummary)
+        values = ', '.join(['(%s::uuid, %s::uuid, %s::date, %s::smallint, %s::int, %s::int, %s::numeric, %s::int)']
+                           * len(monthly))
+        ctes.append(
+            f"""m AS (
+                INSERT INTO {table}
+                    (id, created, modified, employer_id, month, shard, requested_count, approved_count,
+                     approved_total, rejected_count)
+                SELECT gen_random_uuid(), now(), now(), COALESCE(d.employer_id, e.employer_id), d.month,
+                       d.shard, SUM(d.requested_count), SUM(d.approved_count), SUM(d.approved_total),
+                       SUM(d.rejected_count)
+                FROM (VALUES {values})
+                    AS d(employee_id, employer_id, month, shard, requested_count, approved_count,
+                         approved_total, rejected_count)
+                LEFT JOIN {employee} e ON e.id = d.employee_id
+                WHERE COALESCE(d.employer_id, e.employer_id) IS NOT NULL
+                GROUP BY 4, 5, 6
+                ON CONFLICT (employer_id, month, shard) DO UPDATE SET
+                    requested_count = {table}.requested_count + EXCLUDED.requested_count,
+                    approved_count = {table}.approved_count + EXCLUDED.approved_count,
+                    approved_total = {table}.approved_total + EXCLUDED.approved_total,
+                    rejected_count = {table}.rejected_count + EXCLUDED.rejected_count,
+                    modified = EXCLUDED.modified
+            )""")
+        for (employee_id, employer_id, month), row in monthly.items():
+            params += [employee_id, employer_id, month, _shard(employee_id), *row]
+    if banks:
+        table = _table(EmployerBankSummary)
+        ctes.append(
+            f"""b AS (
+                INSERT INTO {table} (id, created, modified, employer_id, bank_name, employee_count)
+                SELECT gen_random_uuid(), now(), now(), d.employer_id, d.bank_name, d.employee_count
+                FROM (VALUES {', '.join(['(%s::uuid, %s, %s::int)'] * len(banks))})
+                    AS d(employer_id, bank_name, employee_count)
+                ON CONFLICT (employer_id, bank_name) DO UPDATE SET
+                    employee_count = {table}.employee_count + EXCLUDED.employee_count,
+                    modified = EXCLUDED.modified
+            )""")
+        for (employer_id, bank_name), count in banks.items():
+            params += [employer_id, bank_name, count]
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"WITH {', '.join(ctes)} SELECT 1", params)
+
+
+def rebuild_summaries(employer_ids=None):
+    """Recompute the summaries of ``employer_ids`` (all employers if ``None``)."""
+    where, params = "", {}
+    if employer_ids is not None:
+        employer_ids = list(employer_ids)
+        if not employer_ids:
+            return
+        where = "WHERE e.employer_id = ANY(%(employers)s::uuid[])"
+        params['employers'] = [str(pk) for pk in employer_ids]
+    scope = "" if employer_ids is None else "WHERE employer_id = ANY(%(employers)s::uuid[])"
+    employee, request = _table(Employee), _table(SalaryAdvanceRequest)
+    params.update(
+        pending=SalaryAdvanceRequest.PENDING, approved=SalaryAdvanceRequest.APPROVED,
+        rejected=SalaryAdvanceRequest.REJECTED, tz=timezone.get_current_timezone_name())
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        for model in (EmployerSummary, EmployerMonthlySummary, EmployerBankSummary):
+            cursor.execute(f"DELETE FROM {_table(model)} {scope}", params)
+        cursor.execute(
+            f"""
+            INSERT INTO {_table(EmployerSummary)}
+                (id, created, modified, employer_id, shard, employee_count, salary_total,
+                 pending_count, pending_total)
+            SELECT gen_random_uuid(), now(), now(), e.employer_id, 0, COUNT(*), SUM(e.salary),
+                   COALESCE(SUM(p.pending_count), 0), COALESCE(SUM(p.pending_total), 0)
+            FROM {employee} e
+            LEFT JOIN (
+                SELECT employee_id, COUNT(*) AS pending_count, SUM(amount_requested) AS pending_total
+                FROM {request} WHERE status = %(pending)s GROUP BY employee_id
+            ) p ON p.employee_id = e.id
+            {where}
+            GROUP BY e.employer_id
+            """, params)
+        cursor.execute(
+            f"""
+            INSERT INTO {_table(EmployerMonthlySummary)}
+                (id, created, modified, employer_id, month, shard, requested_count, approved_count,
+                 approved_total, rejected_count)
+            SELECT gen_random_uuid(), now(), now(), employer_id, month, 0, SUM(requested_count),
+                   SUM(approved_count), SUM(approved_total), SUM(rejected_count)
+            FROM (
+                SELECT e.employer_id, date_trunc('month', r.request_date AT TIME ZONE %(tz)s)::date AS month,
+                       1 AS requested_count, 0 AS approved_count, 0 AS approved_total,
+                       0 AS rejected_count
+                FROM {request} r JOIN {employee} e ON e.id = r.employee_id
+                {where}
+                UNION ALL
+                SELECT e.employer_id, date_trunc('month', r.review_date AT TIME ZONE %(tz)s)::date,
+                       0, (r.status = %(approved)s)::int,
+                       CASE WHEN r.status = %(approved)s THEN r.amount_requested ELSE 0 END,
+                       (r.status = %(rejected)s)::int
+                FROM {request} r JOIN {employee} e ON e.id = r.employee_id
+                WHERE r.status IN (%(approved)s, %(rejected)s) AND r.review_date IS NOT NULL
+                {where.replace('WHERE', 'AND')}
+            ) changes
+            GROUP BY employer_id, month
+            """, params)
+        cursor.execute(
+            f"""
+            INSERT INTO {_table(EmployerBankSummary)}
+                (id, created, modified, employer_id, bank_name, employee_count)
+            SELECT gen_random_uuid(), now(), now(), e.employer_id, e.bank_name, COUNT(*)
+            FROM {employee} e
+            {where}
+            GROUP BY e.employer_id, e.bank_name
+            """, params)
+
+
+def _add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def employer_dashboard(employer, months=12):
+    """The dashboard payload of ``employer``, read from the summary tables.
+
+    ``outstanding`` is the approved total of the months not yet closed by
+    ``settle_payroll``; ``utilization`` compares this month's approvals with
+    ``Employee.ADVANCE_LIMIT_RATIO`` of the payroll.
+    """
+    totals = EmployerSummary.objects.filter(employer=employer).aggregate(
+        **{field: Sum(field) for field in SUMMARY_FIELDS})
+    summary = EmployerSummary(employer=employer, **{field: total or 0 for field, total in totals.items()})
+    current = month_start(timezone.now())
+    first = _add_months(current, 1 - months)
+    monthly = {}
+    for row in EmployerMonthlySummary.objects.filter(
+            employer=employer, month__gte=first, month__lte=current,
+    ).values('month').annotate(**{f'{field}_sum': Sum(field) for field in MONTHLY_FIELDS}):
+        monthly[row['month']] = EmployerMonthlySummary(
+            month=row['month'], **{field: row[f'{field}_sum'] for field in MONTHLY_FIELDS})
+    outstanding = EmployerMonthlySummary.objects.filter(employer=employer).exclude(
+        month__in=PayrollSettlement.objects.filter(employer=employer).values('month')
+    ).aggregate(total=Sum('approved_total'))['total'] or Decimal('0')
+
+    cap = summary.salary_total * Employee.ADVANCE_LIMIT_RATIO
+    this_month = monthly.get(current)
+    approved_this_month = this_month.approved_total if this_month else Decimal('0')
+    by_month = []
+    for offset in range(months):
+        month = _add_months(first, offset)
+        row = monthly.get(month) or EmployerMonthlySummary(month=month)
+        by_month.append({
+            "month": f"{month:%Y-%m}",
+            "requested_count": row.requested_count,
+            "approved_count": row.approved_count,
+            "approved_total": row.approved_total,
+            "rejected_count": row.rejected_count,
+        })
+    return {
+        "employer": {"id": employer.pk, "name": employer.name},
+        "employees": summary.employee_count,
+        "payroll": summary.salary_total,
+        "pending": {"count": summary.pending_count, "total": summary.pending_total},
+        "outstanding": outstanding,
+        "utilization": {
+            "month": f"{current:%Y-%m}",
+            "approved": approved_this_month,
+            "cap": cap,
+            "ratio": round(approved_this_month / cap, 4) if cap else None,
+        },
+        "approved_by_month": by_month,
+        "banks": [
+            {"bank_name": bank_name, "employees": count}
+            for bank_name, count in EmployerBankSummary.objects.filter(employer=employer)
+            .order_by('-employee_count', 'bank_name').values_list('bank_name', 'employee_count')
+        ],
+    }
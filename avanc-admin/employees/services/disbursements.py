@@ -0,0 +1,159 @@
+"""Per-bank payment files for approved salary advances.
+
+``generate_disbursement_files`` turns every approved, unpaid advance into a
+line of its bank's payment file:
+
+1. Approved requests the outbox worker has not handled yet get their
+   ``Disbursement`` with one ``INSERT ... SELECT``.
+2. For each bank, one transaction creates a ``DisbursementBatch``, claims the
+   bank's unbatched disbursements and marks their requests paid, with one
+   ``UPDATE`` each.
+3. The file is streamed from a server-side cursor through a generator, so
+   memory stays flat however many approvals a run collects. It is written
+   next to its final path and renamed into place.
+
+Files are written after the batch committed: a failed write leaves a batch
+without ``file_name``, which ``write_batch_file`` can write again, and never
+a file for requests that are not marked paid.
+"""
+import csv
+import io
+import os
+import unicodedata
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.db.models import Count, DecimalField, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.text import slugify
+
+from employees.models import Disbursement, DisbursementBatch, Employee, SalaryAdvanceRequest
+
+CSV_COLUMNS = ('request_id', 'employee_id', 'full_name', 'bank_account', 'amount')
+
+
+def _table(model):
+    return connection.ops.quote_name(model._meta.db_table)
+
+
+def queue_missing_disbursements():
+    """Create disbursements for approved, unpaid requests without one; return how many."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {_table(Disbursement)}
+                (id, created, modified, request_id, employee_id, bank_name, bank_account, amount)
+            SELECT gen_random_uuid(), now(), now(), r.id, r.employee_id, e.bank_name, e.bank_account,
+                   r.amount_requested
+            FROM {_table(SalaryAdvanceRequest)} r
+            JOIN {_table(Employee)} e ON e.id = r.employee_id
+            WHERE r.status = %s AND r.paid_at IS NULL
+              AND NOT EXISTS (SELECT 1 FROM {_table(Disbursement)} d WHERE d.request_id = r.id)
+            ON CONFLICT (request_id) DO NOTHING
+            """,
+            [SalaryAdvanceRequest.APPROVED],
+        )
+        return cursor.rowcount
+
+
+def create_batch(bank_name, file_format=DisbursementBatch.CSV):
+    """Claim ``bank_name``'s unbatched disbursements; ``None`` if there are none."""
+    with transaction.atomic():
+        now = timezone.now()
+        batch = DisbursementBatch.objects.create(bank_name=bank_name, file_format=file_format)
+        claimed = Disbursement.objects.filter(batch__isnull=True, bank_name=bank_name).update(
+            batch=batch, modified=now)
+        if not claimed:
+            transaction.set_rollback(True)
+            return None
+        SalaryAdvanceRequest.objects.filter(pk__in=batch.disbursements.values('request_id')).update(
+            paid_at=now, modified=now)
+        totals = batch.disbursements.aggregate(
+            count=Count('id'),
+            total=Coalesce(Sum('amount'), Value(Decimal('0'), output_field=DecimalField())),
+        )
+        batch.disbursement_count, batch.total_amount = totals['count'], totals['total']
+        batch.save(update_fields=['disbursement_count', 'total_amount', 'modified'])
+    return batch
+
+
+def _rows(batch, chunk_size):
+    return (
+        batch.disbursements.order_by('employee__full_name', 'id')
+        .values_list('request_id', 'employee_id', 'employee__full_name', 'bank_account', 'amount')
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def csv_lines(rows):
+    """Yield the CSV file line by line."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+    for row in rows:
+        writer.writerow(row)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _ascii(value, width):
+    text = unicodedata.normalize('NFKD', str(value)).encode('ascii', 'ignore').decode()
+    return text[:width].ljust(width)
+
+
+def _cents(amount, width):
+    return str(int(amount * 100)).zfill(width)
+
+
+def fixed_width_lines(batch, rows):
+    """Yield the fixed-width file: header, one detail record per disbursement, trailer.
+
+    Header:  ``H`` bank (20) date ``YYYYMMDD`` count (8) total in cents (15)
+    Detail:  ``D`` account (20) name (40) amount in cents (15) request id (32)
+    Trailer: ``T`` count (8) total in cents (15)
+    """
+    count, total = f"{batch.disbursement_count:08d}", _cents(batch.total_amount, 15)
+    yield f"H{_ascii(batch.bank_name, 20)}{timezone.localdate(batch.created):%Y%m%d}{count}{total}\n"
+    for request_id, _, full_name, bank_account, amount in rows:
+        yield f"D{_ascii(bank_account, 20)}{_ascii(full_name, 40)}{_cents(amount, 15)}{request_id.hex}\n"
+    yield f"T{count}{total}\n"
+
+
+def file_name(batch):
+    extension = 'csv' if batch.file_format == DisbursementBatch.CSV else 'txt'
+    return f"disbursements_{slugify(batch.bank_name)}_{batch.created:%Y%m%d%H%M%S}_{batch.pk.hex[:8]}.{extension}"
+
+
+def write_batch_file(batch, output_dir, chunk_size=2000):
+    """Write ``batch``'s payment file into ``output_dir``; return its path."""
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, file_name(batch))
+    rows = _rows(batch, chunk_size)
+    lines = csv_lines(rows) if batch.file_format == DisbursementBatch.CSV else fixed_width_lines(batch, rows)
+    tmp_path = f"{path}.tmp"
+    with transaction.atomic():
+        # Outside a transaction the cursor is declared WITH HOLD, and
+        # Postgres materializes the whole result before the first fetch.
+        with open(tmp_path, 'w', newline='', encoding='utf-8') as stream:
+            stream.writelines(lines)
+    os.replace(tmp_path, path)
+    DisbursementBatch.objects.filter(pk=batch.pk).update(file_name=os.path.basename(path))
+    batch.file_name = os.path.basename(path)
+    return path
+
+
+def generate_disbursement_files(output_dir, file_format=DisbursementBatch.CSV, banks=None, chunk_size=2000):
+    """Batch and write every bank's pending disbursements; return ``[(batch, path)]``."""
+    queue_missing_disbursements()
+    pending = Disbursement.objects.filter(batch__isnull=True)
+    if banks:
+        pending = pending.filter(bank_name__in=banks)
+    written = []
+    for bank_name in pending.order_by('bank_name').values_list('bank_name', flat=True).distinct():
+        batch = create_batch(bank_name, file_format)
+        if batch is not None:
+            written.append((batch, write_batch_file(batch, output_dir, chunk_size)))
+    return written
@@ -0,0 +1,126 @@
+"""Batch operations on employees."""
+import uuid
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from employees.cache import invalidate_employees
+from employees.models import Employee, Employer
+from employees.services import dashboard
+
+UPDATED = 'updated'
+MISSING = 'missing'
+INVALID = 'invalid'
+
+UPDATABLE_FIELDS = (
+    'full_name', 'email', 'phone', 'salary', 'bank_name', 'bank_account', 'city', 'employer',
+)
+
+
+def bulk_update_employees(items, batch_size=500):
+    """Apply partial updates ``[{"id": ..., <field>: <value>, ...}, ...]``.
+
+    Targets are loaded and locked with one ``in_bulk`` query, every value is
+    validated with the model field, emails already used by another employee
+    or item are rejected, and all valid changes are written with a single
+    ``bulk_update`` of the touched columns inside one transaction.
+    Returns one ``{"id", "status"[, "errors"]}`` entry per item, in order.
+    """
+    results = []
+    parsed = []
+    for item in items:
+        if not isinstance(item, dict):
+            results.append({'id': None, 'status': INVALID, 'errors': {'__all__': ['Expected an object']}})
+            continue
+        try:
+            pk = uuid.UUID(str(item.get('id')))
+        except ValueError:
+            results.append({'id': item.get('id'), 'status': INVALID, 'errors': {'id': ['Invalid id']}})
+            continue
+        result = {'id': str(pk)}
+        results.append(result)
+        parsed.append((result, pk, {key: value for key, value in item.items() if key != 'id'}))
+
+    with transaction.atomic():
+        employees = Employee.objects.select_for_update().in_bulk([pk for _, pk, _ in parsed])
+        employer_ids = {
+            str(changes['employer']) for _, _, changes in parsed if changes.get('employer') is not None
+        }
+        existing_employers = {
+            str(pk) for pk in Employer.objects.filter(
+                pk__in=[value for value in employer_ids if _is_uuid(value)]
+            ).values_list('pk', flat=True)
+        }
+
+        valid = []
+        for result, pk, changes in parsed:
+            if pk not in employees:
+                result['status'] = MISSING
+                continue
+            errors = _validate(changes, existing_employers)
+            if errors:
+                result.update(status=INVALID, errors=errors)
+                continue
+            valid.append((result, pk, changes))
+
+        # The unique email would otherwise fail the whole bulk_update: an email
+        # goes to the first item claiming it, unless another employee has it.
+        emails = {changes['email'] for _, _, changes in valid if 'email' in changes}
+        claimed = dict(Employee.objects.filter(email__in=emails).values_list('email', 'pk')) if emails else {}
+        touched, changed = set(), {}
+        for result, pk, changes in valid:
+            if 'email' in changes and claimed.setdefault(changes['email'], pk) != pk:
+                result.update(status=INVALID, errors={'email': ['Email already in use']})
+                continue
+            employee = employees[pk]
+            for name, value in changes.items():
+                field = Employee._meta.get_field(name)
+                setattr(employee, field.attname, value)
+                touched.add(field.attname)
+            changed[pk] = employee
+            result['status'] = UPDATED
+
+        if changed:
+            now = timezone.now()
+            for employee in changed.values():
+                employee.modified = now
+            Employee.objects.bulk_update(
+                changed.values(), sorted(touched) + ['modified'], batch_size=batch_size)
+            invalidate_employees(changed)
+            dashboard.record_employee_changes(
+                (employee._summary_state, employee.summary_state()) for employee in changed.values())
+    return results
+
+
+def _is_uuid(value):
+    try:
+        uuid.UUID(value)
+    except ValueError:
+        return False
+    return True
+
+
+def _validate(changes, existing_employers):
+    """Clean ``changes`` in place; return a field -> messages dict on failure."""
+    errors = {}
+    for name, value in changes.items():
+        if name not in UPDATABLE_FIELDS:
+            errors[name] = ['Unknown or read-only field']
+            continue
+        field = Employee._meta.get_field(name)
+        if field.is_relation:
+            if value is None or str(value) not in existing_employers:
+                errors[name] = ['Employer not found']
+            else:
+                changes[name] = uuid.UUID(str(value))
+            continue
+        try:
+            value = field.to_python(value)
+            field.validate(value, None)
+            field.run_validators(value)
+        except ValidationError as e:
+            errors[name] = e.messages
+        else:
+            changes[name] = value
+    return errors
@@ -0,0 +1,199 @@
+"""Bulk employee onboarding from CSV or JSON-lines files.
+
+Rows use the sign-up fields (``email``, ``password``, ``full_name``,
+``salary``, ``employer_name``) plus optional ``phone``, ``bank_name``,
+``bank_account`` and ``city``. Employers are resolved by name once per import,
+passwords are hashed in a process pool and employees are inserted with
+``bulk_create`` one batch at a time.
+
+Uploads through the API are imported during the request only when they are
+small enough to hash without a pool; larger ones are queued for the outbox
+worker, so request threads never fork processes or run into uWSGI's harakiri.
+"""
+import csv
+import io
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from employees.models import Employee, Employer, OutboxEvent
+from employees.services import dashboard
+
+REQUIRED_FIELDS = ('email', 'password', 'full_name', 'salary', 'employer_name')
+OPTIONAL_FIELDS = ('phone', 'bank_name', 'bank_account', 'city')
+
+
+def read_records(stream, fmt):
+    """Yield ``(line_number, record)`` pairs from a text stream."""
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+    elif fmt == 'jsonl':
+        for line_number, line in enumerate(stream, start=1):
+            if line.strip():
+                try:
+                    yield line_number, json.loads(line)
+                except ValueError:
+                    yield line_number, None
+    else:
+        raise ValueError(f"Unsupported format: {fmt}")
+
+
+def _init_hash_worker(settings_module):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    django.setup()
+
+
+class EmployeeImporter:
+    """Insert employees from ``(line_number, record)`` pairs.
+
+    ``progress`` is called after each batch with the running totals.
+    """
+
+    def __init__(self, batch_size=1000, workers=None, progress=None):
+        self.batch_size = batch_size
+        self.workers = workers or os.cpu_count() or 1
+        self.progress = progress
+        self.employers = {}
+        self.created = 0
+        self.errors = []
+        self.started = None
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started if self.started else 0
+
+    @property
+    def rate(self):
+        return self.created / self.elapsed if self.elapsed else 0
+
+    def summary(self):
+        return {
+            'created': self.created,
+            'failed': len(self.errors),
+            'errors': self.errors,
+            'elapsed_seconds': round(self.elapsed, 3),
+            'rows_per_second': round(self.rate, 1),
+        }
+
+    def run(self, records):
+        self.started = time.monotonic()
+        records = iter(records)
+        pool = None
+        if self.workers > 1:
+            pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_hash_worker,
+                initargs=(os.environ.get('DJANGO_SETTINGS_MODULE', 'config.settings'),),
+            )
+        try:
+            while True:
+                batch = list(islice(records, self.batch_size))
+                if not batch:
+                    break
+                self._import_batch(batch, pool)
+                if self.progress:
+                    self.progress(self)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        return self.summary()
+
+    def _import_batch(self, batch, pool):
+        self._resolve_employers(
+            record.get('employer_name') for _, record in batch if isinstance(record, dict))
+
+        # Earlier batches are already committed, so checking the database and
+        # the current batch catches every duplicate email.
+        taken = set(Employee.objects.filter(email__in=[
+            record.get('email') for _, record in batch if isinstance(record, dict)
+        ]).values_list('email', flat=True))
+
+        employees, passwords = [], []
+        for line_number, record in batch:
+            employee = self._build(line_number, record, taken)
+            if employee is not None:
+                taken.add(employee.email)
+                employees.append(employee)
+                passwords.append(record['password'])
+
+        if pool is not None:
+            chunksize = max(1, len(passwords) // (self.workers * 4))
+            hashed = pool.map(make_password, passwords, chunksize=chunksize)
+        else:
+            hashed = map(make_password, passwords)
+        for employee, password in zip(employees, hashed):
+            employee.password = password
+
+        with transaction.atomic():
+            Employee.objects.bulk_create(employees, batch_size=self.batch_size)
+            dashboard.record_employee_changes((None, employee.summary_state()) for employee in employees)
+        self.created += len(employees)
+
+    def _resolve_employers(self, names):
+        missing = {name for name in names if name and name not in self.employers}
+        if missing:
+            for employer in Employer.objects.filter(name__in=missing):
+                self.employers.setdefault(employer.name, employer.pk)
+
+    def _build(self, line_number, record, taken):
+        if not isinstance(record, dict):
+            self.errors.append({'line': line_number, 'errors': {'__all__': ['Malformed row']}})
+            return None
+        missing = [field for field in REQUIRED_FIELDS if record.get(field) in (None, '')]
+        if missing:
+            self.errors.append({'line': line_number, 'errors': {
+                field: ['This field is required.'] for field in missing}})
+            return None
+        if record['email'] in taken:
+            self.errors.append({'line': line_number, 'errors': {'email': ['Email already registered']}})
+            return None
+        employer_id = self.employers.get(record['employer_name'])
+        if employer_id is None:
+            self.errors.append({'line': line_number, 'errors': {'employer_name': ['Employer not found']}})
+            return None
+
+        employee = Employee(
+            employer_id=employer_id,
+            email=record['email'],
+            full_name=record['full_name'],
+            salary=record['salary'],
+            **{field: record[field] for field in OPTIONAL_FIELDS if record.get(field)},
+        )
+        try:
+            employee.full_clean(
+                exclude=['employer', 'password'], validate_unique=False, validate_constraints=False)
+        except ValidationError as e:
+            self.errors.append({'line': line_number, 'errors': e.message_dict})
+            return None
+        return employee
+
+
+def import_employees(stream, fmt, **kwargs):
+    """Import a CSV or JSON-lines text stream; see ``EmployeeImporter``."""
+    return EmployeeImporter(**kwargs).run(read_records(stream, fmt))
+
+
+def import_employees_from_bytes(content, fmt, **kwargs):
+    return import_employees(io.StringIO(content.decode('utf-8-sig'), newline=''), fmt, **kwargs)
+
+
+def import_upload(content, fmt, max_rows):
+    """Import an upload of up to ``max_rows`` rows now, hashing in this thread.
+
+    Returns ``(summary, None)``, or ``(None, event)`` with the ``OutboxEvent``
+    queued for a larger upload.
+    """
+    text = content.decode('utf-8-sig')
+    records = list(read_records(io.StringIO(text, newline=''), fmt))
+    if len(records) > max_rows:
+        return None, OutboxEvent.objects.enqueue_import(text, fmt)
+    return EmployeeImporter(workers=1).run(records), None
@@ -0,0 +1,185 @@
+"""Transactional outbox worker.
+
+Approvals only write the request, the ledger and an ``OutboxEvent`` row; the
+follow-up work runs here, after the approval committed. ``process_batch``
+claims up to ``batch_size`` due events with ``FOR UPDATE SKIP LOCKED``, so any
+number of workers can drain the table without handing out an event twice,
+and runs each topic's handlers once for the whole batch. If that fails, the
+events are retried one at a time so a single bad event cannot hold back the
+others; a failing event is rescheduled with exponential backoff and marked
+``failed`` after ``max_attempts``.
+
+Handlers receive a list of events and must be idempotent: an event whose
+batch committed only partially is handled again on the next attempt.
+"""
+import io
+import logging
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from employees.cache import invalidate_employees
+from employees.models import (
+    Disbursement, Employee, OutboxEvent, SalaryAdvanceRequest, Transaction, month_start)
+from employees.services import dashboard, onboarding
+
+logger = logging.getLogger('employees.outbox')
+notifications = logging.getLogger('employees.notifications')
+
+MAX_BACKOFF_SECONDS = 3600
+
+
+def create_transactions(events):
+    """Record the payout of each approved advance as a ``Transaction``."""
+    request_ids = [event.payload['request_id'] for event in events]
+    existing = {
+        str(pk) for pk in Transaction.objects.filter(request_id__in=request_ids)
+        .values_list('request_id', flat=True)}
+    Transaction.objects.bulk_create([
+        Transaction(request_id=event.payload['request_id'], amount=Decimal(event.payload['amount']))
+        for event in events if event.payload['request_id'] not in existing
+    ])
+    invalidate_employees(event.payload['employee_id'] for event in events)
+
+
+def update_summaries(events):
+    """Move deferred approvals from pending to approved in the employer summaries."""
+    changes = []
+    for event in events:
+        payload = event.payload
+        if not payload.get('summaries'):
+            continue
+        employee_id, amount = uuid.UUID(payload['employee_id']), Decimal(payload['amount'])
+        request_month = month_start(datetime.fromisoformat(payload['request_date']))
+        review_month = month_start(datetime.fromisoformat(payload['review_date']))
+        changes.append((
+            (employee_id, SalaryAdvanceRequest.PENDING, amount, request_month, None),
+            (employee_id, SalaryAdvanceRequest.APPROVED, amount, request_month, review_month),
+        ))
+    dashboard.record_request_changes(changes)
+
+
+def create_disbursements(events):
+    """Queue a payment to the employee's bank account for each approved advance."""
+    employees = Employee.objects.only('bank_name', 'bank_account').in_bulk(
+        {uuid.UUID(event.payload['employee_id']) for event in events})
+    disbursements = []
+    for event in events:
+        employee = employees.get(uuid.UUID(event.payload['employee_id']))
+        if employee is not None:
+            disbursements.append(Disbursement(
+                request_id=event.payload['request_id'], employee=employee,
+                bank_name=employee.bank_name, bank_account=employee.bank_account,
+                amount=Decimal(event.payload['amount'])))
+    Disbursement.objects.bulk_create(disbursements, ignore_conflicts=True)
+
+
+def notify_employees(events):
+    """Tell employees their advance was approved.
+
+    Runs last, since a notification cannot be rolled back with the batch.
+    """
+    emails = dict(Employee.objects.filter(
+        pk__in={uuid.UUID(event.payload['employee_id']) for event in events}).values_list('pk', 'email'))
+    for event in events:
+        notifications.info(
+            "Salary advance %s of %s approved for %s", event.payload['request_id'],
+            event.payload['amount'], emails.get(uuid.UUID(event.payload['employee_id'])))
+
+
+def import_employees(events):
+    """Onboard the employees of uploads queued by ``POST /employees/import``.
+
+    Rows whose email is already registered are skipped, so an import that
+    is retried does not create anyone twice.
+    """
+    for event in events:
+        summary = onboarding.import_employees(
+            io.StringIO(event.payload['content'], newline=''), event.payload['format'],
+            workers=settings.ONBOARDING_HASH_WORKERS)
+        for error in summary['errors']:
+            logger.warning("Employee import %s: line %s: %s", event.pk, error['line'], error['errors'])
+        logger.info(
+            "Employee import %s: %s created, %s failed", event.pk, summary['created'], summary['failed'])
+
+
+HANDLERS = {
+    OutboxEvent.SALARY_ADVANCE_APPROVED: (
+        create_transactions, update_summaries, create_disbursements, notify_employees),
+    OutboxEvent.EMPLOYEES_IMPORT: (import_employees,),
+}
+
+
+def _run(events):
+    by_topic = {}
+    for event in events:
+        by_topic.setdefault(event.topic, []).append(event)
+    for topic, topic_events in by_topic.items():
+        handlers = HANDLERS.get(topic)
+        if handlers is None:
+            raise LookupError(f"No handlers for topic {topic!r}")
+        for handler in handlers:
+            handler(topic_events)
+
+
+def backoff(attempts):
+    return timedelta(seconds=min(MAX_BACKOFF_SECONDS, 2 ** attempts))
+
+
+def process_batch(batch_size=100, max_attempts=5):
+    """Claim and handle one batch of due events; return ``(done, retried, failed)``."""
+    with transaction.atomic():
+        events = list(
+            OutboxEvent.objects.select_for_update(skip_locked=True)
+            .filter(status=OutboxEvent.PENDING, available_at__lte=timezone.now())
+            .order_by('available_at')[:batch_size]
+        )
+        if not events:
+            return 0, 0, 0
+
+        errors = {}
+        try:
+            with transaction.atomic():
+                _run(events)
+        except Exception:
+            for event in events:
+                try:
+                    with transaction.atomic():
+                        _run([event])
+                except Exception as e:
+                    logger.exception("Outbox event %s (%s) failed", event.pk, event.topic)
+                    errors[event.pk] = e
+
+        now = timezone.now()
+        done = [event.pk for event in events if event.pk not in errors]
+        if done:
+            OutboxEvent.objects.filter(pk__in=done).update(
+                status=OutboxEvent.DONE, processed_at=now, modified=now)
+        retried = failed = 0
+        for event in events:
+            if event.pk not in errors:
+                continue
+            event.attempts += 1
+            event.last_error = repr(errors[event.pk])[:2000]
+            event.modified = now
+            if event.attempts >= max_attempts:
+                event.status = OutboxEvent.FAILED
+                failed += 1
+            else:
+                event.available_at = now + backoff(event.attempts)
+                retried += 1
+        OutboxEvent.objects.bulk_update(
+            [event for event in events if event.pk in errors],
+            ['attempts', 'last_error', 'modified', 'status', 'available_at'])
+    return len(done), retried, failed
+
+
+def purge_processed(older_than):
+    """Delete events handled before ``older_than``; return how many."""
+    deleted, _ = OutboxEvent.objects.filter(
+        status=OutboxEvent.DONE, processed_at__lt=older_than).delete()
+    return deleted
@@ -0,0 +1,148 @@
+"""Monthly range partitions of the ledger tables.
+
+``transaction`` is partitioned by month of ``transaction_date``. Each month is
+a table named ``<table>_pYYYY_MM``, and a ``<table>_default`` partition
+catches rows for months that have no partition yet, so an insert never fails
+for lack of one. Queries bounded by date (payroll settlement, exports) read
+only the partitions they cover, and every partition is vacuumed and indexed on
+its own.
+
+``ensure_partitions`` creates the coming months ahead of time and moves rows
+that landed in the default partition into their month. ``detach_partitions``
+takes old months out of the table, into an archive schema or dropped.
+"""
+import re
+from datetime import date, datetime
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from employees.models import month_start
+
+# Partitioned tables and the column they are partitioned by.
+PARTITION_KEYS = {
+    'fintech"."transaction': 'transaction_date',
+}
+ARCHIVE_SCHEMA = 'fintech_archive'
+
+_MONTH_SUFFIX = re.compile(r'_p(\d{4})_(\d{2})$')
+
+
+def _qn(name):
+    return connection.ops.quote_name(name)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _bounds(month):
+    next_month = add_months(month, 1)
+    return [
+        timezone.make_aware(datetime(month.year, month.month, 1)),
+        timezone.make_aware(datetime(next_month.year, next_month.month, 1)),
+    ]
+
+
+def partition_table(model, month):
+    return f"{model._meta.db_table}_p{month:%Y_%m}"
+
+
+def default_table(model):
+    return f"{model._meta.db_table}_default"
+
+
+def partition_months(model):
+    """The months ``model``'s table has a partition for, oldest first."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(%s)",
+            [_qn(model._meta.db_table)],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    matches = (_MONTH_SUFFIX.search(name) for name in names)
+    return sorted(date(int(m.group(1)), int(m.group(2)), 1) for m in matches if m)
+
+
+def default_months(model):
+    """The months of the rows waiting in the default partition."""
+    key = _qn(PARTITION_KEYS[model._meta.db_table])
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT DISTINCT date_trunc('month', {key} AT TIME ZONE %s)::date "
+            f"FROM {_qn(default_table(model))}",
+            [timezone.get_current_timezone_name()],
+        )
+        return sorted(row[0] for row in cursor.fetchall())
+
+
+def create_partition(model, month):
+    """Create ``month``'s partition, moving its rows out of the default partition."""
+    parent, partition = _qn(model._meta.db_table), _qn(partition_table(model, month))
+    default, key = _qn(default_table(model)), _qn(PARTITION_KEYS[model._meta.db_table])
+    bounds = _bounds(month)
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT EXISTS (SELECT 1 FROM {default} WHERE {key} >= %s AND {key} < %s)", bounds)
+        if not cursor.fetchone()[0]:
+            cursor.execute(
+                f"CREATE TABLE {partition} PARTITION OF {parent} FOR VALUES FROM (%s) TO (%s)", bounds)
+            return
+        # A new partition cannot overlap rows in the default one: move them
+        # into a standalone table first, then attach it.
+        cursor.execute(f"CREATE TABLE {partition} (LIKE {parent} INCLUDING DEFAULTS)")
+        cursor.execute(
+            f"WITH moved AS (DELETE FROM {default} WHERE {key} >= %s AND {key} < %s RETURNING *) "
+            f"INSERT INTO {partition} SELECT * FROM moved",
+            bounds,
+        )
+        cursor.execute(
+            f"ALTER TABLE {parent} ATTACH PARTITION {partition} FOR VALUES FROM (%s) TO (%s)", bounds)
+
+
+def ensure_partitions(model, months_ahead=3, start=None):
+    """Create the partitions from ``start`` (default: this month) to ``months_ahead``
+    months ahead, and for any month with rows in the default partition.
+
+    Return the months created.
+    """
+    current = month_start(timezone.now())
+    month = start or current
+    wanted = set(default_months(model))
+    while month <= add_months(current, months_ahead):
+        wanted.add(month)
+        month = add_months(month, 1)
+    created = sorted(wanted - set(partition_months(model)))
+    for month in created:
+        create_partition(model, month)
+    return created
+
+
+def detach_partitions(model, before, archive_schema=ARCHIVE_SCHEMA, drop=False):
+    """Detach the partitions of months before ``before``; return their names.
+
+    Detached partitions are moved to ``archive_schema`` without their foreign
+    keys, so archived rows never block deleting an employee, or dropped.
+    """
+    detached = []
+    for month in partition_months(model):
+        if month >= before:
+            break
+        name = partition_table(model, month)
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"ALTER TABLE {_qn(model._meta.db_table)} DETACH PARTITION {_qn(name)}")
+            if drop:
+                cursor.execute(f"DROP TABLE {_qn(name)}")
+            else:
+                cursor.execute(
+                    "SELECT conname FROM pg_constraint WHERE conrelid = to_regclass(%s) AND contype = 'f'",
+                    [_qn(name)],
+                )
+                for (constraint,) in cursor.fetchall():
+                    cursor.execute(f"ALTER TABLE {_qn(name)} DROP CONSTRAINT {_qn(constraint)}")
+                cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {_qn(archive_schema)}")
+                cursor.execute(f"ALTER TABLE {_qn(name)} SET SCHEMA {_qn(archive_schema)}")
+        detached.append(name.split('"."')[-1])
+    return detached
@@ -0,0 +1,127 @@
+"""Monthly payroll settlement per employer.
+
+``settle_employer`` closes a calendar month for one employer: every employee
+with approved advances or transactions in the month gets a
+``SettlementLine`` whose deduction is the approved advance total. Lines are
+aggregated and inserted by a single ``INSERT ... SELECT`` in the database, so
+memory does not grow with the employer's size, and a re-run replaces the
+previous lines of the same settlement.
+"""
+import csv
+import os
+from datetime import datetime
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.db.models import Count, DecimalField, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from employees.models import (
+    Employee, PayrollSettlement, SalaryAdvanceRequest, SettlementLine, Transaction)
+
+DEDUCTION_FILE_COLUMNS = (
+    'employee_id', 'full_name', 'email', 'bank_name', 'bank_account',
+    'advances_count', 'advances_total', 'transactions_total', 'deduction',
+)
+
+
+def month_bounds(month):
+    """Aware ``[start, end)`` datetimes of the calendar month of ``month``."""
+    start = timezone.make_aware(datetime(month.year, month.month, 1))
+    if month.month == 12:
+        end = timezone.make_aware(datetime(month.year + 1, 1, 1))
+    else:
+        end = timezone.make_aware(datetime(month.year, month.month + 1, 1))
+    return start, end
+
+
+def _table(model):
+    return connection.ops.quote_name(model._meta.db_table)
+
+
+def settle_employer(employer, month):
+    """Create or recompute ``employer``'s settlement for ``month``; return it."""
+    month = month.replace(day=1)
+    start, end = month_bounds(month)
+    with transaction.atomic():
+        settlement, _ = PayrollSettlement.objects.select_for_update().get_or_create(
+            employer=employer, month=month,
+            defaults={'period_start': start, 'period_end': end},
+        )
+        SettlementLine.objects.filter(settlement=settlement).delete()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {_table(SettlementLine)}
+                    (id, settlement_id, employee_id, advances_count, advances_total,
+                     transactions_total, deduction)
+                SELECT gen_random_uuid(), %(settlement)s, e.id,
+                       COALESCE(a.advances_count, 0), COALESCE(a.advances_total, 0),
+                       COALESCE(t.transactions_total, 0), COALESCE(a.advances_total, 0)
+                FROM {_table(Employee)} e
+                LEFT JOIN (
+                    SELECT r.employee_id, COUNT(*) AS advances_count,
+                           SUM(r.amount_requested) AS advances_total
+                    FROM {_table(SalaryAdvanceRequest)} r
+                    JOIN {_table(Employee)} re ON re.id = r.employee_id
+                    WHERE re.employer_id = %(employer)s AND r.status = %(approved)s
+                      AND r.review_date >= %(start)s AND r.review_date < %(end)s
+                    GROUP BY r.employee_id
+                ) a ON a.employee_id = e.id
+                LEFT JOIN (
+                    SELECT r.employee_id, SUM(tx.amount) AS transactions_total
+                    FROM {_table(Transaction)} tx
+                    JOIN {_table(SalaryAdvanceRequest)} r ON r.id = tx.request_id
+                    JOIN {_table(Employee)} re ON re.id = r.employee_id
+                    WHERE re.employer_id = %(employer)s
+                      AND tx.transaction_date >= %(start)s AND tx.transaction_date < %(end)s
+                    GROUP BY r.employee_id
+                ) t ON t.employee_id = e.id
+                WHERE e.employer_id = %(employer)s
+                  AND (a.employee_id IS NOT NULL OR t.employee_id IS NOT NULL)
+                """,
+                {
+                    'settlement': settlement.pk, 'employer': employer.pk,
+                    'approved': SalaryAdvanceRequest.APPROVED, 'start': start, 'end': end,
+                },
+            )
+
+        zero = Value(Decimal('0'), output_field=DecimalField())
+        totals = SettlementLine.objects.filter(settlement=settlement).aggregate(
+            employee_count=Count('id'),
+            advances_total=Coalesce(Sum('advances_total'), zero),
+            transactions_total=Coalesce(Sum('transactions_total'), zero),
+            deductions_total=Coalesce(Sum('deduction'), zero),
+        )
+        for name, value in totals.items():
+            setattr(settlement, name, value)
+        settlement.period_start, settlement.period_end = start, end
+        settlement.save()
+    return settlement
+
+
+def write_deduction_file(settlement, path, chunk_size=2000):
+    """Write the settlement's lines as CSV, streamed from a server-side cursor.
+
+    The file is written next to ``path`` and renamed into place, so a reader
+    never sees a partial file.
+    """
+    rows = (
+        SettlementLine.objects.filter(settlement=settlement)
+        .order_by('employee__full_name', 'employee_id')
+        .values_list(
+            'employee_id', 'employee__full_name', 'employee__email', 'employee__bank_name',
+            'employee__bank_account', 'advances_count', 'advances_total', 'transactions_total',
+            'deduction')
+    )
+    tmp_path = f"{path}.tmp"
+    with transaction.atomic():
+        # Outside a transaction the cursor is declared WITH HOLD, and
+        # Postgres materializes the whole result before the first fetch.
+        with open(tmp_path, 'w', newline='', encoding='utf-8') as stream:
+            writer = csv.writer(stream)
+            writer.writerow(DEDUCTION_FILE_COLUMNS)
+            writer.writerows(rows.iterator(chunk_size=chunk_size))
+    os.replace(tmp_path, path)
+    return path
@@ -0,0 +1,185 @@
+"""Salary advance creation and approval.
+
+Every operation locks the employee rows before checking the monthly cap, so
+concurrent requests for the same employee are serialized and cannot push the
+approved total past ``Employee.ADVANCE_LIMIT_RATIO`` of the salary.
+"""
+import uuid
+
+from django.db import transaction
+from django.utils import timezone
+
+from employees import metrics
+from employees.cache import invalidate_employees
+from employees.models import Employee, MonthlyAdvanceLedger, OutboxEvent, SalaryAdvanceRequest
+from employees.services import dashboard
+
+
+def create_salary_advance(employee_id, amount_requested):
+    """Create a pending request if it fits in the employee's available amount.
+
+    Raises ``Employee.DoesNotExist`` for an unknown employee and ``ValueError``
+    when the amount exceeds what is still available this month.
+    """
+    with transaction.atomic():
+        employee = Employee.objects.lock_for_advance(employee_id)
+        _check_cap(employee, amount_requested, 'create')
+        salary_request = SalaryAdvanceRequest.objects.create(
+            employee=employee, amount_requested=amount_requested)
+    metrics.SALARY_ADVANCES_CREATED.inc()
+    return salary_request
+
+
+def approve_salary_advance(salary_request):
+    """Approve a pending request and add it to the monthly ledger.
+
+    Issues the employee lock, the ledger read, one conditional UPDATE of the
+    request, one ledger upsert and one outbox INSERT; the transaction,
+    disbursement, notification and employer summaries follow from the outbox
+    worker (``employees.services.outbox``). Raises ``ValueError`` if the
+    request is no longer pending or the amount exceeds the available amount.
+    """
+    with transaction.atomic():
+        employee = Employee.objects.lock_for_advance(salary_request.employee_id)
+        _check_cap(employee, salary_request.amount_requested, 'approve')
+
+        review_date = timezone.now()
+        approved = SalaryAdvanceRequest.objects.filter(
+            pk=salary_request.pk,
+            status=SalaryAdvanceRequest.PENDING,
+            amount_requested=salary_request.amount_requested,
+        ).update(
+            status=SalaryAdvanceRequest.APPROVED,
+            review_date=review_date,
+            modified=review_date,
+        )
+        if not approved:
+            raise ValueError("Only pending salary advance requests can be approved")
+        MonthlyAdvanceLedger.objects.record(
+            salary_request.employee_id, review_date, salary_request.amount_requested)
+        invalidate_employees([salary_request.employee_id])
+
+        salary_request.status = SalaryAdvanceRequest.APPROVED
+        salary_request.review_date = review_date
+        salary_request._summary_state = salary_request.summary_state()
+        OutboxEvent.objects.enqueue_approvals([salary_request])
+
+    metrics.SALARY_ADVANCES_APPROVED.inc()
+    return salary_request
+
+
+APPROVE = 'approve'
+REJECT = 'reject'
+
+APPROVED = 'approved'
+REJECTED = 'rejected'
+OVER_CAP = 'over_cap'
+NOT_PENDING = 'not_pending'
+MISSING = 'missing'
+INVALID = 'invalid'
+
+
+def review_salary_advances(request_ids, action):
+    """Approve or reject many pending requests in one transaction.
+
+    Employees are locked in primary key order and their month totals read
+    once. Approvals are then checked per employee in request order against
+    the running total. A request that would exceed the cap stays pending and
+    is reported as ``over_cap``. Each outcome is written with one UPDATE,
+    approvals go to the ledger in one upsert and to the outbox in one INSERT,
+    and rejections to the employer summaries in one upsert.
+
+    Returns one ``{"id", "status"[, "available_amount"]}`` entry per id, in order.
+    """
+    if action not in (APPROVE, REJECT):
+        raise ValueError(f"Unknown action: {action}")
+
+    results, ids = [], []
+    for request_id in request_ids:
+        try:
+            pk = uuid.UUID(str(request_id))
+        except ValueError:
+            results.append({'id': request_id, 'status': INVALID})
+            continue
+        results.append({'id': str(pk)})
+        ids.append(pk)
+
+    with transaction.atomic():
+        employee_ids = SalaryAdvanceRequest.objects.filter(pk__in=ids).values_list('employee_id', flat=True)
+        employees = Employee.objects.lock_many_for_advance(employee_ids) if action == APPROVE else {}
+        requests = {
+            salary_request.pk: salary_request
+            for salary_request in SalaryAdvanceRequest.objects.select_for_update().filter(pk__in=ids)
+        }
+
+        outcomes = {}
+        pending = sorted(
+            (salary_request for salary_request in requests.values()
+             if salary_request.status == SalaryAdvanceRequest.PENDING),
+            key=lambda salary_request: (salary_request.request_date, salary_request.pk),
+        )
+        for salary_request in pending:
+            if action == REJECT:
+                outcomes[salary_request.pk] = REJECTED
+                continue
+            employee = employees[salary_request.employee_id]
+            try:
+                employee.update_available_amount(salary_request.amount_requested)
+            except ValueError:
+                outcomes[salary_request.pk] = OVER_CAP
+                continue
+            employee.current_month_advanced += salary_request.amount_requested
+            outcomes[salary_request.pk] = APPROVED
+
+        review_date = timezone.now()
+        approved = [pk for pk, outcome in outcomes.items() if outcome == APPROVED]
+        rejected = [pk for pk, outcome in outcomes.items() if outcome == REJECTED]
+        if approved:
+            SalaryAdvanceRequest.objects.filter(pk__in=approved).update(
+                status=SalaryAdvanceRequest.APPROVED, review_date=review_date, modified=review_date)
+            MonthlyAdvanceLedger.objects.record_many(
+                (requests[pk].employee_id, review_date, requests[pk].amount_requested) for pk in approved)
+            invalidate_employees(requests[pk].employee_id for pk in approved)
+        if rejected:
+            SalaryAdvanceRequest.objects.filter(pk__in=rejected).update(
+                status=SalaryAdvanceRequest.REJECTED, review_date=review_date, modified=review_date)
+
+        changes = []
+        for pk in approved + rejected:
+            salary_request = requests[pk]
+            previous = salary_request.summary_state()
+            salary_request.status = (
+                SalaryAdvanceRequest.APPROVED if outcomes[pk] == APPROVED else SalaryAdvanceRequest.REJECTED)
+            salary_request.review_date = review_date
+            salary_request._summary_state = salary_request.summary_state()
+            if outcomes[pk] == REJECTED:
+                changes.append((previous, salary_request._summary_state))
+        dashboard.record_request_changes(changes)
+        OutboxEvent.objects.enqueue_approvals(requests[pk] for pk in approved)
+
+    metrics.SALARY_ADVANCES_APPROVED.inc(len(approved))
+    over_cap = sum(outcome == OVER_CAP for outcome in outcomes.values())
+    if over_cap:
+        metrics.SALARY_ADVANCES_OVER_CAP.labels('approve').inc(over_cap)
+
+    for result in results:
+        if 'status' in result:
+            continue
+        pk = uuid.UUID(result['id'])
+        if pk not in requests:
+            result['status'] = MISSING
+        elif pk not in outcomes:
+            result['status'] = NOT_PENDING
+        else:
+            result['status'] = outcomes[pk]
+            if result['status'] == OVER_CAP:
+                result['available_amount'] = employees[requests[pk].employee_id].available_amount
+    return results
+
+
+def _check_cap(employee, amount, operation):
+    try:
+        employee.update_available_amount(amount)
+    except ValueError:
+        metrics.SALARY_ADVANCES_OVER_CAP.labels(operation).inc()
+        raise
@@ -0,0 +1,76 @@
+"""Employee search by name, email and employer name.
+
+A query matches a field when pg_trgm's word similarity between them reaches
+``EMPLOYEE_SEARCH_THRESHOLD``. The query's trigrams are compared with the
+closest run of words in the field, so prefixes ("gonz" finds "Gonzalez") and
+typos ("gonzales") match too. Results are ranked by the best similarity of the
+three fields.
+
+Matching uses the ``%>`` operator, which the ``gin_trgm_ops`` indexes on
+``employee.full_name``, ``employee.email`` and ``employer.name`` answer. Its
+cut-off is the ``pg_trgm.word_similarity_threshold`` setting. The search sets
+it for its own transaction, so the setting holds under pgbouncer's transaction
+pooling.
+"""
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db import connections, transaction
+from django.db.models import Q
+from django.db.models.functions import Greatest
+
+from employees.models import Employee, Employer
+
+MIN_QUERY_LENGTH = 2
+
+
+def normalize(query):
+    return " ".join(query.split())
+
+
+def rank(query):
+    """The best word similarity of ``query`` to an employee's name, email or employer name."""
+    return Greatest(
+        TrigramWordSimilarity(query, 'full_name'),
+        TrigramWordSimilarity(query, 'email'),
+        TrigramWordSimilarity(query, 'employer__name'),
+    )
+
+
+@contextmanager
+def similarity_threshold(using):
+    """Run the block in a transaction on ``using`` with the search's threshold set."""
+    with transaction.atomic(using=using):
+        with connections[using].cursor() as cursor:
+            cursor.execute(
+                "SELECT set_config('pg_trgm.word_similarity_threshold', %s, true)",
+                [str(settings.EMPLOYEE_SEARCH_THRESHOLD)],
+            )
+        yield
+
+
+def search_employees(query, queryset=None, limit=20, columns=('pk',)):
+    """Return the ``limit`` employees of ``queryset`` that best match ``query``, best first.
+
+    Each row holds the ``columns`` (any ``values_list()`` argument) followed by
+    the rank.
+    """
+    if queryset is None:
+        queryset = Employee.objects.all()
+    # The threshold is set on one connection; every query below must use it.
+    db = queryset.db
+    with similarity_threshold(db):
+        # Matching employers are read first: an employer_id list can join the
+        # name and email index scans in one BitmapOr, a join could not.
+        employer_ids = list(
+            Employer.objects.using(db).filter(name__trigram_word_similar=query).values_list('pk', flat=True))
+        matches = Q(full_name__trigram_word_similar=query) | Q(email__trigram_word_similar=query)
+        if employer_ids:
+            matches |= Q(employer__in=employer_ids)
+        return list(
+            queryset.using(db).filter(matches)
+            .annotate(search_rank=rank(query))
+            .order_by('-search_rank', 'full_name', 'pk')
+            .values_list(*columns, 'search_rank')[:limit]
+        )
@@ -0,0 +1,84 @@
+from django.core.signals import request_finished
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from employees.cache import invalidate_employees
+from employees.db_router import set_replica_reads
+from employees.models import Employee, Employer, MonthlyAdvanceLedger, SalaryAdvanceRequest, Transaction
+from employees.services import dashboard
+
+
+@receiver(request_finished)
+def end_replica_reads(sender, **kwargs):
+    # Streaming responses keep reading from the replica until they are closed.
+    set_replica_reads(False)
+
+
+@receiver([post_save, post_delete], sender=Employee)
+def invalidate_employee(sender, instance, **kwargs):
+    invalidate_employees([instance.pk])
+
+
+@receiver([post_save, post_delete], sender=SalaryAdvanceRequest)
+def invalidate_salary_advance_employee(sender, instance, **kwargs):
+    invalidate_employees([instance.employee_id])
+
+
+@receiver([post_save, post_delete], sender=Transaction)
+def invalidate_transaction_employee(sender, instance, **kwargs):
+    invalidate_employees([instance.request.employee_id])
+
+
+def _deleting_employer(origin):
+    # The employer's summaries are deleted by the same cascade.
+    if isinstance(origin, QuerySet):
+        return origin.model is Employer
+    return isinstance(origin, Employer)
+
+
+def _deleting_employee(origin):
+    # The employee's ledger rows are deleted by the same cascade.
+    if isinstance(origin, QuerySet):
+        return origin.model in (Employee, Employer)
+    return isinstance(origin, (Employee, Employer))
+
+
+@receiver(post_delete, sender=SalaryAdvanceRequest)
+def remove_from_ledger(sender, instance, origin=None, **kwargs):
+    if _deleting_employee(origin):
+        return
+    MonthlyAdvanceLedger.objects.record_many(instance.ledger_entries(sign=-1))
+
+
+@receiver(pre_save, sender=Employee)
+@receiver(pre_save, sender=SalaryAdvanceRequest)
+def load_summary_state(sender, instance, raw, **kwargs):
+    """Read the stored state of instances that were not loaded with all of it."""
+    if raw or instance._state.adding or hasattr(instance, '_summary_state'):
+        return
+    stored = sender.objects.filter(pk=instance.pk).first()
+    instance._summary_state = getattr(stored, '_summary_state', None)
+
+
+@receiver(post_save, sender=Employee)
+@receiver(post_save, sender=SalaryAdvanceRequest)
+def update_summaries(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    old = None if created else getattr(instance, '_summary_state', None)
+    instance._summary_state = instance.summary_state()
+    record = (dashboard.record_employee_changes if sender is Employee
+              else dashboard.record_request_changes)
+    record([(old, instance._summary_state)])
+
+
+@receiver(post_delete, sender=Employee)
+@receiver(post_delete, sender=SalaryAdvanceRequest)
+def remove_from_summaries(sender, instance, origin=None, **kwargs):
+    if _deleting_employer(origin):
+        return
+    old = getattr(instance, '_summary_state', None) or instance.summary_state()
+    record = (dashboard.record_employee_changes if sender is Employee
+              else dashboard.record_request_changes)
+    record([(old, None)])
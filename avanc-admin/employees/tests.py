@@ -1,3 +1,1265 @@
-from django.test import TestCase
+import csv
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from datetime import datetime, timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import Mock, patch
 
-# Create your tests here.
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import check_password, make_password
+from django.core import signing
+from django.core.cache import cache
+from django.core.cache.backends.redis import RedisCache
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.http import HttpResponse, JsonResponse
+from django.test import AsyncRequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from prometheus_client import REGISTRY
+
+from employees import cache as detail_cache, db_router, ratelimit
+from employees.api.v1.async_views import (
+    AsyncEmployeeDetailApi, AsyncEmployeeSalaryAdvanceRequestApi, AsyncEmployeeTransactionsApi)
+from employees.api.v1.exports import EmployeeExportApi
+from employees.db_router import ReplicaRouter, replica_reads, reset_lags, set_replica_reads
+from employees.middleware import QueryInstrumentationMiddleware
+from employees.models import (
+    Disbursement, DisbursementBatch, Employee, Employer, EmployerBankSummary, EmployerMonthlySummary, EmployerSummary,
+    MonthlyAdvanceLedger, OutboxEvent, PayrollSettlement, SalaryAdvanceRequest, SettlementLine, Transaction,
+    month_start)
+from employees.services.dashboard import MONTHLY_FIELDS, SUMMARY_FIELDS, rebuild_summaries
+from employees.services.outbox import process_batch
+from employees.services.partitions import add_months, ensure_partitions, partition_months
+from employees.services.salary_advance import (
+    approve_salary_advance, create_salary_advance, review_salary_advances)
+from employees.tokens import issue_tokens, revoked_tokens
+
+
+class EmployeeFixturesMixin:
+    @classmethod
+    def setUpTestData(cls):
+        cls.employer = Employer.objects.create(name="Acme")
+        cls.employee = Employee.objects.create(
+            employer=cls.employer, full_name="Ana Perez", email="ana@example.com",
+            salary=Decimal("1000.00"), password="x")
+
+    def auth(self, employee=None):
+        token = issue_tokens((employee or self.employee).pk)["access"]
+        return {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+
+
+class MonthlyAdvanceLedgerTests(EmployeeFixturesMixin, TestCase):
+    def approve(self, amount):
+        advance = SalaryAdvanceRequest.objects.create(
+            employee=self.employee, amount_requested=amount)
+        advance.status = SalaryAdvanceRequest.APPROVED
+        advance.save()
+        return advance
+
+    def test_approval_updates_ledger(self):
+        self.approve(Decimal("100.00"))
+        self.approve(Decimal("50.00"))
+
+        ledger = MonthlyAdvanceLedger.objects.get(employee=self.employee)
+        self.assertEqual(ledger.month, month_start(timezone.now()))
+        self.assertEqual(ledger.advanced_total, Decimal("150.00"))
+        self.assertEqual(self.employee.available_amount, Decimal("550.00"))
+
+    def test_pending_requests_are_not_recorded(self):
+        SalaryAdvanceRequest.objects.create(employee=self.employee, amount_requested=Decimal("100.00"))
+
+        self.assertFalse(MonthlyAdvanceLedger.objects.exists())
+        self.assertEqual(self.employee.available_amount, Decimal("700.00"))
+
+    def test_available_amount_is_single_query(self):
+        self.approve(Decimal("100.00"))
+
+        with self.assertNumQueries(1):
+            self.employee.available_amount
+
+    def test_stale_approval_is_counted_once(self):
+        advance = SalaryAdvanceRequest.objects.create(
+            employee=self.employee, amount_requested=Decimal("100.00"))
+        first, second = (SalaryAdvanceRequest.objects.get(pk=advance.pk) for _ in range(2))
+        first.status = second.status = SalaryAdvanceRequest.APPROVED
+        first.save()
+
+        with self.assertRaises(ValueError), transaction.atomic():
+            second.save()
+        self.assertEqual(MonthlyAdvanceLedger.objects.get().advanced_total, Decimal("100.00"))
+
+    def test_edits_and_deletions_of_approved_requests_update_ledger(self):
+        advance = self.approve(Decimal("100.00"))
+        self.approve(Decimal("50.00"))
+
+        advance.amount_requested = Decimal("80.00")
+        advance.save()
+        self.assertEqual(MonthlyAdvanceLedger.objects.get().advanced_total, Decimal("130.00"))
+
+        advance.delete()
+        self.assertEqual(MonthlyAdvanceLedger.objects.get().advanced_total, Decimal("50.00"))
+
+        self.employee.delete()
+        self.assertFalse(MonthlyAdvanceLedger.objects.exists())
+
+    def test_rebuild_command_reconciles_ledger(self):
+        self.approve(Decimal("100.00"))
+        MonthlyAdvanceLedger.objects.update(advanced_total=Decimal("1.00"))
+
+        out = StringIO()
+        call_command("rebuild_advance_ledger", "--dry-run", stdout=out)
+        self.assertIn("1 mismatched", out.getvalue())
+        self.assertEqual(MonthlyAdvanceLedger.objects.get().advanced_total, Decimal("1.00"))
+
+        call_command("rebuild_advance_ledger", stdout=StringIO())
+        self.assertEqual(MonthlyAdvanceLedger.objects.get().advanced_total, Decimal("100.00"))
+
+        call_command("rebuild_advance_ledger", "--rebuild", stdout=StringIO())
+        self.assertEqual(MonthlyAdvanceLedger.objects.get().advanced_total, Decimal("100.00"))
+
+
+class EmployeeAdminChangelistTests(EmployeeFixturesMixin, TestCase):
+    def setUp(self):
+        admin_user = get_user_model().objects.create_superuser("admin", "admin@example.com", "admin")
+        self.client.force_login(admin_user)
+
+    def add_employees(self, count):
+        start = Employee.objects.count()
+        for i in range(start, start + count):
+            employee = Employee.objects.create(
+                employer=Employer.objects.create(name=f"Employer {i}"), full_name=f"Employee {i}",
+                email=f"employee{i}@example.com", salary=Decimal("1000.00"), password="x")
+            advance = SalaryAdvanceRequest.objects.create(employee=employee, amount_requested=Decimal("10.00"))
+            advance.status = SalaryAdvanceRequest.APPROVED
+            advance.save()
+
+    def changelist_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("admin:employees_employee_changelist"))
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_query_count_does_not_grow_with_page_size(self):
+        self.add_employees(2)
+        baseline = self.changelist_queries()
+
+        self.add_employees(20)
+        self.assertEqual(self.changelist_queries(), baseline)
+
+    def test_available_amount_uses_current_month_ledger(self):
+        self.add_employees(1)
+
+        response = self.client.get(reverse("admin:employees_employee_changelist"))
+        self.assertContains(response, "690.00")
+        self.assertContains(response, "700.00")
+
+
+class SalaryAdvanceApiTests(EmployeeFixturesMixin, TestCase):
+    def post_advance(self, amount):
+        return self.client.post(
+            f"/api/v1/employees/{self.employee.pk}/salary-advances",
+            data=json.dumps({"amount_requested": amount}), content_type="application/json", **self.auth())
+
+    def test_creates_pending_request(self):
+        response = self.post_advance("250.50")
+
+        self.assertEqual(response.status_code, 201)
+        advance = SalaryAdvanceRequest.objects.get(pk=response.json()["id"])
+        self.assertEqual(advance.status, SalaryAdvanceRequest.PENDING)
+        self.assertEqual(advance.amount_requested, Decimal("250.50"))
+
+    def test_rejects_amount_over_available(self):
+        response = self.post_advance(701)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("exceeds available amount", response.json()["error"])
+        self.assertFalse(SalaryAdvanceRequest.objects.exists())
+
+
+class SalaryAdvanceConcurrencyTests(TransactionTestCase):
+    def setUp(self):
+        employer = Employer.objects.create(name="Acme")
+        self.employee = Employee.objects.create(
+            employer=employer, full_name="Ana Perez", email="ana@example.com",
+            salary=Decimal("1000.00"), password="x")
+
+    def tearDown(self):
+        # The flush between transactional tests does not see the fintech schema tables.
+        Employer.objects.all().delete()
+
+    def test_create_and_approve_statement_counts(self):
+        # BEGIN, employee lock, ledger read, INSERT, employer summary upsert, COMMIT.
+        with self.assertNumQueries(6):
+            advance = create_salary_advance(self.employee.pk, Decimal("100.00"))
+        # BEGIN, employee lock, ledger read, conditional UPDATE, ledger upsert,
+        # outbox INSERT, COMMIT.
+        with self.assertNumQueries(7):
+            approve_salary_advance(advance)
+
+    def test_parallel_approvals_respect_cap(self):
+        workers = 16
+        advances = [
+            SalaryAdvanceRequest.objects.create(employee=self.employee, amount_requested=Decimal("100.00"))
+            for _ in range(workers)
+        ]
+        barrier = threading.Barrier(workers)
+
+        def approve(advance):
+            try:
+                barrier.wait()
+                approve_salary_advance(advance)
+                return True
+            except ValueError:
+                return False
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(approve, advances))
+
+        self.assertEqual(results.count(True), 7)
+        self.assertEqual(
+            SalaryAdvanceRequest.objects.filter(status=SalaryAdvanceRequest.APPROVED).count(), 7)
+        self.assertEqual(MonthlyAdvanceLedger.objects.get().advanced_total, Decimal("700.00"))
+
+    def test_same_request_is_approved_once(self):
+        advance = SalaryAdvanceRequest.objects.create(employee=self.employee, amount_requested=Decimal("100.00"))
+        barrier = threading.Barrier(8)
+
+        def approve(_):
+            try:
+                barrier.wait()
+                approve_salary_advance(SalaryAdvanceRequest.objects.get(pk=advance.pk))
+                return True
+            except ValueError:
+                return False
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(approve, range(8)))
+
+        self.assertEqual(results.count(True), 1)
+        self.assertEqual(MonthlyAdvanceLedger.objects.get().advanced_total, Decimal("100.00"))
+
+
+class EmployeeListApiTests(EmployeeFixturesMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        other = Employer.objects.create(name="Globex")
+        for i in range(4):
+            Employee.objects.create(
+                employer=other, full_name=f"Globex {i}", email=f"globex{i}@example.com",
+                salary=Decimal("500.00"), password="x", city="La Paz")
+
+    def test_cursor_pagination_visits_every_employee_once(self):
+        seen, cursor = [], None
+        while True:
+            params = {"page_size": 2}
+            if cursor:
+                params["cursor"] = cursor
+            body = self.client.get("/api/v1/employees/", params).json()
+            self.assertLessEqual(len(body["results"]), 2)
+            seen += [row["id"] for row in body["results"]]
+            cursor = body["next_cursor"]
+            if not cursor:
+                break
+
+        expected = [str(pk) for pk in Employee.objects.order_by("created", "id").values_list("id", flat=True)]
+        self.assertEqual(seen, expected)
+
+    def test_fields_projection_and_filters(self):
+        body = self.client.get(
+            "/api/v1/employees/", {"fields": "full_name,city", "city": "La Paz"}).json()
+
+        self.assertEqual(len(body["results"]), 4)
+        self.assertEqual(body["results"][0], {"full_name": "Globex 0", "city": "La Paz"})
+
+        body = self.client.get("/api/v1/employees/", {"employer": str(self.employer.pk)}).json()
+        self.assertEqual([row["full_name"] for row in body["results"]], ["Ana Perez"])
+
+    def test_rejects_invalid_parameters(self):
+        for params in ({"fields": "password"}, {"cursor": "nope"}, {"page_size": "0"}, {"employer": "x"}):
+            self.assertEqual(self.client.get("/api/v1/employees/", params).status_code, 400)
+
+
+class ExportApiTests(EmployeeFixturesMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        advance = SalaryAdvanceRequest.objects.create(employee=cls.employee, amount_requested=Decimal("100.00"))
+        Transaction.objects.create(request=advance, amount=Decimal("100.00"))
+        other = Employer.objects.create(name="Globex")
+        Employee.objects.create(
+            employer=other, full_name="Bob", email="bob@example.com", salary=Decimal("1.00"), password="x")
+        cls.staff = get_user_model().objects.create_user("accountant", password="x", is_staff=True)
+
+    def setUp(self):
+        self.client.force_login(self.staff)
+
+    def test_rejects_non_staff(self):
+        self.client.logout()
+        for export in ("employees", "salary-advances", "transactions"):
+            self.assertEqual(self.client.get(f"/api/v1/exports/{export}").status_code, 403)
+        self.client.force_login(get_user_model().objects.create_user("clerk", password="x"))
+        self.assertEqual(self.client.get("/api/v1/exports/employees").status_code, 403)
+
+    def test_streams_ndjson_filtered_by_employer(self):
+        response = self.client.get("/api/v1/exports/employees", {"employer": str(self.employer.pk)})
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(line)["full_name"] for line in lines], ["Ana Perez"])
+
+    def test_streams_csv_within_date_range(self):
+        today = timezone.localdate()
+        response = self.client.get("/api/v1/exports/transactions", {
+            "format": "csv", "start": today.isoformat(), "end": (today + timedelta(days=1)).isoformat()})
+
+        rows = list(csv.reader(b"".join(response.streaming_content).decode().splitlines()))
+        self.assertEqual(rows[0], ["id", "request", "employee", "amount", "transaction_date"])
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1][2], str(self.employee.pk))
+
+        response = self.client.get("/api/v1/exports/salary-advances", {"end": today.isoformat()})
+        self.assertEqual(b"".join(response.streaming_content), b"")
+
+    def test_pages_through_rows_with_the_same_timestamp(self):
+        Employee.objects.bulk_create([
+            Employee(employer=self.employer, full_name=f"Employee {i}", email=f"e{i}@example.com",
+                     salary=Decimal("1.00"), password="x")
+            for i in range(5)
+        ])
+        # bulk_create gives the five rows the same created timestamp.
+        expected = [str(pk) for pk in Employee.objects.order_by("created", "id").values_list("id", flat=True)]
+        with patch.object(EmployeeExportApi, "chunk_size", 2), CaptureQueriesContext(connection) as ctx:
+            response = self.client.get("/api/v1/exports/employees")
+            lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(line)["id"] for line in lines], expected)
+        # The session and the user, then four pages of two.
+        self.assertEqual(len(ctx.captured_queries), 6)
+
+    def test_rejects_invalid_parameters(self):
+        for params in ({"format": "xml"}, {"start": "2024-13-01"}, {"employer": "x"}):
+            self.assertEqual(self.client.get("/api/v1/exports/employees", params).status_code, 400)
+
+
+class EmployeeBulkUpdateApiTests(EmployeeFixturesMixin, TestCase):
+    def put(self, payload):
+        return self.client.put("/api/v1/employees/", data=json.dumps(payload), content_type="application/json")
+
+    def test_reports_each_item_and_updates_in_one_statement(self):
+        other = Employer.objects.create(name="Globex")
+        missing = "00000000-0000-0000-0000-000000000000"
+        payload = [
+            {"id": str(self.employee.pk), "full_name": "Ana Maria", "salary": "1200.50", "employer": str(other.pk)},
+            {"id": missing, "full_name": "Nobody"},
+            {"id": str(self.employee.pk), "password": "hijack"},
+            {"id": str(self.employee.pk), "salary": "-1"},
+            {"full_name": "No id"},
+        ]
+
+        # BEGIN/savepoint, in_bulk, employer lookup, bulk UPDATE, release, plus
+        # the dashboard rebuild of both employers since the employee moved:
+        # savepoint, three DELETEs, three INSERT ... SELECTs, release.
+        with self.assertNumQueries(13):
+            response = self.put(payload)
+
+        self.assertEqual(response.status_code, 200)
+        statuses = [item["status"] for item in response.json()["results"]]
+        self.assertEqual(statuses, ["updated", "missing", "invalid", "invalid", "invalid"])
+        self.assertIn("password", response.json()["results"][2]["errors"])
+        self.employee.refresh_from_db()
+        self.assertEqual(self.employee.full_name, "Ana Maria")
+        self.assertEqual(self.employee.salary, Decimal("1200.50"))
+        self.assertEqual(self.employee.employer, other)
+        self.assertEqual(self.employee.password, "x")
+
+    def test_reports_email_conflicts_per_item(self):
+        bruno, carla = (
+            Employee.objects.create(
+                employer=self.employer, full_name=name, email=f"{name.lower()}@example.com",
+                salary=Decimal("1000.00"), password="x")
+            for name in ("Bruno", "Carla"))
+        payload = [
+            {"id": str(bruno.pk), "email": "ana@example.com"},
+            {"id": str(bruno.pk), "email": "new@example.com"},
+            {"id": str(carla.pk), "email": "new@example.com", "full_name": "Carla Rios"},
+            {"id": str(self.employee.pk), "email": "ana@example.com", "full_name": "Ana Maria"},
+        ]
+
+        response = self.put(payload)
+
+        self.assertEqual(response.status_code, 200)
+        results = response.json()["results"]
+        self.assertEqual([item["status"] for item in results], ["invalid", "updated", "invalid", "updated"])
+        self.assertEqual(results[2]["errors"], {"email": ["Email already in use"]})
+        self.assertEqual(
+            dict(Employee.objects.values_list("email", "full_name")),
+            {"ana@example.com": "Ana Maria", "new@example.com": "Bruno", "carla@example.com": "Carla"})
+
+    def test_rejects_non_list_payload(self):
+        self.assertEqual(self.put({"id": str(self.employee.pk)}).status_code, 400)
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"], ONBOARDING_HASH_WORKERS=1)
+class EmployeeImportTests(EmployeeFixturesMixin, TestCase):
+    def test_command_imports_csv_in_batches_with_hash_pool(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as f:
+            f.write("email,password,full_name,salary,employer_name,city\n")
+            for i in range(5):
+                f.write(f"new{i}@example.com,secret{i},New {i},800,Acme,La Paz\n")
+            f.write("bad@example.com,secret,Bad,-5,Acme,\n")
+            f.write("lost@example.com,secret,Lost,800,Unknown,\n")
+            f.write("ana@example.com,secret,Dup,800,Acme,\n")
+            f.write("new0@example.com,secret,Dup,800,Acme,\n")
+        self.addCleanup(os.remove, f.name)
+
+        out, err = StringIO(), StringIO()
+        call_command("import_employees", f.name, "--batch-size", "3", "--workers", "2", stdout=out, stderr=err)
+
+        self.assertIn("Imported 5 employees, 4 failed", out.getvalue())
+        self.assertIn("line 7", err.getvalue())
+        self.assertIn("line 8", err.getvalue())
+        employee = Employee.objects.get(email="new3@example.com")
+        self.assertEqual((employee.employer, employee.city), (self.employer, "La Paz"))
+        self.assertTrue(check_password("secret3", employee.password))
+
+    def post_rows(self, count):
+        body = "\n".join(json.dumps({
+            "email": f"api{i}@example.com", "password": "pw", "full_name": f"Api {i}",
+            "salary": 900, "employer_name": "Acme",
+        }) for i in range(count))
+        return self.client.post("/api/v1/employees/import", data=body, content_type="application/x-ndjson")
+
+    def test_api_imports_small_uploads_for_staff(self):
+        self.assertEqual(self.post_rows(3).status_code, 403)
+        self.client.force_login(get_user_model().objects.create_user("hr", password="x", is_staff=True))
+
+        with patch("employees.services.onboarding.ProcessPoolExecutor") as pool:
+            response = self.post_rows(3)
+
+        pool.assert_not_called()
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["created"], 3)
+        self.assertEqual(Employee.objects.filter(email__startswith="api").count(), 3)
+
+    @override_settings(ONBOARDING_INLINE_MAX_ROWS=2, ONBOARDING_HASH_WORKERS=1)
+    def test_api_queues_large_uploads_for_the_outbox_worker(self):
+        self.client.force_login(get_user_model().objects.create_user("hr", password="x", is_staff=True))
+
+        response = self.post_rows(3)
+
+        self.assertEqual(response.status_code, 202)
+        self.assertFalse(Employee.objects.filter(email__startswith="api").exists())
+        self.assertEqual(OutboxEvent.objects.get().topic, OutboxEvent.EMPLOYEES_IMPORT)
+        with self.assertLogs("employees.outbox") as logs:
+            self.assertEqual(process_batch(), (1, 0, 0))
+        self.assertIn("3 created, 0 failed", logs.output[-1])
+        self.assertEqual(Employee.objects.filter(email__startswith="api").count(), 3)
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class TokenAuthenticationTests(EmployeeFixturesMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        revoked_tokens.clear()
+        Employee.objects.filter(pk=self.employee.pk).update(password=make_password("secret"))
+
+    def sign_in(self):
+        response = self.client.post(
+            "/api/v1/signin/", data=json.dumps({"email": "ana@example.com", "password": "secret"}),
+            content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_protected_routes_require_token_for_same_employee(self):
+        url = f"/api/v1/employees/{self.employee.pk}/transactions"
+        self.assertEqual(self.client.get(url).status_code, 401)
+        self.assertEqual(self.client.get(url, HTTP_AUTHORIZATION="Bearer forged").status_code, 401)
+
+        other = Employee.objects.create(
+            employer=self.employer, full_name="Bob", email="bob@example.com", salary=1, password="x")
+        self.assertEqual(self.client.get(url, **self.auth(other)).status_code, 403)
+
+        tokens = self.sign_in()
+        self.assertEqual(tokens["token"], tokens["access"])
+        self.assertEqual(self.client.get(url, HTTP_AUTHORIZATION=f"Bearer {tokens['access']}").status_code, 200)
+        self.assertEqual(self.client.get("/api/v1/employees/").status_code, 200)
+
+    def test_tokens_signed_with_the_secret_key_are_rejected(self):
+        forged = signing.dumps(
+            {"sub": str(self.employee.pk), "typ": "access", "jti": "x"}, salt="employees.tokens")
+        url = f"/api/v1/employees/{self.employee.pk}/transactions"
+        self.assertEqual(self.client.get(url, HTTP_AUTHORIZATION=f"Bearer {forged}").status_code, 401)
+
+    def test_verification_does_not_query_the_database(self):
+        url = f"/api/v1/employees/{self.employee.pk}/transactions"
+        headers = self.auth()
+        # Employee lookup and transactions listing only.
+        with self.assertNumQueries(2):
+            self.client.get(url, **headers)
+
+    def test_refresh_rotates_and_sign_out_revokes(self):
+        tokens = self.sign_in()
+        url = f"/api/v1/employees/{self.employee.pk}"
+
+        response = self.client.post(
+            "/api/v1/token/refresh/", data=json.dumps({"refresh": tokens["refresh"]}),
+            content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        refreshed = response.json()
+        response = self.client.post(
+            "/api/v1/token/refresh/", data=json.dumps({"refresh": tokens["refresh"]}),
+            content_type="application/json")
+        self.assertEqual(response.status_code, 401)
+
+        access = {"HTTP_AUTHORIZATION": f"Bearer {refreshed['access']}"}
+        self.assertEqual(self.client.get(url, **access).status_code, 200)
+        self.client.post("/api/v1/signout/", data="{}", content_type="application/json", **access)
+        self.assertEqual(self.client.get(url, **access).status_code, 401)
+
+
+class EmployeeDetailCacheTests(EmployeeFixturesMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        detail_cache.reset_stats()
+        self.url = f"/api/v1/employees/{self.employee.pk}"
+
+    def test_second_read_is_served_from_cache_and_honours_etag(self):
+        first = self.client.get(self.url, **self.auth())
+        self.assertEqual((first.status_code, first["X-Cache"]), (200, "MISS"))
+        self.assertEqual(Decimal(first.json()["available_amount"]), Decimal("700"))
+
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url, **self.auth())
+        self.assertEqual((second["X-Cache"], second.content), ("HIT", first.content))
+
+        not_modified = self.client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"], **self.auth())
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified.content, b"")
+        self.assertEqual(detail_cache.stats(), {"hits": 2, "misses": 1})
+
+    def test_approval_invalidates_cached_balance(self):
+        etag = self.client.get(self.url, **self.auth())["ETag"]
+        advance = SalaryAdvanceRequest.objects.create(employee=self.employee, amount_requested=Decimal("100.00"))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            approve_salary_advance(advance)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag, **self.auth())
+        self.assertEqual((response.status_code, response["X-Cache"]), (200, "MISS"))
+        self.assertEqual(Decimal(response.json()["available_amount"]), Decimal("600"))
+
+
+class AsyncEmployeeApiTests(EmployeeFixturesMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = AsyncRequestFactory()
+
+    async def test_detail_matches_sync_view(self):
+        url = f"/api/v1/employees/{self.employee.pk}"
+        response = await AsyncEmployeeDetailApi.as_view()(self.factory.get(url), pk=self.employee.pk)
+        self.assertEqual((response.status_code, response["X-Cache"]), (200, "MISS"))
+        cached = await AsyncEmployeeDetailApi.as_view()(self.factory.get(url), pk=self.employee.pk)
+        self.assertEqual((cached["X-Cache"], cached.content), ("HIT", response.content))
+        self.assertEqual(Decimal(json.loads(response.content)["available_amount"]), Decimal("700"))
+
+        missing = await AsyncEmployeeTransactionsApi.as_view()(
+            self.factory.get(url), pk="00000000-0000-0000-0000-000000000000")
+        self.assertEqual(missing.status_code, 404)
+
+    async def test_salary_advances_create_and_list(self):
+        url = f"/api/v1/employees/{self.employee.pk}/salary-advances"
+        view = AsyncEmployeeSalaryAdvanceRequestApi.as_view()
+
+        created = await view(
+            self.factory.post(url, {"amount_requested": "400"}, content_type="application/json"),
+            pk=self.employee.pk)
+        self.assertEqual(created.status_code, 201)
+        over_cap = await view(
+            self.factory.post(url, {"amount_requested": "800"}, content_type="application/json"),
+            pk=self.employee.pk)
+        self.assertEqual(over_cap.status_code, 400)
+
+        listed = json.loads((await view(self.factory.get(url), pk=self.employee.pk)).content)
+        self.assertEqual(
+            [(row["id"], row["status"]) for row in listed["salary_advance_requests"]],
+            [(json.loads(created.content)["id"], SalaryAdvanceRequest.PENDING)])
+
+    async def test_salary_advance_idempotency_key_replays(self):
+        url = f"/api/v1/employees/{self.employee.pk}/salary-advances"
+        view = AsyncEmployeeSalaryAdvanceRequestApi.as_view()
+
+        def post():
+            return self.factory.post(
+                url, {"amount_requested": "100"}, content_type="application/json",
+                headers={"Idempotency-Key": "double-tap"})
+
+        created = await view(post(), pk=self.employee.pk)
+        replay = await view(post(), pk=self.employee.pk)
+        self.assertEqual((replay.status_code, replay.content), (201, created.content))
+        self.assertEqual(await SalaryAdvanceRequest.objects.acount(), 1)
+
+
+class QueryInstrumentationTests(EmployeeFixturesMixin, TestCase):
+    def setUp(self):
+        self.url = f"/api/v1/employees/{self.employee.pk}/salary-advances"
+
+    @override_settings(QUERY_INSTRUMENTATION_SAMPLE_RATE=1, QUERY_COUNT_WARNING_THRESHOLD=1)
+    def test_reports_queries_and_warns_over_threshold(self):
+        with self.assertLogs("employees.queries", "WARNING") as logs:
+            response = self.client.get(self.url, **self.auth())
+        self.assertRegex(response["Server-Timing"], r'^db;dur=[\d.]+;desc="2 queries", app;dur=[\d.]+$')
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(
+            (record["view"], record["queries"], record["exceeded"]),
+            ("employees.api.v1.views.EmployeeSalaryAdvanceRequestApi", 2, ["queries"]))
+        self.assertTrue(record["slowest_sql"].startswith("SELECT"))
+
+    @override_settings(QUERY_INSTRUMENTATION_SAMPLE_RATE=0)
+    def test_unsampled_requests_are_untouched(self):
+        self.assertNotIn("Server-Timing", self.client.get(self.url, **self.auth()))
+
+    async def test_async_chain_counts_queries_run_in_threads(self):
+        async def get_response(request):
+            await sync_to_async(Employee.objects.count)()
+            return HttpResponse()
+
+        request = AsyncRequestFactory().get(self.url)
+        request.resolver_match = None
+        for rate, expected in ((1, 'desc="1 queries"'), (0, None)):
+            with override_settings(QUERY_INSTRUMENTATION_SAMPLE_RATE=rate):
+                middleware = QueryInstrumentationMiddleware(get_response)
+            self.assertTrue(iscoroutinefunction(middleware))
+            with self.assertLogs("employees.queries", "INFO") if rate else nullcontext():
+                response = await middleware(request)
+            if expected:
+                self.assertIn(expected, response["Server-Timing"])
+            else:
+                self.assertNotIn("Server-Timing", response)
+
+
+class MetricsTests(EmployeeFixturesMixin, TestCase):
+    def sample(self, name, **labels):
+        return REGISTRY.get_sample_value(name, labels) or 0
+
+    def test_counts_business_events_and_exposes_route_latency(self):
+        over_cap = self.sample("avanc_salary_advances_over_cap_total", operation="create")
+        created = self.sample("avanc_salary_advances_created_total")
+        failures = self.sample("avanc_sign_in_failures_total", reason="unknown_email")
+
+        url = f"/api/v1/employees/{self.employee.pk}/salary-advances"
+        for amount in ("100", "900"):
+            self.client.post(url, {"amount_requested": amount}, content_type="application/json", **self.auth())
+        self.client.post(
+            "/api/v1/signin/", {"email": "nobody@example.com", "password": "x"}, content_type="application/json")
+
+        self.assertEqual(self.sample("avanc_salary_advances_over_cap_total", operation="create"), over_cap + 1)
+        self.assertEqual(self.sample("avanc_salary_advances_created_total"), created + 1)
+        self.assertEqual(self.sample("avanc_sign_in_failures_total", reason="unknown_email"), failures + 1)
+
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(
+            'avanc_http_requests_total{method="POST",route="api/v1/employees/<uuid:pk>/salary-advances",'
+            'status="201"}', response.content.decode())
+        self.assertIn("avanc_db_connections{", response.content.decode())
+
+
+class SettlePayrollCommandTests(EmployeeFixturesMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.colleague = Employee.objects.create(
+            employer=cls.employer, full_name="Bruno Diaz", email="bruno@example.com",
+            salary=Decimal("2000.00"), password="x")
+        outsider = Employee.objects.create(
+            employer=Employer.objects.create(name="Other"), full_name="Carla Rios",
+            email="carla@example.com", salary=Decimal("2000.00"), password="x")
+        reviewed = timezone.make_aware(datetime(2026, 9, 10, 12))
+        for employee, amount, status, review_date in (
+            (cls.employee, "100.00", SalaryAdvanceRequest.APPROVED, reviewed),
+            (cls.employee, "50.00", SalaryAdvanceRequest.APPROVED, reviewed),
+            (cls.employee, "70.00", SalaryAdvanceRequest.APPROVED, reviewed + timedelta(days=30)),
+            (cls.colleague, "300.00", SalaryAdvanceRequest.PENDING, None),
+            (outsider, "80.00", SalaryAdvanceRequest.APPROVED, reviewed),
+        ):
+            advance = SalaryAdvanceRequest.objects.bulk_create([SalaryAdvanceRequest(
+                employee=employee, amount_requested=Decimal(amount), status=status, review_date=review_date)])[0]
+            if status == SalaryAdvanceRequest.APPROVED:
+                Transaction.objects.create(request=advance, amount=advance.amount_requested)
+        Transaction.objects.update(transaction_date=reviewed)
+
+    def test_settles_month_per_employer_idempotently(self):
+        with tempfile.TemporaryDirectory() as output_dir:
+            for _ in range(2):
+                call_command(
+                    "settle_payroll", month="2026-09", employer="Acme", output_dir=output_dir, stdout=StringIO())
+            with open(os.path.join(output_dir, f"deductions_{self.employer.pk}_2026-09.csv")) as f:
+                rows = list(csv.DictReader(f))
+
+        settlement = PayrollSettlement.objects.get()
+        self.assertEqual(
+            (settlement.employee_count, settlement.deductions_total, settlement.transactions_total),
+            (1, Decimal("150.00"), Decimal("220.00")))
+        self.assertEqual(SettlementLine.objects.count(), 1)
+        self.assertEqual(
+            [(row["email"], row["advances_count"], row["deduction"]) for row in rows],
+            [("ana@example.com", "2", "150.00")])
+
+
+class SalaryAdvanceReviewTests(EmployeeFixturesMixin, TestCase):
+    def add_requests(self, employee, *amounts):
+        now = timezone.now()
+        return [
+            SalaryAdvanceRequest.objects.create(
+                employee=employee, amount_requested=Decimal(amount), request_date=now + timedelta(minutes=i))
+            for i, amount in enumerate(amounts)
+        ]
+
+    def test_bulk_approval_checks_cap_in_request_order(self):
+        colleague = Employee.objects.create(
+            employer=self.employer, full_name="Bruno Diaz", email="bruno@example.com",
+            salary=Decimal("2000.00"), password="x")
+        first, too_much, fits = self.add_requests(self.employee, "300", "500", "200")
+        other, = self.add_requests(colleague, "1400")
+        done, = self.add_requests(self.employee, "10")
+        SalaryAdvanceRequest.objects.filter(pk=done.pk).update(status=SalaryAdvanceRequest.REJECTED)
+        missing = "00000000-0000-0000-0000-000000000000"
+
+        # Locks, ledger read, request lock, one UPDATE, one ledger upsert, one
+        # outbox INSERT, plus the savepoint.
+        with self.assertNumQueries(8):
+            results = review_salary_advances(
+                [too_much.pk, first.pk, fits.pk, other.pk, done.pk, missing, "nope"], "approve")
+
+        self.assertEqual([result["status"] for result in results], [
+            "over_cap", "approved", "approved", "approved", "not_pending", "missing", "invalid"])
+        self.assertEqual(results[0]["available_amount"], Decimal("200.00"))
+        self.assertEqual(
+            SalaryAdvanceRequest.objects.get(pk=too_much.pk).status, SalaryAdvanceRequest.PENDING)
+        self.assertEqual(
+            dict(MonthlyAdvanceLedger.objects.values_list("employee_id", "advanced_total")),
+            {self.employee.pk: Decimal("500.00"), colleague.pk: Decimal("1400.00")})
+
+    def test_api_rejects_for_staff_only(self):
+        pending = self.add_requests(self.employee, "100", "200")
+        payload = {"action": "reject", "ids": [str(advance.pk) for advance in pending]}
+        url = "/api/v1/salary-advances/review"
+
+        self.assertEqual(self.client.post(url, payload, content_type="application/json").status_code, 403)
+        reviewer = get_user_model().objects.create_user("reviewer", password="x", is_staff=True)
+        browser = self.client_class(enforce_csrf_checks=True)
+        browser.force_login(reviewer)
+        # A cross-site form post carries the session cookie but no CSRF token.
+        self.assertEqual(browser.post(url, payload, content_type="application/json").status_code, 403)
+        self.assertEqual(SalaryAdvanceRequest.objects.filter(status=SalaryAdvanceRequest.PENDING).count(), 2)
+
+        self.client.force_login(reviewer)
+        response = self.client.post(url, payload, content_type="application/json")
+        self.assertEqual(response.json()["summary"], {"rejected": 2})
+        self.assertEqual(
+            set(SalaryAdvanceRequest.objects.values_list("status", flat=True)), {SalaryAdvanceRequest.REJECTED})
+
+
+def summary_totals(model, keys, fields, **filters):
+    """``model``'s rows matching ``filters``, with the shards of each ``keys`` added up."""
+    return list(
+        model.objects.filter(**filters).values(*keys).order_by(*keys)
+        .annotate(**{f"{field}_sum": Sum(field) for field in fields})
+        .values_list(*keys, *(f"{field}_sum" for field in fields)))
+
+
+def employer_summary(employer):
+    totals, = summary_totals(EmployerSummary, ["employer"], SUMMARY_FIELDS, employer=employer)
+    return dict(zip(SUMMARY_FIELDS, totals[1:]))
+
+
+class EmployerDashboardTests(EmployeeFixturesMixin, TestCase):
+    def snapshot(self):
+        return (
+            summary_totals(EmployerSummary, ["employer_id"], SUMMARY_FIELDS),
+            summary_totals(EmployerMonthlySummary, ["employer_id", "month"], MONTHLY_FIELDS),
+            list(EmployerBankSummary.objects.filter(employee_count__gt=0).order_by(
+                "employer_id", "bank_name").values_list("employer_id", "bank_name", "employee_count")),
+        )
+
+    def test_incremental_updates_match_a_rebuild(self):
+        colleague = Employee.objects.create(
+            employer=self.employer, full_name="Bruno Diaz", email="bruno@example.com",
+            salary=Decimal("2000.00"), password="x", bank_name="BNB")
+        approved = create_salary_advance(self.employee.pk, Decimal("300.00"))
+        approve_salary_advance(approved)
+        rejected = create_salary_advance(colleague.pk, Decimal("100.00"))
+        review_salary_advances([rejected.pk], "reject")
+        process_batch()
+        pending = create_salary_advance(colleague.pk, Decimal("250.00"))
+        create_salary_advance(colleague.pk, Decimal("50.00")).delete()
+        old = SalaryAdvanceRequest.objects.create(
+            employee=self.employee, amount_requested=Decimal("80.00"),
+            request_date=timezone.now() - timedelta(days=40))
+        old.status = SalaryAdvanceRequest.APPROVED
+        old.save()
+        colleague = Employee.objects.only("id", "salary").get(pk=colleague.pk)
+        colleague.salary = Decimal("2500.00")
+        colleague.save()
+
+        self.assertEqual(
+            list(employer_summary(self.employer).values()), [2, Decimal("3500.00"), 1, pending.amount_requested])
+        self.assertEqual(
+            summary_totals(EmployerMonthlySummary, ["month"], MONTHLY_FIELDS,
+                           employer=self.employer, month=month_start(timezone.now())),
+            [(month_start(timezone.now()), 3, 2, Decimal("380.00"), 1)])
+
+        incremental = self.snapshot()
+        rebuild_summaries()
+        self.assertEqual(self.snapshot(), incremental)
+
+    def test_moving_an_employee_rebuilds_both_employers(self):
+        create_salary_advance(self.employee.pk, Decimal("100.00"))
+        other = Employer.objects.create(name="Globex")
+        self.employee.employer = other
+        self.employee.save()
+
+        self.assertFalse(EmployerSummary.objects.filter(employer=self.employer).exists())
+        summary = employer_summary(other)
+        self.assertEqual((summary["employee_count"], summary["pending_count"]), (1, 1))
+        incremental = self.snapshot()
+        rebuild_summaries()
+        self.assertEqual(self.snapshot(), incremental)
+
+    def test_api_reads_dashboard_for_staff(self):
+        approved = create_salary_advance(self.employee.pk, Decimal("200.00"))
+        approve_salary_advance(approved)
+        process_batch()
+        create_salary_advance(self.employee.pk, Decimal("50.00"))
+        url = f"/api/v1/employers/{self.employer.pk}/dashboard?months=3"
+
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.client.force_login(get_user_model().objects.create_user("analyst", password="x", is_staff=True))
+        self.assertEqual(self.client.get(url.replace("=3", "=0")).status_code, 400)
+        self.assertEqual(
+            self.client.get(f"/api/v1/employers/{uuid.uuid4()}/dashboard").status_code, 404)
+        data = self.client.get(url).json()
+
+        self.assertEqual(data["employees"], 1)
+        self.assertEqual(data["pending"], {"count": 1, "total": "50.00"})
+        self.assertEqual(data["outstanding"], "200.00")
+        self.assertEqual(data["utilization"]["ratio"], "0.2857")
+        self.assertEqual(len(data["approved_by_month"]), 3)
+        self.assertEqual(data["approved_by_month"][-1]["approved_total"], "200.00")
+        self.assertEqual(data["banks"], [{"bank_name": self.employee.bank_name, "employees": 1}])
+
+        PayrollSettlement.objects.create(
+            employer=self.employer, month=month_start(timezone.now()),
+            period_start=timezone.now(), period_end=timezone.now())
+        self.assertEqual(self.client.get(url).json()["outstanding"], "0")
+
+
+class OutboxWorkerTests(EmployeeFixturesMixin, TestCase):
+    def test_approval_only_enqueues_and_worker_runs_side_effects_once(self):
+        advance = create_salary_advance(self.employee.pk, Decimal("300.00"))
+        approve_salary_advance(advance)
+        event = OutboxEvent.objects.get()
+        self.assertEqual(event.topic, OutboxEvent.SALARY_ADVANCE_APPROVED)
+        self.assertFalse(Transaction.objects.exists())
+        self.assertEqual(employer_summary(self.employer)["pending_count"], 1)
+
+        with self.assertLogs("employees.notifications") as logs:
+            self.assertEqual(process_batch(), (1, 0, 0))
+
+        self.assertIn("ana@example.com", logs.output[0])
+        self.assertEqual(OutboxEvent.objects.get().status, OutboxEvent.DONE)
+        self.assertEqual(Transaction.objects.get().amount, Decimal("300.00"))
+        disbursement = Disbursement.objects.get()
+        self.assertEqual(
+            (disbursement.request_id, disbursement.bank_name, disbursement.amount),
+            (advance.pk, self.employee.bank_name, Decimal("300.00")))
+        summary = employer_summary(self.employer)
+        self.assertEqual((summary["pending_count"], summary["pending_total"]), (0, Decimal("0")))
+
+        # A replayed event does not duplicate the transaction or the disbursement.
+        OutboxEvent.objects.update(status=OutboxEvent.PENDING)
+        with self.assertLogs("employees.notifications"):
+            process_batch()
+        self.assertEqual((Transaction.objects.count(), Disbursement.objects.count()), (1, 1))
+
+    def test_failing_event_is_retried_with_backoff_without_blocking_the_batch(self):
+        good = create_salary_advance(self.employee.pk, Decimal("100.00"))
+        review_salary_advances([good.pk], "approve")
+        OutboxEvent.objects.create(topic="unknown.topic")
+
+        with self.assertLogs("employees", level="ERROR"):
+            self.assertEqual(process_batch(max_attempts=2), (1, 1, 0))
+        failing = OutboxEvent.objects.get(topic="unknown.topic")
+        self.assertEqual((failing.status, failing.attempts), (OutboxEvent.PENDING, 1))
+        self.assertGreater(failing.available_at, timezone.now())
+        self.assertEqual(Transaction.objects.count(), 1)
+
+        self.assertEqual(process_batch(max_attempts=2), (0, 0, 0))
+        OutboxEvent.objects.filter(pk=failing.pk).update(available_at=timezone.now())
+        with self.assertLogs("employees", level="ERROR"):
+            self.assertEqual(process_batch(max_attempts=2), (0, 0, 1))
+        self.assertEqual(OutboxEvent.objects.get(pk=failing.pk).status, OutboxEvent.FAILED)
+
+    def test_command_drains_the_outbox(self):
+        advance = create_salary_advance(self.employee.pk, Decimal("100.00"))
+        approve_salary_advance(advance)
+        out = StringIO()
+        with self.assertLogs("employees.notifications"):
+            call_command("run_outbox_worker", "--once", stdout=out)
+        self.assertIn("1 done", out.getvalue())
+        self.assertFalse(OutboxEvent.objects.filter(status=OutboxEvent.PENDING).exists())
+
+
+class DisbursementFileTests(EmployeeFixturesMixin, TestCase):
+    def approve(self, employee, amount):
+        advance = create_salary_advance(employee.pk, Decimal(amount))
+        approve_salary_advance(advance)
+        return advance
+
+    def test_files_per_bank_mark_requests_paid_once(self):
+        colleague = Employee.objects.create(
+            employer=self.employer, full_name="José Núñez", email="jose@example.com",
+            salary=Decimal("2000.00"), password="x", bank_name="BNB", bank_account="998877")
+        first = self.approve(self.employee, "100.00")
+        with self.assertLogs("employees.notifications"):
+            process_batch()
+        # Not handled by the outbox worker yet; the run queues it itself.
+        second = self.approve(colleague, "250.50")
+        create_salary_advance(colleague.pk, Decimal("10.00"))
+        output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, output_dir)
+
+        out = StringIO()
+        call_command("generate_disbursements", "--format", "fixed", "--output-dir", output_dir, stdout=out)
+
+        self.assertIn("Wrote 2 disbursement file(s)", out.getvalue())
+        batches = {batch.bank_name: batch for batch in DisbursementBatch.objects.all()}
+        self.assertEqual(set(batches), {self.employee.bank_name, "BNB"})
+        with open(os.path.join(output_dir, batches["BNB"].file_name)) as f:
+            lines = f.read().splitlines()
+        self.assertEqual(lines[0][21:29], timezone.localdate().strftime("%Y%m%d"))
+        self.assertEqual(lines[1], f"D{'998877':<20}{'Jose Nunez':<40}{'25050':0>15}{second.pk.hex}")
+        self.assertEqual(lines[2], f"T00000001{'25050':0>15}")
+        self.assertEqual(
+            set(SalaryAdvanceRequest.objects.filter(paid_at__isnull=False).values_list("pk", flat=True)),
+            {first.pk, second.pk})
+
+        # Paid requests are not collected again, and a late outbox run adds no disbursement.
+        with self.assertLogs("employees.notifications"):
+            process_batch()
+        call_command("generate_disbursements", "--output-dir", output_dir, stdout=StringIO())
+        self.assertEqual(DisbursementBatch.objects.count(), 2)
+        self.assertEqual(Disbursement.objects.count(), 2)
+
+    def test_csv_file_can_be_rewritten(self):
+        advance = self.approve(self.employee, "100.00")
+        output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, output_dir)
+        call_command("generate_disbursements", "--output-dir", output_dir, stdout=StringIO())
+        batch = DisbursementBatch.objects.get()
+        path = os.path.join(output_dir, batch.file_name)
+        os.remove(path)
+
+        call_command("generate_disbursements", "--rewrite", str(batch.pk), "--output-dir", output_dir,
+                     stdout=StringIO())
+
+        with open(path, newline="") as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(
+            (rows[0]["request_id"], rows[0]["amount"]), (str(advance.pk), "100.00"))
+
+
+class RateLimitAndIdempotencyTests(EmployeeFixturesMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.employee.password = make_password("secret")
+        self.employee.save()
+
+    def advance(self, key=None, amount="10.00"):
+        headers = self.auth()
+        if key:
+            headers["HTTP_IDEMPOTENCY_KEY"] = key
+        return self.client.post(
+            f"/api/v1/employees/{self.employee.pk}/salary-advances", {"amount_requested": amount},
+            content_type="application/json", **headers)
+
+    @override_settings(RATE_LIMITS={**settings.RATE_LIMITS, "sign_in_email": (2, 60)})
+    def test_sign_in_is_limited_per_email_before_checking_the_password(self):
+        payload = {"email": "ana@example.com", "password": "wrong"}
+        for _ in range(2):
+            response = self.client.post("/api/v1/signin/", payload, content_type="application/json")
+            self.assertEqual(response.status_code, 401)
+
+        with patch("employees.api.v1.views.check_password") as check:
+            response = self.client.post("/api/v1/signin/", payload, content_type="application/json")
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["Retry-After"], "30")
+        check.assert_not_called()
+        other = {"email": "bruno@example.com", "password": "wrong"}
+        self.assertEqual(self.client.post("/api/v1/signin/", other, content_type="application/json").status_code, 401)
+
+    def test_repeated_idempotency_key_replays_without_queries(self):
+        first = self.advance(key="tap-1")
+        self.assertEqual(first.status_code, 201)
+
+        with self.assertNumQueries(0):
+            replay = self.advance(key="tap-1")
+        self.assertEqual(replay.status_code, 201)
+        self.assertEqual(replay.json(), first.json())
+        self.assertEqual(replay["Idempotent-Replayed"], "true")
+        self.assertEqual(self.advance(key="tap-1", amount="20.00").status_code, 422)
+        self.assertEqual(SalaryAdvanceRequest.objects.count(), 1)
+
+    @override_settings(RATE_LIMITS={**settings.RATE_LIMITS, "advance_employee": (2, 60)})
+    def test_advance_creation_is_limited_per_employee(self):
+        self.assertEqual([self.advance().status_code for _ in range(3)], [201, 201, 429])
+        # A rate-limited key is not remembered, so the client can retry it.
+        self.assertEqual(self.advance(key="later").status_code, 429)
+        cache.delete(f"ratelimit:advance_employee:{self.employee.pk}")
+        self.assertEqual(self.advance(key="later").status_code, 201)
+
+    def test_redis_buckets_are_taken_by_one_script(self):
+        backend = RedisCache("redis://localhost:6379/0", {})
+        client = backend.__dict__["_cache"] = Mock()
+        script = client.get_client.return_value.register_script.return_value
+        script.return_value = b"1.5"
+        with patch("employees.ratelimit.caches") as caches:
+            caches.__getitem__.return_value = backend
+            self.assertEqual(ratelimit.TokenBucket("advance_employee", 5, 60).take(7), 1.5)
+        client.get_client.return_value.register_script.assert_called_once_with(ratelimit.TAKE_SCRIPT)
+        self.assertEqual(script.call_args.kwargs["keys"], [":1:ratelimit:advance_employee:7"])
+        self.assertEqual(script.call_args.kwargs["args"][:2], [5, 5 / 60])
+
+
+class TransactionPartitionTests(EmployeeFixturesMixin, TestCase):
+    def setUp(self):
+        advance = SalaryAdvanceRequest.objects.create(employee=self.employee, amount_requested=Decimal("50.00"))
+        self.transaction = Transaction.objects.create(request=advance, amount=Decimal("50.00"))
+        self.current = month_start(timezone.now())
+
+    def move_to(self, month):
+        moved = datetime(month.year, month.month, 15, tzinfo=timezone.get_current_timezone())
+        Transaction.objects.filter(pk=self.transaction.pk).update(transaction_date=moved)
+
+    def partition_of(self, pk):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT c.relname FROM "fintech"."transaction" t JOIN pg_class c ON c.oid = t.tableoid '
+                'WHERE t.id = %s', [pk])
+            return cursor.fetchone()[0]
+
+    def test_rows_without_a_partition_wait_in_default_until_created(self):
+        later = add_months(self.current, 12)
+        self.move_to(later)
+        self.assertEqual(self.partition_of(self.transaction.pk), "transaction_default")
+
+        self.assertIn(later, ensure_partitions(Transaction))
+        self.assertEqual(
+            self.partition_of(self.transaction.pk), f"transaction_p{later:%Y_%m}")
+        self.assertEqual(ensure_partitions(Transaction), [])
+
+    def test_current_month_query_reads_only_its_partition(self):
+        start = timezone.make_aware(datetime(self.current.year, self.current.month, 1))
+        end = timezone.make_aware(datetime.combine(add_months(self.current, 1), datetime.min.time()))
+        plan = Transaction.objects.filter(transaction_date__gte=start, transaction_date__lt=end).explain()
+        self.assertIn(f"transaction_p{self.current:%Y_%m}", plan)
+        self.assertNotIn(f"transaction_p{add_months(self.current, -1):%Y_%m}", plan)
+        self.assertNotIn("transaction_default", plan)
+
+    def test_command_archives_old_partitions(self):
+        old = add_months(self.current, -6)
+        ensure_partitions(Transaction, start=old)
+        self.move_to(old)
+        # Run the deferred foreign key checks, as a commit would, before ALTER TABLE.
+        with connection.cursor() as cursor:
+            cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+
+        out = StringIO()
+        call_command("manage_partitions", "--keep-months", "3", stdout=out)
+        self.assertIn(f"detached transaction_p{old:%Y_%m}", out.getvalue())
+        self.assertNotIn(old, partition_months(Transaction))
+        self.assertGreaterEqual(partition_months(Transaction)[-1], add_months(self.current, 3))
+        self.assertFalse(Transaction.objects.filter(pk=self.transaction.pk).exists())
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT count(*) FROM "fintech_archive"."transaction_p{old:%Y_%m}"')
+            self.assertEqual(cursor.fetchone()[0], 1)
+        # Archived rows keep no foreign keys, so the request can still go.
+        self.transaction.request.delete()
+        self.assertFalse(SalaryAdvanceRequest.objects.filter(pk=self.transaction.request_id).exists())
+
+
+@override_settings(REPLICA_DATABASES=["replica_1"], REPLICA_MAX_LAG_SECONDS=5, REPLICA_LAG_CHECK_SECONDS=0)
+class ReplicaRoutingTests(EmployeeFixturesMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        reset_lags()
+
+    def test_reads_use_a_fresh_replica_only_when_enabled(self):
+        router = ReplicaRouter()
+        # Outside the test's transaction; no queries run while patched.
+        with patch.object(connection, "in_atomic_block", False), \
+                patch("employees.db_router.replica_lag", side_effect=[0.5, 30.0, None]):
+            self.assertEqual(router.db_for_read(Employee), "default")
+            with replica_reads():
+                self.assertEqual(router.db_for_read(Employee), "replica_1")
+                self.assertEqual(router.db_for_read(Employee), "default")
+                self.assertEqual(router.db_for_read(Employee), "default")
+                self.assertEqual(router.db_for_write(Employee), "default")
+        with replica_reads():
+            # Inside a transaction on the primary.
+            self.assertEqual(router.db_for_read(Employee), "default")
+
+    def test_clients_read_their_writes_from_the_primary(self):
+        url = f"/api/v1/employees/{self.employee.pk}/salary-advances"
+        with patch("employees.middleware.set_replica_reads") as replica_reads_for:
+            self.client.get(url, **self.auth())
+            response = self.client.post(
+                url, {"amount_requested": "10.00"}, content_type="application/json", **self.auth())
+            self.assertEqual(response.status_code, 201)
+            self.assertIn("db_primary_until", response.cookies)
+            self.client.get(url, **self.auth())
+            # Another client of the same employee, without the cookie.
+            self.client_class().get(url, **self.auth())
+        # Each request turns replica reads off, decides in process_view and
+        # turns them off again in process_response.
+        calls = [call.args[0] for call in replica_reads_for.call_args_list]
+        self.assertEqual(calls[1::3], [True, False, False, False])
+        self.assertFalse(any(calls[0::3] + calls[2::3]))
+
+    def test_requests_do_not_inherit_replica_reads(self):
+        url = f"/api/v1/employees/{self.employee.pk}/salary-advances"
+        # Left on by an earlier request on this thread.
+        set_replica_reads(True)
+        self.addCleanup(set_replica_reads, False)
+        enabled = []
+        with patch("employees.middleware.ReplicaMiddleware.process_view", return_value=None), \
+                patch("employees.db_router.ReplicaRouter.db_for_read",
+                      side_effect=lambda *args, **hints: enabled.append(db_router._replica_reads.get())):
+            self.client.get(url, **self.auth())
+        self.assertTrue(enabled)
+        self.assertFalse(any(enabled))
+        self.assertFalse(db_router._replica_reads.get())
+
+    def test_exports_read_from_a_replica(self):
+        staff = get_user_model().objects.create_user("accountant", password="x", is_staff=True)
+        self.client.force_login(staff)
+        self.client.cookies["db_primary_until"] = f"{time.time() + 60:.0f}"
+        enabled = []
+        with patch("employees.db_router.ReplicaRouter.db_for_read",
+                   side_effect=lambda model, **hints: enabled.append((model, db_router._replica_reads.get()))):
+            response = self.client.get("/api/v1/exports/employees")
+            b"".join(response.streaming_content)
+        self.assertIn((Employee, True), enabled)
+        self.assertNotIn((Employee, False), enabled)
+
+
+class SerializationTests(EmployeeFixturesMixin, TestCase):
+    def test_list_endpoints_match_django_json_encoder(self):
+        advances = SalaryAdvanceRequest.objects.bulk_create([
+            SalaryAdvanceRequest(employee=self.employee, amount_requested=Decimal(amount), request_date=date)
+            for amount, date in [
+                ("10.00", timezone.make_aware(datetime(2026, 3, 1, 12))),
+                ("0.50", timezone.make_aware(datetime(2026, 3, 1, 12, 0, 0, 500))),
+                ("123.45", timezone.make_aware(datetime(2026, 3, 1, 12, 0, 0, 987654))),
+            ]
+        ])
+        Transaction.objects.bulk_create(
+            [Transaction(request=advance, amount=advance.amount_requested) for advance in advances])
+        url = f"/api/v1/employees/{self.employee.pk}"
+        cases = [
+            (f"{url}/salary-advances", "salary_advance_requests",
+             SalaryAdvanceRequest.objects.filter(employee=self.employee).values(
+                 "id", "amount_requested", "status", "request_date", "review_date")),
+            (f"{url}/transactions", "transactions",
+             Transaction.objects.filter(request__employee=self.employee).values("id", "amount", "transaction_date")),
+            ("/api/v1/employees/?fields=id,salary,created,modified", "results",
+             Employee.objects.values("id", "salary", "created", "modified")),
+        ]
+        for path, key, rows in cases:
+            expected = json.loads(JsonResponse({key: list(rows)}).content)[key]
+            response = self.client.get(path, **self.auth())
+            self.assertEqual(response["Content-Type"], "application/json")
+            self.assertCountEqual(response.json()[key], expected)
+        listed = self.client.get(f"{url}/salary-advances", **self.auth()).json()["salary_advance_requests"]
+        self.assertCountEqual(
+            [row["request_date"] for row in listed],
+            ["2026-03-01T12:00:00Z", "2026-03-01T12:00:00.000Z", "2026-03-01T12:00:00.987Z"])
+
+
+class ReadinessTests(TestCase):
+    def test_ready_only_with_every_migration_applied(self):
+        response = self.client.get(reverse("ready"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["checks"], {"app": True, "database": True, "migrations": True, "cache": True})
+
+        with patch("employees.readiness._migrated", False), \
+                patch("django.db.migrations.executor.MigrationExecutor.migration_plan", return_value=[("0099", False)]):
+            response = self.client.get(reverse("ready"))
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()["status"], "unavailable")
+        self.assertFalse(response.json()["checks"]["migrations"])
+
+
+class EmployeeSearchTests(EmployeeFixturesMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        globex = Employer.objects.create(name="Globex")
+        for employer, full_name, email in [
+            (globex, "María Gonzalez", "maria.gonzalez@example.com"),
+            (globex, "Mario Gonzalo", "mgonzalo@example.com"),
+            (cls.employer, "Pedro Rojas", "projas@example.com"),
+        ]:
+            Employee.objects.create(
+                employer=employer, full_name=full_name, email=email, salary=Decimal("1000.00"), password="x")
+        cls.staff = get_user_model().objects.create_user("hr", password="x", is_staff=True)
+
+    def setUp(self):
+        self.client.force_login(self.staff)
+
+    def search(self, q, **params):
+        response = self.client.get("/api/v1/employees/search", {"q": q, **params})
+        self.assertEqual(response.status_code, 200)
+        return [row["full_name"] for row in response.json()["results"]]
+
+    def test_ranks_prefix_typo_email_and_employer_matches(self):
+        self.assertEqual(self.search("gonzales"), ["María Gonzalez", "Mario Gonzalo"])
+        self.assertCountEqual(self.search("gonz"), ["María Gonzalez", "Mario Gonzalo"])
+        self.assertEqual(self.search("projas"), ["Pedro Rojas"])
+        self.assertCountEqual(self.search("acme"), ["Ana Perez", "Pedro Rojas"])
+        self.assertEqual(self.search("gonzales", employer=str(self.employer.pk)), [])
+
+        result = self.client.get("/api/v1/employees/search", {"q": "projas", "fields": "id,email"}).json()
+        self.assertEqual(set(result["results"][0]), {"id", "email", "score"})
+        self.assertEqual(result["results"][0]["score"], 1.0)
+        self.assertEqual(self.client.get("/api/v1/employees/search", {"q": " g "}).status_code, 400)
+
+    def test_rejects_non_staff(self):
+        self.client.logout()
+        self.assertEqual(self.client.get("/api/v1/employees/search", {"q": "gonzales"}).status_code, 403)
+
+    def test_admin_search_is_ranked(self):
+        self.client.force_login(get_user_model().objects.create_superuser("admin", "admin@example.com", "admin"))
+        response = self.client.get(reverse("admin:employees_employee_changelist"), {"q": "gonzales"})
+        content = response.content.decode()
+        self.assertNotIn("Ana Perez", content)
+        self.assertLess(content.index("María Gonzalez"), content.index("Mario Gonzalo"))
@@ -0,0 +1,99 @@
+"""Stateless signed access/refresh tokens for employees.
+
+Tokens are ``django.core.signing`` payloads (HMAC-SHA256 over
+``TOKEN_SIGNING_KEY``, read from the environment) carrying the employee id,
+the token type and a unique ``jti``, so verifying one never touches the
+database. Revoked ``jti`` values are kept in a bounded in-process LRU;
+refresh tokens, which are only used occasionally, are also checked against
+the shared cache so revocation is seen by every worker.
+"""
+import threading
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+
+ACCESS = 'access'
+REFRESH = 'refresh'
+
+_SALT = 'employees.tokens'
+
+
+class InvalidToken(Exception):
+    pass
+
+
+class RevocationList:
+    """Thread-safe LRU of revoked token ids."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, jti):
+        with self._lock:
+            self._entries[jti] = True
+            self._entries.move_to_end(jti)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def __contains__(self, jti):
+        with self._lock:
+            if jti in self._entries:
+                self._entries.move_to_end(jti)
+                return True
+            return False
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+revoked_tokens = RevocationList(settings.TOKEN_REVOCATION_CACHE_SIZE)
+
+
+def _lifetime(kind):
+    return settings.ACCESS_TOKEN_LIFETIME if kind == ACCESS else settings.REFRESH_TOKEN_LIFETIME
+
+
+def _issue(employee_id, kind):
+    return signing.dumps(
+        {'sub': str(employee_id), 'typ': kind, 'jti': uuid.uuid4().hex},
+        key=settings.TOKEN_SIGNING_KEY, salt=_SALT)
+
+
+def issue_tokens(employee_id):
+    return {
+        'access': _issue(employee_id, ACCESS),
+        'refresh': _issue(employee_id, REFRESH),
+        'expires_in': int(settings.ACCESS_TOKEN_LIFETIME.total_seconds()),
+    }
+
+
+def verify_token(token, kind=ACCESS):
+    """Return the token payload or raise ``InvalidToken``."""
+    try:
+        payload = signing.loads(
+            token, key=settings.TOKEN_SIGNING_KEY, salt=_SALT, max_age=_lifetime(kind))
+    except signing.BadSignature:
+        raise InvalidToken("Invalid or expired token")
+    if payload.get('typ') != kind:
+        raise InvalidToken("Wrong token type")
+    if payload['jti'] in revoked_tokens or (
+            kind == REFRESH and cache.get(_revocation_key(payload['jti']))):
+        raise InvalidToken("Token has been revoked")
+    return payload
+
+
+def revoke_token(payload):
+    revoked_tokens.add(payload['jti'])
+    cache.set(
+        _revocation_key(payload['jti']), True,
+        timeout=int(_lifetime(payload['typ']).total_seconds()))
+
+
+def _revocation_key(jti):
+    return f'tokens:revoked:{jti}'
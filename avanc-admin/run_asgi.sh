@@ -0,0 +1,10 @@
+#!/usr/bin/env bash
+
+set -e
+
+if [ -n "${PROMETHEUS_MULTIPROC_DIR}" ]; then
+  rm -rf "${PROMETHEUS_MULTIPROC_DIR}" && mkdir -p "${PROMETHEUS_MULTIPROC_DIR}"
+fi
+
+uvicorn config.asgi:application --host 0.0.0.0 --port 8000 \
+  --workers "${UVICORN_WORKERS:-${UWSGI_PROCESSES:-1}}" --no-access-log
@@ -0,0 +1,10 @@
+#!/usr/bin/env bash
+
+set -e
+
+# Metric files of the previous run would be summed into the new one.
+if [ -n "${PROMETHEUS_MULTIPROC_DIR}" ]; then
+  rm -rf "${PROMETHEUS_MULTIPROC_DIR}" && mkdir -p "${PROMETHEUS_MULTIPROC_DIR}"
+fi
+
+exec python3 manage.py run_outbox_worker "$@"
@@ -0,0 +1,18 @@
+#!/usr/bin/env bash
+
+# One-shot release step, run once per deploy before the service starts (the
+# `release` service in docker-compose.yml), so that workers boot without
+# touching the schema or the static files.
+
+set -e
+
+# Samples of one-shot commands are never scraped, and the multiprocess
+# directory is only created by the long-running services.
+unset PROMETHEUS_MULTIPROC_DIR
+
+python3 manage.py migrate --noinput
+python3 manage.py manage_partitions
+python3 manage.py createsuperuser --no-input || true
+python3 manage.py collectstatic --noinput
+
+chown -R www-data:www-data /opt/app/static
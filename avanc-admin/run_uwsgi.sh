@@ -1,11 +1,13 @@
 #!/usr/bin/env bash
 
-python3 manage.py migrate --noinput
-python3 manage.py createsuperuser --no-input || true
-python3 manage.py collectstatic --noinput
-
 set -e
 
-chown -R www-data:www-data /opt/app/static /opt/app/media
+# Metric files of the previous run would be summed into the new one.
+if [ -n "${PROMETHEUS_MULTIPROC_DIR}" ]; then
+  rm -rf "${PROMETHEUS_MULTIPROC_DIR}" && mkdir -p "${PROMETHEUS_MULTIPROC_DIR}"
+fi
+
+# Migrations and static files are handled by run_release.sh.
+chown -R www-data:www-data /opt/app/media ${PROMETHEUS_MULTIPROC_DIR}
 
 uwsgi --strict --ini uwsgi.ini